@@ -11,23 +11,190 @@ name: vsz
 short_description: Use Ruckus SmartZone RestAPI
 description:
   - This HttpApi plugin provides methods to connect to Ruckus SmartZone Public API over a HTTP(S).
+options:
+  cassette:
+    description:
+      - Path of a gzip compressed cassette file.
+      - In C(record) mode every request and response is appended to the file, with passwords,
+        secrets and the service ticket scrubbed.
+      - In C(replay) mode the responses are served from the file and the controller is not contacted.
+      - Use a separate file per host, e.g. C({{ inventory_hostname }}.cassette.gz).
+    type: path
+    vars:
+      - name: ansible_httpapi_vsz_cassette
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_CASSETTE
+  cassette_mode:
+    description: Whether to record or replay the cassette.
+    type: str
+    default: record
+    choices: [record, replay]
+    vars:
+      - name: ansible_httpapi_vsz_cassette_mode
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_CASSETTE_MODE
+  cassette_latency_scale:
+    description:
+      - Factor applied to the recorded latency of each request during replay.
+      - C(1.0) reproduces the original timing, C(0) replays as fast as possible.
+    type: float
+    default: 1.0
+    vars:
+      - name: ansible_httpapi_vsz_cassette_latency_scale
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_CASSETTE_LATENCY_SCALE
+  rate_limit:
+    description:
+      - Maximum number of requests per second sent to the controller.
+      - The limit is shared by all connections to the same controller on this host, regardless of C(forks).
+      - C(0) disables the limit.
+    type: float
+    default: 0
+    vars:
+      - name: ansible_httpapi_vsz_rate_limit
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_RATE_LIMIT
+  rate_limit_burst:
+    description:
+      - Number of requests that may be sent at once before I(rate_limit) applies.
+      - Defaults to I(rate_limit).
+    type: int
+    vars:
+      - name: ansible_httpapi_vsz_rate_limit_burst
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_RATE_LIMIT_BURST
+  max_inflight:
+    description:
+      - Maximum number of concurrent requests to the controller, shared like I(rate_limit).
+      - C(0) disables the limit.
+    type: int
+    default: 0
+    vars:
+      - name: ansible_httpapi_vsz_max_inflight
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_MAX_INFLIGHT
+  rate_limit_dir:
+    description: Directory holding the shared rate limiter state.
+    type: path
+    default: ~/.ansible/tmp
+    vars:
+      - name: ansible_httpapi_vsz_rate_limit_dir
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_RATE_LIMIT_DIR
+  cache_ttl:
+    description:
+      - Seconds the responses of mostly static lists, like the permissions of the admin roles
+        and the account security profiles, are cached on disk and reused by later connections.
+      - The responses are cached per controller and API version.
+      - C(0) disables the cache.
+    type: float
+    default: 0
+    vars:
+      - name: ansible_httpapi_vsz_cache_ttl
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_CACHE_TTL
+  cache_dir:
+    description: Directory holding the cached responses.
+    type: path
+    default: ~/.ansible/tmp
+    vars:
+      - name: ansible_httpapi_vsz_cache_dir
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_CACHE_DIR
+  cluster_read_balancing:
+    description:
+      - Spread read-only requests (GETs and queries) over all healthy nodes of the SmartZone cluster.
+      - The nodes and their management IPs are discovered from C(cluster/state) and C(controller)
+        unless I(cluster_nodes) is set. Writes are always sent to C(ansible_host).
+      - For I(cluster_write_window) seconds after a write the reads are sent to C(ansible_host) as well.
+      - A node that cannot be reached is dropped and the request is sent to C(ansible_host) instead.
+    type: bool
+    default: false
+    vars:
+      - name: ansible_httpapi_vsz_cluster_read_balancing
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_CLUSTER_READ_BALANCING
+  cluster_nodes:
+    description:
+      - Addresses (C(host) or C(host:port)) of the nodes used for I(cluster_read_balancing)
+        instead of the discovered management IPs.
+    type: list
+    elements: str
+    vars:
+      - name: ansible_httpapi_vsz_cluster_nodes
+  cluster_write_window:
+    description:
+      - Seconds after a write during which I(cluster_read_balancing) sends the reads to C(ansible_host),
+        which took the write, until the other nodes have synchronized it.
+      - C(-1) keeps sending the reads to C(ansible_host) for the rest of the connection after the first write.
+    type: float
+    default: 10
+    vars:
+      - name: ansible_httpapi_vsz_cluster_write_window
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_CLUSTER_WRITE_WINDOW
+  batch_concurrency:
+    description:
+      - Maximum number of requests of one C(send_batch) call sent to the controller at the same time.
+    type: int
+    default: 4
+    vars:
+      - name: ansible_httpapi_vsz_batch_concurrency
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_BATCH_CONCURRENCY
+  pool_size:
+    description:
+      - Send the requests over a pool of up to this many kept-alive HTTP(S) connections per controller node.
+        New TLS connections resume the session of the previous handshake.
+      - Should be at least I(batch_concurrency) so concurrent requests do not wait for a connection.
+      - C(0) sends each request with the ansible.netcommon httpapi connection.
+    type: int
+    default: 0
+    vars:
+      - name: ansible_httpapi_vsz_pool_size
+    env:
+      - name: ANSIBLE_HTTPAPI_VSZ_POOL_SIZE
 '''
 
+import http.client
 import json
+import os
+import re
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
 from ansible.module_utils.basic import to_text
+from ansible.module_utils.urls import open_url
 from ansible.errors import AnsibleConnectionFailure
 from ansible.module_utils.connection import ConnectionError
 from ansible.plugins.httpapi import HttpApiBase
-from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.six.moves.urllib.error import HTTPError, URLError
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.cache import ResponseCache
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.cassette import Cassette
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.cluster import ClusterNodes, discover_addresses, is_read_only, node_urls
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.pool import ConnectionPool
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.ratelimit import RateLimiter
 
 BASE_HEADERS = {
     'Content-Type': 'application/json',
     'Accept': 'application/json',
 }
+TICKET = re.compile(r'serviceTicket=[\w-]+')
 
 
 class HttpApi(HttpApiBase):
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self._lock = threading.Lock()
+        # Serializes the cluster discovery and the logins to the cluster nodes
+        self._cluster_lock = threading.Lock()
+        # Serializes logging in again after the service ticket expired
+        self._login_lock = threading.Lock()
+        self._pools = {}
+
     def login(self, username, password):
         self.connection._auth = {}
         if username and password:
@@ -48,21 +215,114 @@ class HttpApi(HttpApiBase):
 
     def logout(self):
         self.send_request(None, path='serviceTicket', method='DELETE')
+        if getattr(self, '_cluster', None):
+            for url, ticket in list(self._cluster.tickets.items()):
+                try:
+                    self._open_node(url, self._with_ticket(f"/wsg/api/public/{self.latest_version}/serviceTicket", ticket), None, 'DELETE')
+                except (URLError, OSError, http.client.HTTPException, AnsibleConnectionFailure) as e:
+                    self.connection.queue_message("warning", f"Logout from cluster node {url} failed: {e}")
+        for url, stats in self.pool_stats().items():
+            self.connection.queue_message(
+                "vvvv",
+                f"Connection pool {url}: {stats['requests']} requests, {stats['handshakes']} TLS handshakes "
+                f"({stats['resumed']} resumed), {stats['connections']} connections, reuse ratio {stats['reuse_ratio']:.0%}"
+            )
+            self._pools[url].close()
+        if self.cassette:
+            self.cassette.close()
+
+    def _get_option(self, option):
+        try:
+            return self.get_option(option)
+        except KeyError:
+            return None
+
+    @property
+    def cassette(self):
+        if not hasattr(self, '_cassette'):
+            self._cassette = None
+            if self._get_option('cassette'):
+                self._cassette = Cassette(
+                    self._get_option('cassette'),
+                    mode=self._get_option('cassette_mode') or 'record',
+                    latency_scale=self._get_option('cassette_latency_scale'),
+                )
+        return self._cassette
+
+    @property
+    def rate_limiter(self):
+        if not hasattr(self, '_rate_limiter'):
+            self._rate_limiter = None
+            if self._get_option('rate_limit') or self._get_option('max_inflight'):
+                self._rate_limiter = RateLimiter(
+                    os.path.expanduser(self._get_option('rate_limit_dir') or '~/.ansible/tmp'),
+                    self.connection.get_option('host'),
+                    rate=self._get_option('rate_limit'),
+                    burst=self._get_option('rate_limit_burst'),
+                    max_inflight=self._get_option('max_inflight'),
+                )
+        return self._rate_limiter
+
+    @property
+    def response_cache(self):
+        if not hasattr(self, '_response_cache'):
+            self._response_cache = None
+            if self._get_option('cache_ttl'):
+                self._response_cache = ResponseCache(
+                    os.path.expanduser(self._get_option('cache_dir') or '~/.ansible/tmp'),
+                    self.connection.get_option('host'),
+                    self.latest_version,
+                    ttl=self._get_option('cache_ttl'),
+                )
+        return self._response_cache
+
+    @property
+    def cluster(self):
+        if hasattr(self, '_cluster'):
+            return self._cluster
+        with self._cluster_lock:
+            if not hasattr(self, '_cluster'):
+                cluster = None
+                if self._get_option('cluster_read_balancing'):
+                    addresses = self._get_option('cluster_nodes')
+                    if not addresses:
+                        addresses = discover_addresses(
+                            self._leader_json(f"/wsg/api/public/{self.latest_version}/cluster/state"),
+                            self._leader_json(f"/wsg/api/public/{self.latest_version}/controller").get('list', []),
+                        )
+                    write_window = self._get_option('cluster_write_window')
+                    cluster = ClusterNodes(node_urls(self.connection._url, addresses),
+                                           write_window=float('inf') if write_window < 0 else write_window)
+                    self.connection.queue_message("vvvv", f"Cluster read balancing over {', '.join(node_urls(self.connection._url, addresses))}")
+                # Set last, other threads only see a complete cluster
+                self._cluster = cluster
+        return self._cluster
+
+    def _pool(self, url):
+        with self._lock:
+            if url not in self._pools:
+                self._pools[url] = ConnectionPool(
+                    url,
+                    size=self._get_option('pool_size'),
+                    validate_certs=self.connection.get_option('validate_certs'),
+                    timeout=self.connection.get_option('persistent_command_timeout'),
+                )
+            return self._pools[url]
+
+    def pool_stats(self):
+        """Handshake and connection reuse counters of the connection pools by node URL."""
+        with self._lock:
+            pools = dict(self._pools)
+        return {url: pool.get_stats() for url, pool in pools.items()}
 
     @property
     def api_info(self):
         if not hasattr(self.connection, '_api_info'):
-            resp, response_data = self.connection.send(
-                '/wsg/api/public/apiInfo',
-                None,
-                method='GET',
-                headers=BASE_HEADERS,
-            )
-            data = to_text(response_data.getvalue())
+            code, data = self._send('/wsg/api/public/apiInfo', None, 'GET')
             if data:
                 data = json.loads(data)
 
-            if resp.getcode() != 200 or 'apiSupportVersions' not in data:
+            if code != 200 or 'apiSupportVersions' not in data:
                 raise AnsibleConnectionFailure(f"Could not connect to endpoint {self.connection._url}/wsg/api/public/apiInfo")
 
             setattr(self.connection, '_api_info', data)
@@ -72,18 +332,105 @@ class HttpApi(HttpApiBase):
     def latest_version(self):
         return self.api_info['apiSupportVersions'][-1]
 
-    def send_request(self, data, path, method='POST'):
+    def send_request(self, data, path, method='POST', raw=False, cache=False):
+        """Send a request, return the status code and the decoded response.
+
+        With `raw` the response text is returned undecoded, so large responses
+        are not decoded and encoded again to cross the connection socket.
+        With `cache` a successful GET is answered from and stored in the
+        response cache, if it is enabled. With `cache='refresh'` it is only
+        stored.
+        """
         path = f"/wsg/api/public/{self.latest_version}/{path}"
+        response_cache = self.response_cache if cache and method == 'GET' else None
+        if response_cache and cache != 'refresh':
+            response_value = response_cache.get(path)
+            if response_value is not None:
+                self.connection.queue_message("vvvv", f"Cached response for {path}")
+                return 200, response_value if raw else self._response_to_json(response_value)
         self._display_request(method, path)
-        if hasattr(self.connection, '_service_ticket'):
-            if '?' in path:
-                path = f"{path}&serviceTicket={self.connection._service_ticket}"
-            else:
-                path = f"{path}?serviceTicket={self.connection._service_ticket}"
 
         if data:
             data = json.dumps(data)
 
+        try:
+            code, response_value = self._send(path, data, method)
+        except AnsibleConnectionFailure as e:
+            # The controller could not be reached, status code 0 tells
+            # SmartZoneConnection that this is a transport error.
+            return 0, TICKET.sub('serviceTicket=********', to_text(e))
+        if response_cache and code == 200:
+            response_cache.put(path, response_value)
+        if raw:
+            return code, response_value
+        return code, self._response_to_json(response_value)
+
+    def send_batch(self, requests, concurrency=None, raw=False, cache=False):
+        """Send a list of (method, path, payload) requests, return their (code, data) in order."""
+        requests = list(requests)
+        concurrency = concurrency or self._get_option('batch_concurrency') or 4
+        if len(requests) <= 1 or concurrency <= 1:
+            return [self.send_request(payload, path, method=method, raw=raw, cache=cache) for method, path, payload in requests]
+
+        if not self.connection.connected and not (self.cassette and self.cassette.replaying):
+            # Log in once up front, not in the first thread while the others send without a ticket
+            self.connection._connect()
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(requests))) as executor:
+            futures = [
+                executor.submit(self.send_request, payload, path, method, raw, cache)
+                for method, path, payload in requests
+            ]
+            return [future.result() for future in futures]
+
+    def _send(self, path, data, method):
+        if self.cassette and self.cassette.replaying:
+            return self.cassette.play(method, path, data)
+
+        with self.rate_limiter.request() if self.rate_limiter else nullcontext():
+            start = time.monotonic()
+            code, response_value = self._transport(path, data, method)
+        if self.cassette:
+            self.cassette.record(method, path, data, code, response_value, time.monotonic() - start)
+        return code, response_value
+
+    @staticmethod
+    def _with_ticket(path, ticket):
+        if '?' in path:
+            return f"{path}&serviceTicket={ticket}"
+        return f"{path}?serviceTicket={ticket}"
+
+    def _transport(self, path, data, method):
+        if hasattr(self.connection, '_service_ticket') and self.cluster:
+            if not is_read_only(method, path):
+                # Keep the reads on the leader while and after it takes the write
+                self.cluster.wrote()
+                try:
+                    return self._leader_transport(path, data, method)
+                finally:
+                    self.cluster.wrote()
+            node = self.cluster.next()
+            if node:
+                try:
+                    return self._node_transport(node, path, data, method)
+                except (URLError, OSError, http.client.HTTPException, AnsibleConnectionFailure) as e:
+                    self.connection.queue_message("warning", f"Cluster node {node} failed, not using it anymore: {e}")
+                    self.cluster.mark_down(node)
+        return self._leader_transport(path, data, method)
+
+    def _leader_json(self, path):
+        code, response_value = self._leader_transport(path, None, 'GET')
+        if code != 200:
+            raise AnsibleConnectionFailure(f"Cluster discovery failed for {path}: [{code}] {response_value}")
+        return self._response_to_json(response_value)
+
+    def _leader_transport(self, path, data, method):
+        if self._get_option('pool_size'):
+            return self._pooled_transport(path, data, method)
+
+        if hasattr(self.connection, '_service_ticket'):
+            path = self._with_ticket(path, self.connection._service_ticket)
+
         try:
             response, response_data = self.connection.send(
                 path,
@@ -91,13 +438,90 @@ class HttpApi(HttpApiBase):
                 method=method,
                 headers=BASE_HEADERS,
             )
-            response_value = self._get_response_value(response_data)
+            return response.getcode(), self._get_response_value(response_data)
+        except HTTPError as e:
+            return e.code, to_text(e.read())
+
+    def _pooled_transport(self, path, data, method):
+        if not self.connection.connected:
+            # Sets the URL and logs in, which comes back here
+            self.connection._connect()
 
-            return response.getcode(), self._response_to_json(response_value)
-        except AnsibleConnectionFailure:
-            return 404, 'Object not found'
+        ticket = getattr(self.connection, '_service_ticket', None)
+        code, response_value = self._pool_request(self.connection._url, path, data, method, ticket)
+        if code == 401 and ticket:
+            code, response_value = self._pool_request(self.connection._url, path, data, method, self._renew_ticket(ticket))
+        return code, response_value
+
+    def _renew_ticket(self, ticket):
+        """Log in again after `ticket` expired, once for all threads which used it, and return the new ticket.
+
+        The login is sent straight over the pool. It runs within the rate limit slot of the failed
+        request and must not wait for the pool lock or for the expired ticket.
+        """
+        with self._login_lock:
+            if self.connection._service_ticket == ticket:
+                payload = json.dumps(dict(
+                    username=self.connection.get_option('remote_user'),
+                    password=self.connection.get_option('password'),
+                ))
+                code, response_value = self._pool_request(self.connection._url, f"/wsg/api/public/{self.latest_version}/serviceTicket", payload, 'POST')
+                if code != 200:
+                    raise AnsibleConnectionFailure(f"Login failed: [{code}] {response_value}")
+                self.connection._service_ticket = self._response_to_json(response_value)['serviceTicket']
+            return self.connection._service_ticket
+
+    def _pool_request(self, url, path, data, method, ticket=None):
+        if ticket:
+            path = self._with_ticket(path, ticket)
+        try:
+            return self._pool(url).request(method, path, data, headers=BASE_HEADERS)
+        except (OSError, http.client.HTTPException) as e:
+            raise AnsibleConnectionFailure(f"Could not connect to {url}{path}: {e}")
+
+    def _open_node(self, url, path, data, method):
+        if self._get_option('pool_size'):
+            return self._pool(url).request(method, path, data, headers=BASE_HEADERS)
+        try:
+            response = open_url(
+                f"{url}{path}",
+                data=data,
+                method=method,
+                headers=BASE_HEADERS,
+                validate_certs=self.connection.get_option('validate_certs'),
+                timeout=self.connection.get_option('persistent_command_timeout'),
+            )
+            return response.getcode(), to_text(response.read())
         except HTTPError as e:
-            return e.code, json.loads(e.read())
+            return e.code, to_text(e.read())
+
+    def _node_ticket(self, url):
+        ticket = self.cluster.tickets.get(url)
+        if ticket:
+            return ticket
+        with self._cluster_lock:
+            # Another thread may have logged in while this one waited
+            if url not in self.cluster.tickets:
+                payload = json.dumps(dict(
+                    username=self.connection.get_option('remote_user'),
+                    password=self.connection.get_option('password'),
+                ))
+                code, response_value = self._open_node(url, f"/wsg/api/public/{self.latest_version}/serviceTicket", payload, 'POST')
+                if code != 200:
+                    raise AnsibleConnectionFailure(f"Login on cluster node {url} failed: [{code}] {response_value}")
+                self.cluster.tickets[url] = self._response_to_json(response_value)['serviceTicket']
+            return self.cluster.tickets[url]
+
+    def _node_transport(self, url, path, data, method):
+        ticket = self._node_ticket(url)
+        code, response_value = self._open_node(url, self._with_ticket(path, ticket), data, method)
+        if code == 401:
+            # Ticket expired, login again once unless another thread already did
+            with self._cluster_lock:
+                if self.cluster.tickets.get(url) == ticket:
+                    del self.cluster.tickets[url]
+            code, response_value = self._open_node(url, self._with_ticket(path, self._node_ticket(url)), data, method)
+        return code, response_value
 
     def _display_request(self, method, path):
         self.connection.queue_message(
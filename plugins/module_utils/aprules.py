@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import heapq
+import ipaddress
+
+# The field holding the match of each rule type
+MATCH_FIELDS = dict(
+    IPAddressRange='ipAddressRange',
+    Subnet='subnet',
+    GPSCoordinates='gpsCoordinates',
+    ProvisionTag='provisionTag',
+)
+# The rule types matching IPv4 addresses
+INTERVAL_TYPES = ['IPAddressRange', 'Subnet']
+
+
+def rule_argument_spec():
+    """Options describing what an AP registration rule matches."""
+    return dict(
+        ip_range=dict(type='dict', options=dict(
+            from_ip=dict(type='str', required=True, aliases=['from']),
+            to_ip=dict(type='str', required=True, aliases=['to']),
+        )),
+        subnet=dict(type='dict', options=dict(
+            network=dict(type='str', required=True),
+            mask=dict(type='str', required=True),
+        )),
+        gps=dict(type='dict', options=dict(
+            latitude=dict(type='int', required=True, aliases=['lat']),
+            longitude=dict(type='int', required=True, aliases=['lon']),
+            distance=dict(type='int', required=True, aliases=['d']),
+        )),
+        tag=dict(type='str'),
+    )
+
+
+def rule_match(params):
+    """The type and match fields of a rule from the module options."""
+    if params.get('ip_range'):
+        return dict(
+            type='IPAddressRange',
+            ipAddressRange=dict(
+                fromIp=params['ip_range']['from_ip'],
+                toIp=params['ip_range']['to_ip'],
+            )
+        )
+    if params.get('subnet'):
+        return dict(
+            type='Subnet',
+            subnet=dict(
+                networkAddress=params['subnet']['network'],
+                subnetMask=params['subnet']['mask'],
+            )
+        )
+    if params.get('gps'):
+        return dict(
+            type='GPSCoordinates',
+            gpsCoordinates=dict(
+                latitude=params['gps']['latitude'],
+                longitude=params['gps']['longitude'],
+                distance=params['gps']['distance'],
+            )
+        )
+    if params.get('tag'):
+        return dict(
+            type='ProvisionTag',
+            provisionTag=params['tag'],
+        )
+    return dict()
+
+
+def rule_payload(description, zone, params):
+    """Payload to create a rule adding the APs matched by `params` to `zone`."""
+    rule = dict(
+        description=description,
+        mobilityZone=dict(
+            id=zone['id'],
+            name=zone['name']
+        )
+    )
+    rule.update(rule_match(params))
+    return rule
+
+
+def rule_update(current, desired):
+    """Fields of the `desired` payload which differ from the `current` rule."""
+    update = dict()
+    if (current.get('mobilityZone') or {}).get('id') != desired['mobilityZone']['id']:
+        update['mobilityZone'] = desired['mobilityZone']
+    field = MATCH_FIELDS.get(desired.get('type'))
+    if field and (current.get('type') != desired['type'] or current.get(field) != desired[field]):
+        update['type'] = desired['type']
+        update[field] = desired[field]
+    return update
+
+
+def rule_interval(rule):
+    """The matched IPv4 addresses of a range or subnet rule as (first, last) integers, None for other rules."""
+    try:
+        if rule.get('type') == 'IPAddressRange':
+            first = int(ipaddress.IPv4Address(rule['ipAddressRange']['fromIp']))
+            last = int(ipaddress.IPv4Address(rule['ipAddressRange']['toIp']))
+            return (min(first, last), max(first, last))
+        if rule.get('type') == 'Subnet':
+            network = ipaddress.IPv4Network(f"{rule['subnet']['networkAddress']}/{rule['subnet']['subnetMask']}", strict=False)
+            return (int(network.network_address), int(network.broadcast_address))
+    except (KeyError, TypeError, ValueError):
+        pass
+    return None
+
+
+def rule_complete(rule):
+    """Whether a rule from the list view carries the zone and addresses to check it for overlaps."""
+    if rule.get('type') is not None and rule['type'] not in INTERVAL_TYPES:
+        return True
+    return bool(rule.get('mobilityZone')) and rule.get(MATCH_FIELDS.get(rule.get('type'))) is not None
+
+
+def priority_moves(order, target):
+    """Return the rules to raise by one priority step, in turn, to bring the rules from `order` into the `target` order.
+
+    Each step swaps a rule with the one above it, the rules are placed from
+    the top, so the number of steps is the number of pairs out of order.
+    """
+    order = list(order)
+    moves = []
+    for index, rule in enumerate(target):
+        if order[index] == rule:
+            continue
+        position = order.index(rule, index)
+        moves.extend([rule] * (position - index))
+        order.insert(index, order.pop(position))
+    return moves
+
+
+def find_overlaps(intervals):
+    """Return the overlapping pairs of a list of (first, last) intervals as (i, j) indexes with i < j.
+
+    A sweep over the intervals sorted by their start, which keeps the
+    intervals still open in a heap ordered by their end. This takes
+    O(n log n) plus the number of overlaps reported. None entries are ignored.
+    """
+    order = sorted((interval[0], interval[1], index) for index, interval in enumerate(intervals) if interval is not None)
+    active = []
+    overlaps = []
+    for first, last, index in order:
+        while active and active[0][0] < first:
+            heapq.heappop(active)
+        for end, other in active:
+            overlaps.append((min(index, other), max(index, other)))
+        heapq.heappush(active, (last, index))
+    return sorted(overlaps)
+
+
+def find_shadowed(intervals):
+    """Return a dict of the indexes of intervals covered by an interval with a lower index, to the index of that interval.
+
+    The list index is the rule priority. A sweep over the intervals sorted
+    by their start, longest first, with a Fenwick tree giving the longest
+    reaching interval among the higher priorities. This takes O(n log n).
+    None entries are ignored.
+    """
+    tree = [None] * (len(intervals) + 1)
+    shadowed = dict()
+    for first, negative_last, index in sorted(
+        (interval[0], -interval[1], index) for index, interval in enumerate(intervals) if interval is not None
+    ):
+        # Longest reaching interval with a lower index
+        best = None
+        position = index
+        while position > 0:
+            if tree[position] is not None and (best is None or tree[position] > best):
+                best = tree[position]
+            position -= position & -position
+        if best is not None and best[0] >= -negative_last:
+            shadowed[index] = -best[1]
+        position = index + 1
+        while position < len(tree):
+            if tree[position] is None or (-negative_last, -index) > tree[position]:
+                tree[position] = (-negative_last, -index)
+            position += position & -position
+    return shadowed
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+
+def iter_changes(before, after, ignore_none=False, recursive=True, path=()):
+    """Yield (path, old, new) for every value of `after` which differs from `before`.
+
+    With `ignore_none` a None in `after` means "leave as is" like in the
+    update logic of the modules and only the keys of `after` are looked at.
+    Otherwise keys missing on either side count as None. With `recursive`
+    nested dicts are compared key by key, everything else is compared by value.
+    """
+    if ignore_none:
+        keys = list(after)
+    else:
+        keys = list(before) + [key for key in after if key not in before]
+    for key in keys:
+        old = before.get(key)
+        new = after.get(key)
+        if new is None and ignore_none:
+            continue
+        if recursive and isinstance(old, dict) and isinstance(new, dict):
+            yield from iter_changes(old, new, ignore_none, recursive, path + (key,))
+        elif old != new:
+            yield path + (key,), old, new
+
+
+def update_values(current, desired):
+    """The not None values of `desired` differing from `current`."""
+    return dict(
+        (path[0], new)
+        for path, old, new in iter_changes(current, desired, ignore_none=True, recursive=False)
+    )
+
+
+def normalize(entry, defaults):
+    """`entry` with None and missing values set from `defaults` and nested lists in a stable order."""
+    entry = dict(defaults, **dict((key, value) for key, value in entry.items() if value is not None))
+    for key, value in entry.items():
+        if isinstance(value, list):
+            entry[key] = sorted(value, key=lambda item: json.dumps(item, sort_keys=True))
+    return entry
+
+
+def keyed_list_changes(current, desired, key, defaults=None, ignore=()):
+    """Return the sorted keys of the entries differing between the lists of dicts `current` and `desired`.
+
+    Entries are matched by their `key` value through a dict index, so the
+    order of the lists does not matter. Entries only in one of the lists
+    differ. Otherwise only the values of the `desired` entry are compared,
+    after both are normalized with `defaults`. The fields in `ignore`, like
+    secrets the controller does not return, are not compared.
+    """
+    defaults = defaults or dict()
+    current = dict((entry[key], normalize(entry, defaults)) for entry in current or [])
+    desired = dict(
+        (entry[key], normalize(dict((k, v) for k, v in entry.items() if k not in ignore), defaults))
+        for entry in desired or []
+    )
+    changes = set(current) ^ set(desired)
+    for name in set(current) & set(desired):
+        for change in iter_changes(current[name], desired[name], ignore_none=True):
+            changes.add(name)
+            break
+    return sorted(changes)
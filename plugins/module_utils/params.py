@@ -53,3 +53,70 @@ class ApBasicConfig:
         for key in self.options:
             if current is None or current.get(key) != self.options[key]:
                 update[key] = self.options[key]
+
+
+class ApRadioConfig:
+    RADIOS = ['radio24g', 'radio5g', 'radio5gLower', 'radio5gUpper', 'radio6g']
+
+    def __init__(self, options):
+        self.options = dict(
+            (radio, options[radio]['wlan_group'])
+            for radio in self.RADIOS
+            if options and options.get(radio) and options[radio].get('wlan_group')
+        )
+
+    @classmethod
+    def argument_spec(cls):
+        return dict(
+            (radio, dict(type='dict', default=None, options=dict(
+                wlan_group=dict(type='str'),
+            )))
+            for radio in cls.RADIOS
+        )
+
+    def wlan_groups(self):
+        return set(self.options.values())
+
+    def update(self, update, wlan_groups, current=None):
+        """Set the WLAN group ids from `wlan_groups` by name, only for the radios `current` has."""
+        for radio, wlan_group in self.options.items():
+            wlan_group_id = wlan_groups[wlan_group]['id']
+            if current is not None:
+                current_radio = (current.get('radioConfig') or {}).get(radio)
+                if current_radio is None or current_radio.get('wlanGroupId') == wlan_group_id:
+                    continue
+            update.setdefault('radioConfig', {}).setdefault(radio, {})['wlanGroupId'] = wlan_group_id
+
+
+class ApLanPorts:
+    PORTS = ['lan1', 'lan2', 'lan3', 'lan4', 'lan5']
+
+    def __init__(self, options):
+        self.options = dict((port, options[port]) for port in self.PORTS if options and options.get(port))
+
+    @classmethod
+    def argument_spec(cls):
+        return dict(
+            (port, dict(type='dict', default=None, options=dict(
+                enabled=dict(type='bool', default=True),
+                profile=dict(type='str'),
+            )))
+            for port in cls.PORTS
+        )
+
+    def profiles(self):
+        return set(port['profile'] for port in self.options.values() if port['profile'])
+
+    def update(self, config, profiles):
+        """Set the lan ports of an apmodel `config` in place, with the ethernet port profiles from `profiles` by name."""
+        for port in config['lanPorts']:
+            new_port = self.options.get(port['portName'].lower())
+            if not new_port:
+                continue
+            port['enabled'] = new_port['enabled']
+            if new_port['profile']:
+                profile = profiles[new_port['profile']]
+                port['ethPortProfile'] = dict(
+                    id=profile['id'],
+                    name=profile['name'],
+                )
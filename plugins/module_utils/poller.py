@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+
+
+class PollTimeout(Exception):
+    def __init__(self, msg, progress=None, history=None):
+        super(PollTimeout, self).__init__(msg)
+        self.progress = progress
+        self.history = history or []
+
+
+class Poller:
+    """Wait for an asynchronous controller operation within one module run.
+
+    `check` is called until it reports the operation as done. It returns a
+    tuple `(done, progress)`, where `progress` is a dict describing the
+    current state. A `percent` key in it lets the poller estimate the
+    remaining time.
+
+    The interval starts at `interval` and grows by `backoff` up to
+    `max_interval` while nothing changes. Whenever the progress changes the
+    interval starts over, or follows the estimated remaining time if there
+    is a `percent`. The whole wait never exceeds `timeout` seconds.
+    """
+
+    def __init__(self, timeout=600, interval=1.0, max_interval=30.0, backoff=2.0, on_progress=None):
+        self.timeout = timeout
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.backoff = backoff
+        self.on_progress = on_progress
+        self.polls = 0
+        self.history = []
+
+    def _next_interval(self, current, changed, elapsed, percent):
+        if changed and percent:
+            # Poll about when half of the estimated remaining time has passed
+            remaining = elapsed * (100 - percent) / percent
+            return min(self.max_interval, max(self.interval, remaining / 2))
+        if changed:
+            return self.interval
+        return min(self.max_interval, current * self.backoff)
+
+    def wait(self, check):
+        """Call `check` until it is done, return its last progress or raise PollTimeout."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        interval = self.interval
+        last = None
+        while True:
+            done, progress = check()
+            self.polls += 1
+            elapsed = time.monotonic() - start
+            changed = progress != last
+            if changed:
+                self.history.append(dict(progress, elapsed=round(elapsed, 1)))
+                if self.on_progress:
+                    self.on_progress(progress, elapsed)
+                last = progress
+            if done:
+                return progress
+
+            now = time.monotonic()
+            if now >= deadline:
+                raise PollTimeout(f"Operation did not finish within {self.timeout} seconds", progress, self.history)
+            interval = self._next_interval(interval, changed, elapsed, (progress or {}).get('percent'))
+            time.sleep(min(interval, deadline - now))
@@ -7,57 +7,230 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import json
+from contextlib import contextmanager
+
 from ansible.module_utils.connection import Connection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.diff import update_values
+
+EXPECTED_CODES = dict(
+    GET=200,
+    PATCH=204,
+    PUT=204,
+    POST=201,
+    DELETE=204,
+)
+PREFETCH_PAGES = 10
+QUERY_LIMIT = 1000
+
+
+class SmartZoneError(Exception):
+    """A request to the SmartZone controller did not return the expected status code."""
+
+    # Whether sending the same request again later may succeed
+    retryable = False
+
+    def __init__(self, msg, status_code=None, body=None):
+        super(SmartZoneError, self).__init__(msg)
+        self.status_code = status_code
+        self.body = body
+
+
+class NotFoundError(SmartZoneError):
+    pass
+
+
+class AuthError(SmartZoneError):
+    pass
+
+
+class ThrottledError(SmartZoneError):
+    retryable = True
+
+
+class TransportError(SmartZoneError):
+    """The controller could not be reached at all."""
+    retryable = True
+
+
+class ServerError(SmartZoneError):
+    pass
+
+
+def error_class(status_code):
+    if status_code == 0:
+        return TransportError
+    if status_code == 404:
+        return NotFoundError
+    if status_code in (401, 403):
+        return AuthError
+    if status_code in (429, 503):
+        return ThrottledError
+    if status_code >= 500:
+        return ServerError
+    return SmartZoneError
 
 
 class SmartZoneConnection:
+    # Let the connection return the response text undecoded and decode it
+    # here, instead of decoding, encoding and decoding it again.
+    raw_responses = True
+
     def __init__(self, module):
         self.module = module
         self._cli = Connection(self.module._socket_path)
+        self._raise_errors = False
 
-    def get(self, ressource, expected_code=200):
-        code, data = self._cli.send_request(None, ressource, method='GET')
+    def _response(self, method, ressource, code, data, expected_code):
+        """Decode the response text, raise a SmartZoneError if the status code is not the expected one."""
+        if self.raw_responses:
+            try:
+                data = json.loads(data) if data else {}
+            except ValueError:
+                # Error pages of proxies and load balancers are HTML, keep them as body of the error
+                if code == expected_code:
+                    raise SmartZoneError(f"{method} for '{ressource}' returned invalid JSON", status_code=code, body=data)
         if code != expected_code:
-            self.module.fail_json(msg=f"GET failed for '{ressource}'", status_code=code, body=data)
+            raise error_class(code)(f"{method} failed for '{ressource}'", status_code=code, body=data)
         return data
 
+    def _send_request(self, payload, ressource, method, cache=False):
+        if not self.raw_responses:
+            return self._cli.send_request(payload, path=ressource, method=method, cache=cache)
+        return self._cli.send_request(payload, path=ressource, method=method, raw=True, cache=cache)
+
+    def send(self, method, ressource, payload=None, expected_code=None, cache=False):
+        """Send a request and return the response, raise a SmartZoneError if the status code is not the expected one.
+
+        With `cache` a GET may be answered from the response cache of the connection, with `cache='refresh'`
+        the cached response is replaced.
+        """
+        code, data = self._send_request(payload, ressource, method=method, cache=cache)
+        return self._response(method, ressource, code, data, expected_code or EXPECTED_CODES[method])
+
+    @contextmanager
+    def raising(self):
+        """Raise the SmartZoneErrors of the requests in the block instead of failing the module."""
+        self._raise_errors = True
+        try:
+            yield
+        finally:
+            self._raise_errors = False
+
+    def fail(self, error):
+        if self._raise_errors:
+            raise error
+        self.module.fail_json(msg=str(error), status_code=error.status_code, body=error.body, error=type(error).__name__)
+
+    def get(self, ressource, expected_code=200, cache=False):
+        try:
+            return self.send('GET', ressource, None, expected_code=expected_code, cache=cache)
+        except SmartZoneError as e:
+            self.fail(e)
+
     def patch(self, ressource, payload, expected_code=204):
-        code, data = self._cli.send_request(payload, path=ressource, method='PATCH')
-        if code != expected_code:
-            self.module.fail_json(msg=f"PATCH failed for '{ressource}'", status_code=code, body=data)
-        return data
+        try:
+            return self.send('PATCH', ressource, payload, expected_code=expected_code)
+        except SmartZoneError as e:
+            self.fail(e)
 
     def put(self, ressource, payload, expected_code=204):
-        code, data = self._cli.send_request(payload, path=ressource, method='PUT')
-        if code != expected_code:
-            self.module.fail_json(msg=f"PUT failed for '{ressource}'", status_code=code, body=data)
-        return data
+        try:
+            return self.send('PUT', ressource, payload, expected_code=expected_code)
+        except SmartZoneError as e:
+            self.fail(e)
 
     def post(self, ressource, payload, expected_code=201):
-        code, data = self._cli.send_request(payload, path=ressource, method='POST')
-        if code != expected_code:
-            self.module.fail_json(msg=f"POST failed for '{ressource}'", status_code=code, body=data)
-        return data
+        try:
+            return self.send('POST', ressource, payload, expected_code=expected_code)
+        except SmartZoneError as e:
+            self.fail(e)
 
     def delete(self, ressource, expected_code=204):
-        code, data = self._cli.send_request(None, path=ressource, method='DELETE')
-        if code != expected_code:
-            self.module.fail_json(msg=f"DELETE failed for '{ressource}'", status_code=code, body=data)
-        return data
+        try:
+            return self.send('DELETE', ressource, None, expected_code=expected_code)
+        except SmartZoneError as e:
+            self.fail(e)
+
+    def batch(self, requests, concurrency=None, cache=False):
+        """Send (method, ressource, payload[, expected_code]) requests in one round trip, return their data in order.
+
+        The requests are sent concurrently by the connection, so they must not depend on each other.
+        With `cache` the GETs may be answered from the response cache of the connection.
+        """
+        requests = list(requests)
+        expected = [request[3] if len(request) > 3 else EXPECTED_CODES[request[0]] for request in requests]
+        requests = [tuple(request[:3]) for request in requests]
+        if not requests:
+            return []
+        if self.raw_responses:
+            results = self._cli.send_batch(requests, concurrency=concurrency, raw=True, cache=cache)
+        else:
+            results = self._cli.send_batch(requests, concurrency=concurrency, cache=cache)
+        try:
+            return [
+                self._response(method, ressource, code, data, expected_code)
+                for (method, ressource, payload), expected_code, (code, data) in zip(requests, expected, results)
+            ]
+        except SmartZoneError as e:
+            self.fail(e)
 
-    def retrive_list(self, ressource):
+    def retrive_list(self, ressource, prefetch=False, concurrency=None, cache=False):
+        """Iterate over all items of a paged list.
+
+        With `prefetch` all remaining pages are requested at once as soon as the first page tells the total count.
+        With `cache` the pages may be answered from the response cache of the connection.
+        """
         index = 0
         while True:
             if '?' in ressource:
                 path = f"{ressource}&index={index}"
             else:
                 path = f"{ressource}?index={index}"
-            page = self.get(path)
+            page = self.get(path, cache=cache)
             yield from page['list']
-            if not page['hasMore']:
+            if not page['hasMore'] or not page['list']:
                 return
             index += len(page['list'])
 
+            if prefetch and page.get('totalCount'):
+                sep = '&' if '?' in ressource else '?'
+                size = len(page['list'])
+                indexes = list(range(index, page['totalCount'], size))
+                # Fetch a window of pages per round trip to keep the memory bounded
+                for start in range(0, len(indexes), PREFETCH_PAGES):
+                    pages = self.batch([
+                        ('GET', f"{ressource}{sep}index={i}&listSize={size}", None)
+                        for i in indexes[start:start + PREFETCH_PAGES]
+                    ], concurrency=concurrency, cache=cache)
+                    for page in pages:
+                        yield from page['list']
+                return
+
+    def retrive_lists(self, ressources, concurrency=None, select=None):
+        """Return the items of several paged lists as a dict by ressource.
+
+        The first pages of all lists are requested in one batch, the remaining pages in further batches.
+        With `select` only the items it returns True for are kept.
+        """
+        ressources = list(ressources)
+        items = dict()
+        more = []
+        for ressource, page in zip(ressources, self.batch([('GET', ressource, None) for ressource in ressources], concurrency=concurrency)):
+            items[ressource] = [item for item in page['list'] if select is None or select(item)]
+            if page['hasMore'] and page['list']:
+                size = len(page['list'])
+                more.extend((ressource, index, size) for index in range(size, page['totalCount'], size))
+        for start in range(0, len(more), PREFETCH_PAGES):
+            window = more[start:start + PREFETCH_PAGES]
+            pages = self.batch([
+                ('GET', f"{ressource}{'&' if '?' in ressource else '?'}index={index}&listSize={size}", None)
+                for ressource, index, size in window
+            ], concurrency=concurrency)
+            for (ressource, index, size), page in zip(window, pages):
+                items[ressource].extend(item for item in page['list'] if select is None or select(item))
+        return items
+
     def retrive_by_name(self, ressource, name, required=False, **kwargs):
         for item in self.retrive_list(ressource, **kwargs):
             if item['name'] == name:
@@ -66,12 +239,23 @@ class SmartZoneConnection:
             self.module.fail_json(msg=f"Could not find ressource '{ressource}' with name '{name}'.")
         return None
 
+    def retrive_by_names(self, ressource, names, required=False):
+        """Like retrive_by_name for several names with a single pass over the list, return a dict by name."""
+        names = set(n for n in names if n)
+        ids = {}
+        if names:
+            for item in self.retrive_list(ressource, prefetch=True):
+                if item['name'] in names:
+                    ids.setdefault(item['name'], item['id'])
+        if required and names - set(ids):
+            missing = ', '.join(sorted(names - set(ids)))
+            self.module.fail_json(msg=f"Could not find ressource '{ressource}' with name '{missing}'.")
+
+        details = self.batch([('GET', f"{ressource.split('?')[0]}/{id}", None) for id in ids.values()])
+        return dict(zip(ids, details))
+
     def update_dict(self, current, **kwargs):
-        return {
-            key: kwargs[key]
-            for key in kwargs
-            if kwargs[key] is not None and current[key] != kwargs[key]
-        }
+        return update_values(current, kwargs)
 
     def retrive_groups_by_wlan(self, wlan):
         groups = []
@@ -81,23 +265,88 @@ class SmartZoneConnection:
         return groups
 
     def retrive_users_by_name(self, name, required=False):
-        query = dict(
-            fullTextSearch=dict(
-                type="OR",
-                value=name,
-                fields=["userName"]
-            )
-        )
-        users = self.post('users/query', payload=query, expected_code=200)
-
-        for user in users['list']:
-            if user['userName'] == name:
-                return user
-        if required:
+        user = next(self.query('users/query', search=name, fields=['userName'], exact=True), None)
+        if user is None and required:
             self.module.fail_json(msg=f"Could not find user '{name}'.")
-        return None
+        return user
+
+    def query(self, ressource, search=None, fields=None, filters=None, sort=None, limit=QUERY_LIMIT, exact=False,
+              prefetch=False, concurrency=None):
+        """Iterate over all items found by a query endpoint like `users/query`, page by page.
+
+        `search` is a full text search in the `fields` of the items, `filters` and `sort` are the
+        filters and sortInfo of the query. With `exact` only the first item with one of the `fields`
+        equal to `search` is returned, without reading the remaining pages, `exact` requires `fields`.
+        With `prefetch` all remaining pages are requested at once as soon as the first page tells the total count.
+        """
+        if exact and not fields:
+            raise ValueError('An exact query requires the fields to compare')
+        query = dict(page=1, limit=limit)
+        if search is not None:
+            query['fullTextSearch'] = dict(type='OR', value=search, fields=fields or [])
+        if filters is not None:
+            query['filters'] = filters
+        if sort:
+            query['sortInfo'] = sort
+
+        for page in self._query_pages(ressource, query, prefetch, concurrency):
+            for item in page['list']:
+                if not exact:
+                    yield item
+                elif any(item.get(field) == search for field in fields):
+                    yield item
+                    return
+
+    def _query_pages(self, ressource, query, prefetch, concurrency):
+        while True:
+            page = self.post(ressource, payload=query, expected_code=200)
+            yield page
+            if not page.get('hasMore') or not page['list']:
+                return
+
+            if prefetch and page.get('totalCount'):
+                pages = list(range(query['page'] + 1, (page['totalCount'] + query['limit'] - 1) // query['limit'] + 1))
+                # Fetch a window of pages per round trip to keep the memory bounded
+                for start in range(0, len(pages), PREFETCH_PAGES):
+                    yield from self.batch([
+                        ('POST', ressource, dict(query, page=p), 200)
+                        for p in pages[start:start + PREFETCH_PAGES]
+                    ], concurrency=concurrency)
+                return
+            query['page'] += 1
+
+    def query_aps(self, filters=None, macs=None, limit=QUERY_LIMIT, concurrency=None):
+        """Iterate over the status records of the APs matching the `filters` or `macs` with query/ap.
+
+        The full text search matches substrings of a single value, so each of the `macs` is searched
+        on its own, all in one batch, and only the APs with exactly that MAC are returned.
+        """
+        if not macs:
+            yield from self.query('query/ap', filters=filters or [], limit=limit)
+            return
+        pages = self.batch([
+            ('POST', 'query/ap', dict(page=1, limit=limit, filters=filters or [],
+                                      fullTextSearch=dict(type='OR', value=mac, fields=['apMac'])), 200)
+            for mac in macs
+        ], concurrency=concurrency)
+        for mac, page in zip(macs, pages):
+            for ap in page['list']:
+                if ap['apMac'].upper() == mac.upper():
+                    yield ap
 
     @property
     def domainId(self):
         session = self.get('session')
         return session['domainId']
+
+    def retrive_domains(self, names):
+        """Return the ids of the domains `names` as a dict by name, all domains if `names` contains '*'."""
+        domains = dict()
+        for domain in self.retrive_list('domains?recursively=true', prefetch=True):
+            domains.setdefault(domain['name'], domain['id'])
+        if '*' in names:
+            return domains
+        missing = [name for name in names if name not in domains]
+        if missing:
+            self.module.fail_json(msg=f"Could not find domains {', '.join(missing)}.")
+        return dict((name, domains[name]) for name in names)
@@ -15,7 +15,10 @@ module: admingroup
 
 short_description: Manage admin group
 
-description: Manage SmartZone admin groups.
+description:
+    - Manage SmartZone admin groups.
+    - The permissions of the I(role) and the account security profiles are read from the response
+      cache of the connection if its C(cache_ttl) option is set.
 
 options:
     name:
@@ -172,7 +175,7 @@ def main():
     if state == 'present':
         # Role vs permissions
         if role:
-            permissions = conn.retrive_list(f"userGroups/roles/{role}/permissions")
+            permissions = conn.retrive_list(f"userGroups/roles/{role}/permissions", cache=True)
             permissions = [{'access': p['access'], 'resource': p['resource']} for p in permissions]
         else:
             role = 'CUSTOM'
@@ -180,9 +183,13 @@ def main():
         # Resolve SecurityProfile
         accountSecurityProfileId = None
         pname = module.params.get('security_profile')
-        for p in conn.retrive_list('accountSecurity'):
-            if p['name'] == pname:
-                accountSecurityProfileId = p['id']
+        # A profile created after the list was cached is only found in a fresh list
+        for cache in (True, 'refresh'):
+            for p in conn.retrive_list('accountSecurity', cache=cache):
+                if p['name'] == pname:
+                    accountSecurityProfileId = p['id']
+                    break
+            if accountSecurityProfileId:
                 break
         if not accountSecurityProfileId:
             module.fail_json(msg=f"AccountSecurityProfile '{pname}' not found")
@@ -204,20 +211,10 @@ def main():
                 for u in users['set']
             ]
 
-    query = dict(
-        fullTextSearch=dict(
-            type="OR",
-            value=name,
-            fields=["name"]
-        )
-    )
-    groups = conn.post('userGroups/query', payload=query, expected_code=200)
-
-    current_group = None
-    for group in groups['list']:
-        if group['name'] == name:
-            current_group = conn.get(f"userGroups/{group['id']}?includeUsers=True")
-            result['group'] = current_group
+    current_group = next(conn.query('userGroups/query', search=name, fields=['name'], exact=True), None)
+    if current_group is not None:
+        current_group = conn.get(f"userGroups/{current_group['id']}?includeUsers=True")
+        result['group'] = current_group
 
     # Create
     if current_group is None and state == 'present':
@@ -86,19 +86,9 @@ def main():
     password = module.params.get('password')
 
     # Get current user
-    query = dict(
-        fullTextSearch=dict(
-            type="OR",
-            value=name,
-            fields=["userName"]
-        )
-    )
-    users = conn.post('users/query', payload=query, expected_code=200)
-    current_user = None
-    for user in users['list']:
-        if user['userName'] == name:
-            current_user = user
-            result['user'] = user
+    current_user = conn.retrive_users_by_name(name)
+    if current_user is not None:
+        result['user'] = current_user
 
     # Create
     if current_user is None and state == 'present':
@@ -122,7 +112,7 @@ def main():
         update_user = dict(id=current_user['id'])
         for key in ['realName', 'phone', 'email', 'title']:
             value = module.params.get(key)
-            if value and user[key] != value:
+            if value and current_user[key] != value:
                 update_user[key] = value
 
         if len(update_user) > 1:
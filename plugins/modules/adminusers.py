@@ -0,0 +1,231 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: adminusers
+
+short_description: Manage many admin users
+
+description:
+    - Manage a list of SmartZone admin users in a single task, for example from a directory export.
+    - The current users are read with one paged query. Only the users which differ are created, updated or deleted,
+      with up to I(concurrency) requests at the same time.
+
+options:
+    users:
+        description: The admin users, see M(scsitteam.smartzone.adminuser).
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+            name:
+                description: Name of the admin user.
+                required: True
+                type: str
+            realName:
+                description: Realname of the admin user.
+                type: str
+            phone:
+                description: Phone number of the admin user.
+                type: str
+            email:
+                description: Email address of the admin user.
+                type: str
+            title:
+                description: Title of the admin user.
+                type: str
+            password:
+                description: Initial password of the admin user, required to create it.
+                type: str
+            state:
+                description: Desired state of the admin user.
+                type: str
+                default: present
+                choices: ['present', 'absent']
+    purge:
+        description: Delete the admin users not in I(users), except the C(admin) user and the user of the session.
+        type: bool
+        default: false
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Sync the Admin Users with the HR export
+  adminusers:
+    users: "{{ lookup('ansible.builtin.file', 'admins.json') | from_json }}"
+    purge: true
+
+- name: Off-board Admin Users
+  adminusers:
+    users:
+      - name: Bob
+        state: absent
+      - name: Carol
+        state: absent
+'''
+
+RETURN = r'''
+created:
+    description: Names of the created admin users.
+    returned: always
+    type: list
+    elements: str
+updated:
+    description: Names of the updated admin users.
+    returned: always
+    type: list
+    elements: str
+deleted:
+    description: Names of the deleted admin users.
+    returned: always
+    type: list
+    elements: str
+unchanged:
+    description: Number of admin users already as desired.
+    returned: always
+    type: int
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+
+FIELDS = ['realName', 'phone', 'email', 'title']
+
+
+def main():
+    argument_spec = dict(
+        users=dict(type='list', elements='dict', required=True, options=dict(
+            name=dict(type='str', required=True),
+            realName=dict(type='str'),
+            phone=dict(type='str'),
+            email=dict(type='str'),
+            title=dict(type='str'),
+            password=dict(type='str', no_log=True),
+            state=dict(default='present', choices=['present', 'absent']),
+        )),
+        purge=dict(type='bool', default=False),
+        concurrency=dict(type='int', default=4),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False, created=[], updated=[], deleted=[], unchanged=0)
+
+    # Params
+    users = module.params.get('users')
+    purge = module.params.get('purge')
+    concurrency = max(1, module.params.get('concurrency'))
+
+    names = set()
+    duplicates = set()
+    for user in users:
+        if user['name'] in names:
+            duplicates.add(user['name'])
+        names.add(user['name'])
+    duplicates = sorted(duplicates)
+    if duplicates:
+        module.fail_json(msg=f"Duplicate admin user names {', '.join(duplicates)}.")
+
+    # Get current users
+    current = dict()
+    for user in conn.query('users/query', prefetch=True, concurrency=concurrency):
+        current.setdefault(user['userName'], user)
+
+    # Plan
+    creates = []
+    updates = []
+    deletes = []
+    missing_passwords = []
+    for user in users:
+        current_user = current.get(user['name'])
+        if user['state'] == 'absent':
+            if current_user is not None:
+                deletes.append(current_user)
+            continue
+
+        if current_user is None:
+            if not user['password']:
+                missing_passwords.append(user['name'])
+                continue
+            new_user = dict(
+                userName=user['name'],
+                newPassphrase=user['password'],
+            )
+            for key in FIELDS:
+                if user[key]:
+                    new_user[key] = user[key]
+            creates.append(new_user)
+            continue
+
+        update_user = dict()
+        for key in FIELDS:
+            if user[key] and current_user.get(key) != user[key]:
+                update_user[key] = user[key]
+        if update_user:
+            updates.append((current_user, update_user))
+        else:
+            result['unchanged'] += 1
+    if missing_passwords:
+        module.fail_json(msg=f"Password required to create admin users {', '.join(missing_passwords)}.")
+    purges = [user for name, user in current.items() if name not in names and name != 'admin'] if purge else []
+    if purges:
+        # Never delete the user the playbook is logged in as
+        admin_id = conn.get('session')['adminId']
+        deletes.extend(user for user in purges if user['id'] != admin_id)
+
+    result['created'] = [user['userName'] for user in creates]
+    result['updated'] = [user['userName'] for user, update_user in updates]
+    result['deleted'] = [user['userName'] for user in deletes]
+    result['changed'] = bool(creates or updates or deletes)
+
+    # Diff
+    if result['changed'] and module._diff:
+        result['diff'] = dict(
+            before=dict((user['userName'], user) for user in deletes),
+            after=dict(
+                (user['userName'], dict((k, v) for k, v in user.items() if k != 'newPassphrase'))
+                for user in creates
+            ),
+        )
+        for user, update_user in updates:
+            result['diff']['before'][user['userName']] = user
+            result['diff']['after'][user['userName']] = dict(user, **update_user)
+
+    if module.check_mode:
+        module.exit_json(**result)
+
+    # Delete
+    conn.batch([('DELETE', f"users/{user['id']}", None) for user in deletes], concurrency=concurrency)
+
+    # Update
+    conn.batch([
+        ('PATCH', f"users/{user['id']}", dict(update_user, id=user['id']))
+        for user, update_user in updates
+    ], concurrency=concurrency)
+
+    # Create
+    conn.batch([('POST', 'users', new_user) for new_user in creates], concurrency=concurrency)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -53,7 +53,7 @@ EXAMPLES = r'''
 import copy
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import AuthError, NotFoundError, SmartZoneConnection, SmartZoneError
 
 
 def main():
@@ -80,9 +80,15 @@ def main():
     state = module.params.get('state')
 
     # Get current group
-    code, current_ap = conn._cli.send_request(None, f"aps/{mac}", method='GET')
-    if code == 403 and state == 'keep':
-        module.exit_json(skipped=True, msg=f"Access Point {mac} not found.", **result)
+    try:
+        current_ap = conn.send('GET', f"aps/{mac}")
+    except (NotFoundError, AuthError) as e:
+        # SmartZone answers 403 for unknown access points
+        if e.status_code in (403, 404) and state == 'keep':
+            module.exit_json(skipped=True, msg=f"Access Point {mac} not found.", **result)
+        conn.fail(e)
+    except SmartZoneError as e:
+        conn.fail(e)
 
     # Resolve Zone and Group
     if zone:
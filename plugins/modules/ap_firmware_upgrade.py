@@ -0,0 +1,242 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: ap_firmware_upgrade
+
+short_description: Rolling AP firmware upgrade of SmartZone zones
+
+description:
+    - Upgrade the AP firmware of several zones in batches.
+    - The zones of a batch are upgraded at the same time. The next batch is started once the
+      APs of every zone in the batch are back online on the new firmware, or at least
+      I(health_threshold) percent of them.
+    - Only the APs online before the upgrade of their zone are expected back, APs already offline are ignored.
+    - The upgrade is aborted when more than I(max_failure_rate) percent of the upgraded APs
+      did not come back. APs back online on another firmware count as failed on every poll,
+      APs still offline once the batch is done or timed out.
+    - Zones already on the target firmware are skipped.
+
+options:
+    firmware:
+        description: AP firmware version to upgrade to.
+        type: str
+        required: true
+    zones:
+        description: Names of the zones to upgrade, in order.
+        type: list
+        elements: str
+        required: true
+    batch_size:
+        description: Number of zones upgraded at the same time.
+        type: int
+        default: 1
+    health_threshold:
+        description: Percentage of the APs of a zone that has to be online on the new firmware before moving on.
+        type: float
+        default: 100
+    max_failure_rate:
+        description: Abort when more than this percentage of the upgraded APs failed.
+        type: float
+        default: 10
+    timeout:
+        description: Seconds to wait for the APs of one batch.
+        type: int
+        default: 3600
+    poll_interval:
+        description: Seconds between the first AP status polls, the interval adapts to the progress.
+        type: float
+        default: 10
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Upgrade the branch zones two at a time
+  ap_firmware_upgrade:
+    firmware: 6.1.2.0.200
+    zones:
+      - Branch-Bern
+      - Branch-Basel
+      - Branch-Zurich
+    batch_size: 2
+    health_threshold: 95
+    max_failure_rate: 5
+'''
+
+RETURN = r'''
+zones:
+    description: Outcome per zone, in the order of I(zones).
+    returned: always
+    type: list
+    elements: dict
+    contains:
+        name:
+            description: Name of the zone.
+            type: str
+        firmware:
+            description: AP firmware of the zone before the upgrade.
+            type: str
+        state:
+            description: One of C(upgraded), C(failed), C(skipped), C(planned) or C(not_started).
+            type: str
+        aps:
+            description: Number of APs of the zone online before the upgrade.
+            type: int
+        healthy:
+            description: Number of APs online on the new firmware.
+            type: int
+failure_rate:
+    description: Percentage of the upgraded APs which failed.
+    returned: always
+    type: float
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.poller import Poller, PollTimeout
+
+
+def online_aps(conn, zone):
+    """Return the MACs of the APs of `zone` which are online."""
+    return set(ap['apMac'] for ap in conn.query_aps(filters=[dict(type='ZONE', value=zone['id'])]) if ap['status'] == 'Online')
+
+
+def zone_health(conn, zone, firmware, macs, rebooted):
+    """Count the APs `macs` online on `firmware` and those back online on another firmware.
+
+    `rebooted` collects the APs seen offline since the upgrade started, only those can be back.
+    """
+    healthy = failed = 0
+    for ap in conn.query_aps(filters=[dict(type='ZONE', value=zone['id'])]):
+        if ap['apMac'] not in macs:
+            continue
+        if ap['status'] != 'Online':
+            rebooted.add(ap['apMac'])
+        elif ap.get('firmwareVersion') == firmware:
+            healthy += 1
+        elif ap['apMac'] in rebooted:
+            failed += 1
+    return len(macs), healthy, failed
+
+
+def main():
+    argument_spec = dict(
+        firmware=dict(type='str', required=True),
+        zones=dict(type='list', elements='str', required=True),
+        batch_size=dict(type='int', default=1),
+        health_threshold=dict(type='float', default=100),
+        max_failure_rate=dict(type='float', default=10),
+        timeout=dict(type='int', default=3600),
+        poll_interval=dict(type='float', default=10),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False, zones=[], failure_rate=0.0)
+
+    # Params
+    firmware = module.params.get('firmware')
+    zone_names = module.params.get('zones')
+    batch_size = max(1, module.params.get('batch_size'))
+    health_threshold = module.params.get('health_threshold')
+    max_failure_rate = module.params.get('max_failure_rate')
+    timeout = module.params.get('timeout')
+    poll_interval = module.params.get('poll_interval')
+
+    # Resolve Zones
+    zones_by_name = dict()
+    for zone in conn.retrive_list('rkszones', prefetch=True):
+        if zone['name'] in zone_names:
+            zones_by_name.setdefault(zone['name'], zone)
+    missing = [name for name in zone_names if name not in zones_by_name]
+    if missing:
+        module.fail_json(msg=f"Could not find zones {', '.join(missing)}.")
+    zones = [zones_by_name[name] for name in dict.fromkeys(zone_names)]
+
+    # Current firmware
+    for zone, current in zip(zones, conn.batch([('GET', f"rkszones/{zone['id']}/apFirmware", None) for zone in zones])):
+        zone['firmware'] = current['firmwareVersion']
+        if current['firmwareVersion'] != firmware and firmware not in [v['firmwareVersion'] for v in current.get('supportedVersions') or []]:
+            module.fail_json(msg=f"Firmware {firmware} is not available for zone '{zone['name']}'.")
+
+    outcome = dict(
+        (zone['id'], dict(name=zone['name'], firmware=zone['firmware'], state='skipped' if zone['firmware'] == firmware else 'planned'))
+        for zone in zones
+    )
+    result['zones'] = list(outcome.values())
+    pending = [zone for zone in zones if zone['firmware'] != firmware]
+    if not pending:
+        module.exit_json(**result)
+    result['changed'] = True
+    if module.check_mode:
+        module.exit_json(**result)
+
+    # Upgrade
+    for zone in pending:
+        outcome[zone['id']]['state'] = 'not_started'
+    upgraded_aps = failed_aps = 0
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        # Only the APs online before the upgrade are expected back
+        macs = dict((zone['id'], online_aps(conn, zone)) for zone in batch)
+        rebooted = set()
+        conn.batch([('PUT', f"rkszones/{zone['id']}/apFirmware", dict(firmwareVersion=firmware)) for zone in batch], concurrency=batch_size)
+
+        def check():
+            health = dict((zone['id'], zone_health(conn, zone, firmware, macs[zone['id']], rebooted)) for zone in batch)
+            aps = sum(h[0] for h in health.values())
+            healthy = sum(h[1] for h in health.values())
+            failed = sum(h[2] for h in health.values())
+            failure_rate = round((failed_aps + failed) * 100 / (upgraded_aps + aps), 1) if upgraded_aps + aps else 0.0
+            done = all(not h[0] or h[1] * 100 >= h[0] * health_threshold for h in health.values())
+            return done or failure_rate > max_failure_rate, dict(
+                health=health,
+                percent=round(healthy * 100 / aps, 1) if aps else 100,
+                failure_rate=failure_rate,
+            )
+
+        poller = Poller(timeout=timeout, interval=poll_interval, max_interval=max(poll_interval, 60))
+        try:
+            progress = poller.wait(check)
+            timed_out = False
+        except PollTimeout as e:
+            progress = e.progress
+            timed_out = True
+
+        health = progress['health']
+        for zone in batch:
+            aps, healthy, failed = health[zone['id']]
+            outcome[zone['id']].update(
+                aps=aps,
+                healthy=healthy,
+                state='upgraded' if not aps or healthy * 100 >= aps * health_threshold else 'failed',
+            )
+        aborted = progress['failure_rate'] > max_failure_rate
+        upgraded_aps += sum(h[0] for h in health.values())
+        # When aborted while polling, the APs not back yet are not counted as failed
+        failed_aps += sum(h[2] if aborted else h[0] - h[1] for h in health.values())
+        result['failure_rate'] = round(failed_aps * 100 / upgraded_aps, 1) if upgraded_aps else 0.0
+
+        if result['failure_rate'] > max_failure_rate:
+            module.fail_json(msg=f"Aborted, {result['failure_rate']}% of the upgraded APs failed.", **result)
+        if timed_out:
+            module.fail_json(msg=f"APs of {', '.join(z['name'] for z in batch)} did not reach {health_threshold}% health within {timeout} seconds.", **result)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
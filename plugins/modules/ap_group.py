@@ -90,25 +90,15 @@ import copy
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
-from ansible_collections.scsitteam.smartzone.plugins.module_utils.params import ApBasicConfig
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.params import ApBasicConfig, ApRadioConfig
 
 
 def main():
-    argument_spec_radio = dict(type='dict', default=None, options=dict(
-        wlan_group=dict(type='str'),
-    ))
-
     argument_spec = ApBasicConfig.argument_spec()
     argument_spec.update(dict(
         zone=dict(type='str', required=True),
         name=dict(type='str', required=True),
-        radio_config=dict(type='dict', default=None, options=dict(
-            radio24g=argument_spec_radio,
-            radio5g=argument_spec_radio,
-            radio5gLower=argument_spec_radio,
-            radio5gUpper=argument_spec_radio,
-            radio6g=argument_spec_radio,
-        )),
+        radio_config=dict(type='dict', default=None, options=ApRadioConfig.argument_spec()),
         state=dict(type='str', default='present', choices=['present', 'absent']),
     ))
 
@@ -123,7 +113,7 @@ def main():
     # Params
     zone = module.params.get('zone')
     name = module.params.get('name')
-    radio_config = module.params.get('radio_config')
+    radio_config = ApRadioConfig(module.params.get('radio_config'))
     ap_basic_config = ApBasicConfig(module.params)
     state = module.params.get('state')
 
@@ -134,47 +124,29 @@ def main():
     current_group = conn.retrive_by_name(f"rkszones/{zone['id']}/apgroups", name)
     result['current_group'] = current_group
 
+    # Resolve WLAN Groups
+    wlan_groups = {}
+    if state == 'present' and radio_config.wlan_groups():
+        wlan_groups = conn.retrive_by_names(f"rkszones/{zone['id']}/wlangroups", radio_config.wlan_groups(), required=True)
+
     # Create
     if current_group is None and state == 'present':
         new_group = dict(
             name=name
         )
         ap_basic_config.update(new_group)
-
-        for rtype in radio_config:
-            if not radio_config[rtype]:
-                continue
-            if radio_config[rtype]['wlan_group']:
-                group = conn.retrive_by_name(f"rkszones/{zone['id']}/wlangroups", radio_config[rtype]['wlan_group'], required=True)
-                if 'radioConfig' not in new_group:
-                    new_group['radioConfig'] = {}
-                if rtype not in new_group['radioConfig']:
-                    new_group['radioConfig'][rtype] = {}
-                new_group['radioConfig'][rtype]['wlanGroupId'] = group['id']
+        radio_config.update(new_group, wlan_groups)
 
         result['changed'] = True
         if not module.check_mode:
-            conn.post(f"rkszones/{zone['id']}/apgroups", payload=new_group)
-            new_group = conn.retrive_by_name(f"rkszones/{zone['id']}/apgroups", name)
+            resp = conn.post(f"rkszones/{zone['id']}/apgroups", payload=new_group)
+            new_group = conn.get(f"rkszones/{zone['id']}/apgroups/{resp['id']}")
 
     # Update
     elif state == 'present':
         update_group = dict()
         ap_basic_config.update(update_group, current_group)
-
-        for rtype in radio_config:
-            if not radio_config[rtype]:
-                continue
-            if rtype not in current_group['radioConfig']:
-                continue
-            if radio_config[rtype]['wlan_group']:
-                group = conn.retrive_by_name(f"rkszones/{zone['id']}/wlangroups", radio_config[rtype]['wlan_group'], required=True)
-                if current_group['radioConfig'][rtype]['wlanGroupId'] != group['id']:
-                    if 'radioConfig' not in update_group:
-                        update_group['radioConfig'] = {}
-                    if rtype not in update_group['radioConfig']:
-                        update_group['radioConfig'][rtype] = {}
-                    update_group['radioConfig'][rtype]['wlanGroupId'] = group['id']
+        radio_config.update(update_group, wlan_groups, current_group)
 
         if update_group:
             result['changed'] = True
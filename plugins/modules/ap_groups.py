@@ -0,0 +1,265 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: ap_groups
+
+short_description: Manage all ap groups of a zone
+
+description:
+    - Ensure a list of ap groups of a zone in a single task.
+    - The ap groups and WLAN groups of the zone are read once. Only the ap groups which differ are
+      created, updated or deleted, with up to I(concurrency) requests at the same time.
+
+options:
+    zone:
+        description: Zone zo mange groups in
+        type: str
+        required: true
+    groups:
+        description: The ap groups, see M(scsitteam.smartzone.ap_group).
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+            name:
+                description: AP group name
+                type: str
+                required: true
+            location:
+                description: String to describe the location
+                type: str
+            location_additional:
+                description: String twith additional information to describe the location
+                type: str
+            latitude:
+                description: Latitude coordinate (in decimal format)
+                type: float
+            longitude:
+                description: Longitude coordinate (in decimal format)
+                type: float
+            altitude:
+                description: Altitude information
+                type: dict
+                suboptions:
+                    unit:
+                        description: Unit of the altitude value.
+                        type: str
+                        default: meters
+                        choices: [meters, floor]
+                    value:
+                        description: Altitude
+                        type: int
+            radio_config:
+                description: Ap group radio config
+                type: dict
+                suboptions:
+                    radio24g:
+                        description: Config for 2.4G radios
+                        type: dict
+                        suboptions:
+                            wlan_group:
+                                description: WLan group
+                                type: str
+                    radio5g:
+                        description: Config for 5G radios
+                        type: dict
+                        suboptions:
+                            wlan_group:
+                                description: WLan group
+                                type: str
+                    radio5gLower:
+                        description: Config for lower 5G radios
+                        type: dict
+                        suboptions:
+                            wlan_group:
+                                description: WLan group
+                                type: str
+                    radio5gUpper:
+                        description: Config for upper 5G radios
+                        type: dict
+                        suboptions:
+                            wlan_group:
+                                description: WLan group
+                                type: str
+                    radio6g:
+                        description: Config for 6G radios
+                        type: dict
+                        suboptions:
+                            wlan_group:
+                                description: WLan group
+                                type: str
+    purge:
+        description: Delete the ap groups not in I(groups), except the default group.
+        type: bool
+        default: false
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Setup the Ap Groups of the Campus
+  ap_groups:
+    zone: Campus
+    groups:
+      - name: Building A
+        location: Building A
+        radio_config:
+          radio24g:
+            wlan_group: Campus
+          radio5g:
+            wlan_group: Campus
+      - name: Building B
+        location: Building B
+    purge: true
+'''
+
+RETURN = r'''
+created:
+    description: Names of the created ap groups.
+    returned: always
+    type: list
+    elements: str
+updated:
+    description: Names of the updated ap groups.
+    returned: always
+    type: list
+    elements: str
+deleted:
+    description: Names of the deleted ap groups.
+    returned: always
+    type: list
+    elements: str
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.params import ApBasicConfig, ApRadioConfig
+
+
+def main():
+    group_spec = ApBasicConfig.argument_spec()
+    group_spec.update(dict(
+        name=dict(type='str', required=True),
+        radio_config=dict(type='dict', default=None, options=ApRadioConfig.argument_spec()),
+    ))
+    argument_spec = dict(
+        zone=dict(type='str', required=True),
+        groups=dict(type='list', elements='dict', required=True, options=group_spec,
+                    required_together=ApBasicConfig.required_together()),
+        purge=dict(type='bool', default=False),
+        concurrency=dict(type='int', default=4),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False, created=[], updated=[], deleted=[])
+
+    # Params
+    zone = module.params.get('zone')
+    groups = module.params.get('groups')
+    purge = module.params.get('purge')
+    concurrency = max(1, module.params.get('concurrency'))
+
+    names = [group['name'] for group in groups]
+    duplicates = sorted(set(name for name in names if names.count(name) > 1))
+    if duplicates:
+        module.fail_json(msg=f"Duplicate ap group names {', '.join(duplicates)}.")
+
+    # Resolve Zone
+    zone = conn.retrive_by_name('rkszones', zone, required=True, prefetch=True, concurrency=concurrency)
+    path = f"rkszones/{zone['id']}/apgroups"
+
+    # Resolve WLAN Groups
+    configs = dict(
+        (group['name'], (ApBasicConfig(group), ApRadioConfig(group['radio_config'])))
+        for group in groups
+    )
+    wlan_group_names = set().union(*[radio_config.wlan_groups() for basic_config, radio_config in configs.values()])
+    wlan_groups = dict()
+    if wlan_group_names:
+        for wlan_group in conn.retrive_list(f"rkszones/{zone['id']}/wlangroups", prefetch=True, concurrency=concurrency):
+            if wlan_group['name'] in wlan_group_names:
+                wlan_groups.setdefault(wlan_group['name'], wlan_group)
+        missing = sorted(wlan_group_names - set(wlan_groups))
+        if missing:
+            module.fail_json(msg=f"Could not find WLAN groups {', '.join(missing)}.")
+
+    # Get current groups
+    current = dict()
+    obsolete = []
+    for group in conn.retrive_list(path, prefetch=True, concurrency=concurrency):
+        if group['name'] in configs and group['name'] not in current:
+            current[group['name']] = group
+        elif group['name'] != 'default':
+            obsolete.append(group)
+    details = conn.batch([('GET', f"{path}/{group['id']}", None) for group in current.values()], concurrency=concurrency)
+    current = dict(zip(current, details))
+
+    # Plan
+    creates = []
+    updates = []
+    for name, (basic_config, radio_config) in configs.items():
+        if name in current:
+            update_group = dict()
+            basic_config.update(update_group, current[name])
+            radio_config.update(update_group, wlan_groups, current[name])
+            if update_group:
+                updates.append((current[name], update_group))
+                result['updated'].append(name)
+        else:
+            new_group = dict(name=name)
+            basic_config.update(new_group)
+            radio_config.update(new_group, wlan_groups)
+            creates.append(new_group)
+            result['created'].append(name)
+    if purge:
+        result['deleted'] = [group['name'] for group in obsolete]
+
+    result['changed'] = bool(result['created'] or result['updated'] or result['deleted'])
+
+    # Diff
+    if result['changed'] and module._diff:
+        result['diff'] = dict(
+            before=dict((group['name'], group) for group in (obsolete if purge else [])),
+            after=dict((group['name'], group) for group in creates),
+        )
+        for group, update_group in updates:
+            result['diff']['before'][group['name']] = group
+            result['diff']['after'][group['name']] = dict(group, **update_group)
+
+    if module.check_mode:
+        module.exit_json(**result)
+
+    # Delete
+    if purge:
+        conn.batch([('DELETE', f"{path}/{group['id']}", None) for group in obsolete], concurrency=concurrency)
+
+    # Update
+    conn.batch([('PATCH', f"{path}/{group['id']}", update_group) for group, update_group in updates], concurrency=concurrency)
+
+    # Create
+    conn.batch([('POST', path, new_group) for new_group in creates], concurrency=concurrency)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -107,6 +107,7 @@ import copy
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.params import ApLanPorts
 
 
 def main():
@@ -114,28 +115,7 @@ def main():
         zone=dict(type='str', required=True),
         group=dict(type='str'),
         model=dict(type='str', required=True),
-        lan_port=dict(type='dict', default=None, options=dict(
-            lan1=dict(type='dict', default=None, options=dict(
-                enabled=dict(type='bool', default=True),
-                profile=dict(type='str'),
-            )),
-            lan2=dict(type='dict', default=None, options=dict(
-                enabled=dict(type='bool', default=True),
-                profile=dict(type='str'),
-            )),
-            lan3=dict(type='dict', default=None, options=dict(
-                enabled=dict(type='bool', default=True),
-                profile=dict(type='str'),
-            )),
-            lan4=dict(type='dict', default=None, options=dict(
-                enabled=dict(type='bool', default=True),
-                profile=dict(type='str'),
-            )),
-            lan5=dict(type='dict', default=None, options=dict(
-                enabled=dict(type='bool', default=True),
-                profile=dict(type='str'),
-            )),
-        )),
+        lan_port=dict(type='dict', default=None, options=ApLanPorts.argument_spec()),
     )
 
     module = AnsibleModule(
@@ -149,7 +129,7 @@ def main():
     zone = module.params.get('zone')
     group = module.params.get('group')
     model = module.params.get('model')
-    lan_port = module.params.get('lan_port') or {}
+    lan_port = ApLanPorts(module.params.get('lan_port'))
 
     # Resolve Zone
     zone = conn.retrive_by_name('rkszones', zone, required=True)
@@ -162,19 +142,12 @@ def main():
     current_config = conn.get(ressource)
     result['config'] = current_config
 
+    # Resolve Ethernet Port Profiles
+    profiles = conn.retrive_by_names(f"rkszones/{zone['id']}/profile/ethernetPort", lan_port.profiles(), required=True)
+
     # Update Lan Ports
     new_config = copy.deepcopy(current_config)
-    for port in new_config['lanPorts']:
-        new_port = lan_port.get(port['portName'].lower())
-        if not new_port:
-            continue
-        port['enabled'] = new_port['enabled']
-        if new_port['profile']:
-            profile = conn.retrive_by_name(f"rkszones/{zone['id']}/profile/ethernetPort", new_port['profile'], required=True)
-            port['ethPortProfile'] = dict(
-                id=profile['id'],
-                name=profile['name'],
-            )
+    lan_port.update(new_config, profiles)
 
     if new_config != current_config:
         result['changed'] = True
@@ -0,0 +1,230 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: ap_models
+
+short_description: Manage AP Model settings of many models and groups
+
+description:
+    - Set the same AP Model settings for several models in the zone or in several AP groups.
+    - The AP groups and ethernet port profiles are resolved once. The model configs are read and
+      updated with up to I(concurrency) requests at the same time, only the changed ones are written.
+
+options:
+    zone:
+        description: Zone to set modle config in
+        type: str
+        required: true
+    groups:
+        description: AP groups to set the model config in, the zone itself if not set.
+        type: list
+        elements: str
+    models:
+        description: Models to set config for
+        type: list
+        elements: str
+        required: true
+    lan_port:
+        description: Lan port config to set
+        type: dict
+        suboptions:
+            lan1:
+                description: Lan port 1 config
+                type: dict
+                suboptions:
+                    enabled:
+                        description: Enable or disbale port
+                        type: bool
+                        default: True
+                    profile:
+                        description: Name of profile to use
+                        type: str
+            lan2:
+                description: Lan port 2 config
+                type: dict
+                suboptions:
+                    enabled:
+                        description: Enable or disbale port
+                        type: bool
+                        default: True
+                    profile:
+                        description: Name of profile to use
+                        type: str
+            lan3:
+                description: Lan port 3 config
+                type: dict
+                suboptions:
+                    enabled:
+                        description: Enable or disbale port
+                        type: bool
+                        default: True
+                    profile:
+                        description: Name of profile to use
+                        type: str
+            lan4:
+                description: Lan port 4 config
+                type: dict
+                suboptions:
+                    enabled:
+                        description: Enable or disbale port
+                        type: bool
+                        default: True
+                    profile:
+                        description: Name of profile to use
+                        type: str
+            lan5:
+                description: Lan port 5 config
+                type: dict
+                suboptions:
+                    enabled:
+                        description: Enable or disbale port
+                        type: bool
+                        default: True
+                    profile:
+                        description: Name of profile to use
+                        type: str
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Ensure the NAC Trunk on the second port of all Meeting Room APs
+  ap_models:
+    zone: Default
+    groups:
+      - Meeting Rooms A
+      - Meeting Rooms B
+    models:
+      - R560
+      - R650
+    lan_port:
+      lan2:
+        profile: NAC Trunk
+'''
+
+RETURN = r'''
+updated:
+    description: The updated model configs.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - group: Meeting Rooms A
+          model: R560
+unchanged:
+    description: Number of model configs already as desired.
+    returned: always
+    type: int
+'''
+
+import copy
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.params import ApLanPorts
+
+
+def main():
+    argument_spec = dict(
+        zone=dict(type='str', required=True),
+        groups=dict(type='list', elements='str'),
+        models=dict(type='list', elements='str', required=True),
+        lan_port=dict(type='dict', default=None, options=ApLanPorts.argument_spec()),
+        concurrency=dict(type='int', default=4),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False, updated=[], unchanged=0)
+
+    # Params
+    zone = module.params.get('zone')
+    group_names = list(dict.fromkeys(module.params.get('groups') or []))
+    models = list(dict.fromkeys(module.params.get('models')))
+    lan_port = ApLanPorts(module.params.get('lan_port'))
+    concurrency = max(1, module.params.get('concurrency'))
+
+    # Resolve Zone
+    zone = conn.retrive_by_name('rkszones', zone, required=True, prefetch=True, concurrency=concurrency)
+
+    # Resolve Groups
+    groups = dict()
+    if group_names:
+        for group in conn.retrive_list(f"rkszones/{zone['id']}/apgroups", prefetch=True, concurrency=concurrency):
+            if group['name'] in group_names:
+                groups.setdefault(group['name'], group)
+        missing = [name for name in group_names if name not in groups]
+        if missing:
+            module.fail_json(msg=f"Could not find AP groups {', '.join(missing)}.")
+
+    # Resolve Ethernet Port Profiles
+    profiles = dict()
+    if lan_port.profiles():
+        for profile in conn.retrive_list(f"rkszones/{zone['id']}/profile/ethernetPort", prefetch=True, concurrency=concurrency):
+            if profile['name'] in lan_port.profiles():
+                profiles.setdefault(profile['name'], profile)
+        missing = sorted(lan_port.profiles() - set(profiles))
+        if missing:
+            module.fail_json(msg=f"Could not find ethernet port profiles {', '.join(missing)}.")
+
+    # Get current configs
+    targets = []
+    for model in models:
+        if group_names:
+            targets.extend((name, model, f"rkszones/{zone['id']}/apgroups/{groups[name]['id']}/apmodel/{model}") for name in group_names)
+        else:
+            targets.append((None, model, f"rkszones/{zone['id']}/apmodel/{model}"))
+    current_configs = conn.batch([('GET', ressource, None) for group, model, ressource in targets], concurrency=concurrency)
+
+    # Update Lan Ports
+    updates = []
+    for (group, model, ressource), current_config in zip(targets, current_configs):
+        new_config = copy.deepcopy(current_config)
+        lan_port.update(new_config, profiles)
+        if new_config == current_config:
+            result['unchanged'] += 1
+            continue
+        updates.append((ressource, current_config, new_config))
+        result['updated'].append(dict(group=group, model=model))
+
+    result['changed'] = bool(updates)
+
+    # Diff
+    if result['changed'] and module._diff:
+        result['diff'] = dict(
+            before=dict((ressource, current_config) for ressource, current_config, new_config in updates),
+            after=dict((ressource, new_config) for ressource, current_config, new_config in updates),
+        )
+
+    if module.check_mode:
+        module.exit_json(**result)
+
+    # Update
+    for ressource, current_config, new_config in updates:
+        for key in [k for k in new_config if new_config[k] is None]:
+            del new_config[key]
+    conn.batch([('PUT', ressource, new_config) for ressource, current_config, new_config in updates], concurrency=concurrency)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: ap_reboot
+
+short_description: Rolling reboot of SmartZone access points
+
+description:
+    - Reboot a list of access points, all APs of a zone or all APs of an AP group.
+    - At most I(max_in_flight) APs are rebooting at the same time. The next AP is rebooted
+      as soon as one of them is back online.
+    - The AP status is polled for all rebooting APs with one C(query/ap) per poll, filtered on the zone
+      and AP group the rebooting APs share.
+    - APs which are not online are skipped.
+
+options:
+    macs:
+        description: MAC addresses of the APs to reboot.
+        type: list
+        elements: str
+    zone:
+        description: Reboot the APs of this zone.
+        type: str
+    group:
+        description: Only reboot the APs of this AP group in I(zone).
+        type: str
+    max_in_flight:
+        description: Maximum number of APs rebooting at the same time.
+        type: int
+        default: 10
+    wait:
+        description:
+            - Wait for the APs to come back online.
+            - Without waiting all APs are rebooted right away, I(max_in_flight) at a time.
+        type: bool
+        default: true
+    timeout:
+        description: Seconds an AP may take to come back online.
+        type: int
+        default: 600
+    poll_interval:
+        description: Seconds between the first status polls, the interval adapts to the progress.
+        type: float
+        default: 5
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Reboot the APs of a group after changing the LAN ports
+  ap_reboot:
+    zone: Office
+    group: Meeting Rooms
+    max_in_flight: 5
+
+- name: Reboot some APs
+  ap_reboot:
+    macs:
+      - 00:11:22:33:44:55
+      - 00:11:22:33:44:66
+'''
+
+RETURN = r'''
+aps:
+    description:
+        - State of each AP by MAC, one of C(rebooted), C(timeout), C(requested), C(skipped), C(planned) or C(not_started).
+        - C(not_started) APs were not rebooted because the overall wait timed out first.
+    returned: always
+    type: dict
+summary:
+    description: Number of APs per state.
+    returned: always
+    type: dict
+'''
+
+import collections
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.poller import Poller, PollTimeout
+
+
+def main():
+    argument_spec = dict(
+        macs=dict(type='list', elements='str'),
+        zone=dict(type='str'),
+        group=dict(type='str'),
+        max_in_flight=dict(type='int', default=10),
+        wait=dict(type='bool', default=True),
+        timeout=dict(type='int', default=600),
+        poll_interval=dict(type='float', default=5),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+        required_one_of=[('macs', 'zone')],
+        mutually_exclusive=[('macs', 'zone')],
+        required_by=dict(group='zone'),
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False)
+
+    # Params
+    macs = [mac.upper() for mac in module.params.get('macs') or []]
+    zone = module.params.get('zone')
+    group = module.params.get('group')
+    max_in_flight = max(1, module.params.get('max_in_flight'))
+    wait = module.params.get('wait')
+    timeout = module.params.get('timeout')
+    poll_interval = module.params.get('poll_interval')
+
+    # Resolve APs
+    if macs:
+        aps = list(conn.query_aps(macs=macs, concurrency=max_in_flight))
+        missing = set(macs) - set(ap['apMac'].upper() for ap in aps)
+        if missing:
+            module.fail_json(msg=f"Could not find APs {', '.join(sorted(missing))}.")
+    else:
+        zone = conn.retrive_by_name('rkszones', zone, required=True)
+        filters = [dict(type='ZONE', value=zone['id'])]
+        if group:
+            group = conn.retrive_by_name(f"rkszones/{zone['id']}/apgroups", group, required=True)
+            filters.append(dict(type='APGROUP', value=group['id']))
+        aps = list(conn.query_aps(filters=filters))
+
+    states = dict(
+        (ap['apMac'].upper(), 'planned' if ap['status'] == 'Online' else 'skipped')
+        for ap in aps
+    )
+    queue = collections.deque(mac for mac in states if states[mac] == 'planned')
+    scopes = dict((ap['apMac'].upper(), (ap.get('zoneId'), ap.get('apGroupId'))) for ap in aps)
+
+    def summary():
+        counts = dict()
+        for state in states.values():
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def finish():
+        module.exit_json(aps=states, summary=summary(), **result)
+
+    if not queue:
+        finish()
+    result['changed'] = True
+    if module.check_mode:
+        finish()
+
+    # Reboot without waiting
+    if not wait:
+        conn.batch([('PUT', f"aps/{mac}/reboot", None) for mac in queue], concurrency=max_in_flight)
+        states.update((mac, 'requested') for mac in queue)
+        finish()
+
+    # Rolling reboot
+    in_flight = dict()
+    seen_offline = set()
+
+    def poll_filters():
+        """Return the narrowest filters of one query/ap covering all APs in flight."""
+        zones = set(scopes[mac][0] for mac in in_flight)
+        if len(zones) != 1 or None in zones:
+            return []
+        filters = [dict(type='ZONE', value=zones.pop())]
+        groups = set(scopes[mac][1] for mac in in_flight)
+        if len(groups) == 1 and None not in groups:
+            filters.append(dict(type='APGROUP', value=groups.pop()))
+        return filters
+
+    def check():
+        now = time.monotonic()
+        if in_flight:
+            for ap in conn.query_aps(filters=poll_filters()):
+                mac = ap['apMac'].upper()
+                if mac not in in_flight:
+                    continue
+                if ap['status'] != 'Online':
+                    seen_offline.add(mac)
+                elif mac in seen_offline or (ap.get('uptime') is not None and ap['uptime'] < now - in_flight[mac]):
+                    states[mac] = 'rebooted'
+                    del in_flight[mac]
+            for mac in [m for m in in_flight if now - in_flight[m] > timeout]:
+                states[mac] = 'timeout'
+                del in_flight[mac]
+
+        start = [queue.popleft() for i in range(min(len(queue), max_in_flight - len(in_flight)))]
+        if start:
+            conn.batch([('PUT', f"aps/{mac}/reboot", None) for mac in start], concurrency=max_in_flight)
+            in_flight.update((mac, time.monotonic()) for mac in start)
+
+        finished = sum(1 for state in states.values() if state != 'planned')
+        return not queue and not in_flight, dict(in_flight=len(in_flight), percent=round(finished * 100 / len(states), 1))
+
+    poller = Poller(timeout=timeout * (len(queue) // max_in_flight + 1), interval=poll_interval, max_interval=max(poll_interval, 30))
+    try:
+        poller.wait(check)
+    except PollTimeout:
+        states.update((mac, 'timeout') for mac in in_flight)
+        states.update((mac, 'not_started') for mac in queue)
+
+    failed = [mac for mac, state in states.items() if state == 'timeout']
+    not_started = [mac for mac, state in states.items() if state == 'not_started']
+    if failed or not_started:
+        msg = []
+        if failed:
+            msg.append(f"APs {', '.join(failed)} did not come back online within {timeout} seconds.")
+        if not_started:
+            msg.append(f"APs {', '.join(not_started)} were not rebooted.")
+        module.fail_json(msg=' '.join(msg), aps=states, summary=summary(), **result)
+    finish()
+
+
+if __name__ == '__main__':
+    main()
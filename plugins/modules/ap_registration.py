@@ -98,28 +98,16 @@ import copy
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.aprules import rule_argument_spec, rule_payload, rule_update
 
 
 def main():
     argument_spec = dict(
         description=dict(type='str', required=True),
         zone=dict(type='str', required=True),
-        ip_range=dict(type='dict', options=dict(
-            from_ip=dict(type='str', required=True, aliases=['from']),
-            to_ip=dict(type='str', required=True, aliases=['to']),
-        )),
-        subnet=dict(type='dict', options=dict(
-            network=dict(type='str', required=True),
-            mask=dict(type='str', required=True),
-        )),
-        gps=dict(type='dict', options=dict(
-            latitude=dict(type='int', required=True, aliases=['lat']),
-            longitude=dict(type='int', required=True, aliases=['lon']),
-            distance=dict(type='int', required=True, aliases=['d']),
-        )),
-        tag=dict(type='str'),
         state=dict(type='str', default='present', choices=['present', 'absent']),
     )
+    argument_spec.update(rule_argument_spec())
 
     module = AnsibleModule(
         argument_spec=argument_spec,
@@ -137,10 +125,6 @@ def main():
     # Params
     zone = module.params.get('zone')
     description = module.params.get('description')
-    ip_range = module.params.get('ip_range')
-    subnet = module.params.get('subnet')
-    gps = module.params.get('gps')
-    tag = module.params.get('tag')
     state = module.params.get('state')
 
     # Resolve Zone
@@ -156,43 +140,7 @@ def main():
 
     # Create
     if current_rule is None and state == 'present':
-        new_rule = dict(
-            description=description,
-            mobilityZone=dict(
-                id=zone['id'],
-                name=zone['name']
-            )
-        )
-        if ip_range:
-            new_rule.update(dict(
-                type='IPAddressRange',
-                ipAddressRange=dict(
-                    fromIp=ip_range['from_ip'],
-                    toIp=ip_range['to_ip'],
-                )
-            ))
-        elif subnet:
-            new_rule.update(dict(
-                type='Subnet',
-                subnet=dict(
-                    networkAddress=subnet['network'],
-                    subnetMask=subnet['mask'],
-                )
-            ))
-        elif gps:
-            new_rule.update(dict(
-                type='GPSCoordinates',
-                gpsCoordinates=dict(
-                    latitude=gps['latitude'],
-                    longitude=gps['longitude'],
-                    distance=gps['distance'],
-                )
-            ))
-        elif tag:
-            new_rule.update(dict(
-                type='ProvisionTag',
-                provisionTag=tag,
-            ))
+        new_rule = rule_payload(description, zone, module.params)
 
         result['changed'] = True
         if not module.check_mode:
@@ -201,54 +149,7 @@ def main():
 
     # Update
     elif state == 'present':
-        update_rule = dict()
-        if current_rule['mobilityZone']['id'] != zone['id']:
-            update_rule['mobilityZone'] = dict(
-                id=zone['id'],
-                name=zone['name']
-            )
-        if ip_range and (
-            current_rule.get('ipAddressRange', {}).get('fromIp') != ip_range['from_ip']
-            or current_rule.get('ipAddressRange', {}).get('toIp') != ip_range['to_ip']
-        ):
-            update_rule.update(dict(
-                type='IPAddressRange',
-                ipAddressRange=dict(
-                    fromIp=ip_range['from_ip'],
-                    toIp=ip_range['to_ip'],
-                )
-            ))
-        elif subnet and (
-            current_rule['subnet'] is None
-            or current_rule['subnet'].get('networkAddress') != subnet['network']
-            or current_rule['subnet'].get('subnetMask') != subnet['mask']
-        ):
-            update_rule.update(dict(
-                type='Subnet',
-                subnet=dict(
-                    networkAddress=subnet['network'],
-                    subnetMask=subnet['mask'],
-                )
-            ))
-        elif gps and (
-            current_rule['gpsCoordinates'] is None
-            or current_rule['gpsCoordinates'].get('latitude') != gps['latitude']
-            or current_rule['gpsCoordinates'].get('longitude') != gps['longitude']
-            or current_rule['gpsCoordinates'].get('distance') != gps['distance']
-        ):
-            update_rule.update(dict(
-                type='GPSCoordinates',
-                gpsCoordinates=dict(
-                    latitude=gps['latitude'],
-                    longitude=gps['longitude'],
-                    distance=gps['distance'],
-                )
-            ))
-        elif tag and current_rule.get('gpsCoordinates') != tag:
-            update_rule.update(dict(
-                type='ProvisionTag',
-                provisionTag=tag,
-            ))
+        update_rule = rule_update(current_rule, rule_payload(description, zone, module.params))
 
         if update_rule:
             result['changed'] = True
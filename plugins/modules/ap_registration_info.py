@@ -0,0 +1,245 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: ap_registration_info
+
+short_description: Check AP registration rules for overlaps
+
+description:
+    - Report the IP range and subnet AP registration rules which overlap, and the rules which never
+      match because a rule with a higher priority covers all their addresses.
+    - The rules are taken in the order the controller lists them, which is their priority. The details
+      of a range or subnet rule are only read when the list view lacks its zone or addresses.
+    - Overlaps between rules adding the APs to different zones are conflicts, as the AP ends up in the
+      zone of the rule with the higher priority.
+    - With I(rule) a proposed rule is checked against the existing rules. A new rule gets the lowest
+      priority, a rule with the description of an existing one replaces it.
+
+options:
+    rule:
+        description: A proposed rule to check, see M(scsitteam.smartzone.ap_registration).
+        type: dict
+        suboptions:
+            description:
+                description: Rule description.
+                type: str
+                required: true
+            zone:
+                description: Zone to add aps to
+                type: str
+                required: true
+            ip_range:
+                description: Match aps by ip range
+                type: dict
+                suboptions:
+                    from_ip:
+                        description: Range start ip
+                        type: str
+                        required: true
+                        aliases: [from]
+                    to_ip:
+                        description: Range end ip
+                        type: str
+                        required: true
+                        aliases: [to]
+            subnet:
+                description: Match aps by subnet
+                type: dict
+                suboptions:
+                    network:
+                        description: Subnet network address
+                        type: str
+                        required: true
+                    mask:
+                        description: Subnet mask
+                        type: str
+                        required: true
+            gps:
+                description: Match aps by gps location
+                type: dict
+                suboptions:
+                    latitude:
+                        description: GPS latitude
+                        type: int
+                        required: true
+                        aliases: [lat]
+                    longitude:
+                        description: GPS longitude
+                        type: int
+                        required: true
+                        aliases: [lon]
+                    distance:
+                        description: Distance
+                        type: int
+                        required: true
+                        aliases: [d]
+            tag:
+                description: Match aps by tag
+                type: str
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Check the AP Registration Rules
+  ap_registration_info:
+  register: rules
+
+- name: Fail on conflicting rules
+  ansible.builtin.assert:
+    that: rules.conflicts == 0
+
+- name: Check a new rule before adding it
+  ap_registration_info:
+    rule:
+      description: Bern
+      zone: Bern
+      subnet:
+        network: 10.1.0.0
+        mask: 255.255.0.0
+  register: check
+  failed_when: not check.proposed.valid
+'''
+
+RETURN = r'''
+rules:
+    description: Number of rules checked.
+    returned: always
+    type: int
+conflicts:
+    description: Number of pairs of rules for different zones which overlap, a shadowed rule and the rule covering it count once.
+    returned: always
+    type: int
+overlaps:
+    description: Overlapping rules, the rule with the higher priority first.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rules: [Bern, Bern-Office]
+          zones: [Bern, Bern]
+          conflict: false
+shadowed:
+    description: Rules which never match, with the rule covering them.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rule: Bern-Office
+          by: Bern
+          conflict: false
+proposed:
+    description: Overlaps and shadowing involving I(rule), C(valid) unless they are conflicts.
+    returned: when I(rule) is given
+    type: dict
+    sample:
+        overlaps: [Bern-Office]
+        shadowed_by: Bern
+        shadows: []
+        valid: true
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.aprules import (
+    find_overlaps, find_shadowed, rule_argument_spec, rule_complete, rule_interval, rule_match,
+)
+
+
+def main():
+    rule_spec = dict(
+        description=dict(type='str', required=True),
+        zone=dict(type='str', required=True),
+    )
+    rule_spec.update(rule_argument_spec())
+    argument_spec = dict(
+        rule=dict(type='dict', options=rule_spec,
+                  mutually_exclusive=[('ip_range', 'subnet', 'gps', 'tag')],
+                  required_one_of=[('ip_range', 'subnet', 'gps', 'tag')]),
+        concurrency=dict(type='int', default=4),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False, overlaps=[], shadowed=[], conflicts=0)
+
+    # Params
+    rule = module.params.get('rule')
+    concurrency = max(1, module.params.get('concurrency'))
+
+    # Get current rules
+    rules = list(conn.retrive_list('apRules', prefetch=True, concurrency=concurrency))
+    # Only fetch the details of the range and subnet rules the list view gives without zone or addresses
+    incomplete = [index for index, current in enumerate(rules) if not rule_complete(current)]
+    details = conn.batch([('GET', f"apRules/{rules[index]['id']}", None) for index in incomplete], concurrency=concurrency)
+    for index, detail in zip(incomplete, details):
+        rules[index] = detail
+
+    # Proposed rule
+    proposed = None
+    if rule:
+        payload = dict(description=rule['description'], mobilityZone=dict(name=rule['zone']))
+        payload.update(rule_match(rule))
+        for proposed, current in enumerate(rules):
+            if current['description'] == rule['description']:
+                rules[proposed] = payload
+                break
+        else:
+            proposed = len(rules)
+            rules.append(payload)
+    result['rules'] = len(rules)
+
+    def zone(index):
+        return (rules[index].get('mobilityZone') or {}).get('name')
+
+    intervals = [rule_interval(current) for current in rules]
+    overlaps = find_overlaps(intervals)
+    shadowed = find_shadowed(intervals)
+
+    for i, j in overlaps:
+        result['overlaps'].append(dict(
+            rules=[rules[i]['description'], rules[j]['description']],
+            zones=[zone(i), zone(j)],
+            conflict=zone(i) != zone(j),
+        ))
+    for j, i in sorted(shadowed.items()):
+        result['shadowed'].append(dict(
+            rule=rules[j]['description'],
+            by=rules[i]['description'],
+            conflict=zone(i) != zone(j),
+        ))
+    # A shadowed rule overlaps the rule covering it, count each conflicting pair once
+    pairs = set(overlaps) | set((i, j) for j, i in shadowed.items())
+    result['conflicts'] = sum(1 for i, j in pairs if zone(i) != zone(j))
+
+    if proposed is not None:
+        result['proposed'] = dict(
+            overlaps=[rules[j if i == proposed else i]['description'] for i, j in overlaps if proposed in (i, j)],
+            shadowed_by=rules[shadowed[proposed]]['description'] if proposed in shadowed else None,
+            shadows=[rules[j]['description'] for j, i in sorted(shadowed.items()) if i == proposed],
+            valid=not any(zone(i) != zone(j) for i, j in overlaps if proposed in (i, j)),
+        )
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: ap_registration_rules
+
+short_description: Manage all AP registration rules at once
+
+description:
+    - Ensure a list of AP registration rules in a single task.
+    - The rules are identified by their description. The current rules are read once and only the
+      rules which differ are created, updated or deleted.
+    - New rules are created one after another in the order of I(rules), after the existing rules.
+      The rules are then raised step by step with the priority API until the rules of I(rules) have
+      their priorities in the order of I(rules). Other rules keep their places.
+    - IP range and subnet rules adding APs to different zones must not overlap, unless I(allow_overlaps) is set.
+      Without I(purge) the rules not in I(rules) are checked as well.
+
+options:
+    rules:
+        description: The AP registration rules.
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+            description:
+                description: Rule description. Use to identify the rule to manage.
+                type: str
+                required: true
+            zone:
+                description: Zone to add aps to
+                type: str
+                required: true
+            ip_range:
+                description: Match aps by ip range
+                type: dict
+                suboptions:
+                    from_ip:
+                        description: Range start ip
+                        type: str
+                        required: true
+                        aliases: [from]
+                    to_ip:
+                        description: Range end ip
+                        type: str
+                        required: true
+                        aliases: [to]
+            subnet:
+                description: Match aps by subnet
+                type: dict
+                suboptions:
+                    network:
+                        description: Subnet network address
+                        type: str
+                        required: true
+                    mask:
+                        description: Subnet mask
+                        type: str
+                        required: true
+            gps:
+                description: Match aps by gps location
+                type: dict
+                suboptions:
+                    latitude:
+                        description: GPS latitude
+                        type: int
+                        required: true
+                        aliases: [lat]
+                    longitude:
+                        description: GPS longitude
+                        type: int
+                        required: true
+                        aliases: [lon]
+                    distance:
+                        description: Distance
+                        type: int
+                        required: true
+                        aliases: [d]
+            tag:
+                description: Match aps by tag
+                type: str
+    purge:
+        description: Delete the rules not in I(rules).
+        type: bool
+        default: false
+    allow_overlaps:
+        description: Allow IP ranges and subnets of rules for different zones to overlap.
+        type: bool
+        default: false
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Ensure the AP Registration Rules of all sites
+  ap_registration_rules:
+    rules:
+      - description: Bern
+        zone: Bern
+        subnet:
+          network: 10.1.0.0
+          mask: 255.255.0.0
+      - description: Basel
+        zone: Basel
+        ip_range:
+          from: 10.2.0.10
+          to: 10.2.0.250
+    purge: true
+'''
+
+RETURN = r'''
+created:
+    description: Descriptions of the created rules.
+    returned: always
+    type: list
+    elements: str
+updated:
+    description: Descriptions of the updated rules.
+    returned: always
+    type: list
+    elements: str
+deleted:
+    description: Descriptions of the deleted rules.
+    returned: always
+    type: list
+    elements: str
+moved:
+    description: Descriptions of the rules raised in priority to bring the rules into the order of I(rules).
+    returned: always
+    type: list
+    elements: str
+overlaps:
+    description: Pairs of rule descriptions whose IP ranges or subnets overlap and which add the APs to different zones.
+    returned: always
+    type: list
+    elements: list
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.aprules import (
+    find_overlaps, priority_moves, rule_argument_spec, rule_complete, rule_interval, rule_payload, rule_update,
+)
+
+
+def main():
+    rule_spec = dict(
+        description=dict(type='str', required=True),
+        zone=dict(type='str', required=True),
+    )
+    rule_spec.update(rule_argument_spec())
+    argument_spec = dict(
+        rules=dict(type='list', elements='dict', required=True, options=rule_spec,
+                   mutually_exclusive=[('ip_range', 'subnet', 'gps', 'tag')],
+                   required_one_of=[('ip_range', 'subnet', 'gps', 'tag')]),
+        purge=dict(type='bool', default=False),
+        allow_overlaps=dict(type='bool', default=False),
+        concurrency=dict(type='int', default=4),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False, created=[], updated=[], deleted=[], moved=[], overlaps=[])
+
+    # Params
+    rules = module.params.get('rules')
+    purge = module.params.get('purge')
+    allow_overlaps = module.params.get('allow_overlaps')
+    concurrency = max(1, module.params.get('concurrency'))
+
+    descriptions = [rule['description'] for rule in rules]
+    duplicates = sorted(set(d for d in descriptions if descriptions.count(d) > 1))
+    if duplicates:
+        module.fail_json(msg=f"Duplicate rule descriptions {', '.join(duplicates)}.")
+
+    # Resolve Zones
+    zone_names = set(rule['zone'] for rule in rules)
+    zones = dict()
+    for zone in conn.retrive_list('rkszones', prefetch=True, concurrency=concurrency):
+        if zone['name'] in zone_names:
+            zones.setdefault(zone['name'], zone)
+    missing = sorted(zone_names - set(zones))
+    if missing:
+        module.fail_json(msg=f"Could not find zones {', '.join(missing)}.")
+
+    desired = dict(
+        (rule['description'], rule_payload(rule['description'], zones[rule['zone']], rule))
+        for rule in rules
+    )
+
+    # Get current rules
+    listed = list(conn.retrive_list('apRules', prefetch=True, concurrency=concurrency))
+    current = dict()
+    obsolete = []
+    for rule in listed:
+        if rule['description'] in desired and rule['description'] not in current:
+            current[rule['description']] = rule
+        else:
+            obsolete.append(rule)
+    # The rules kept besides the desired ones, their list view may lack the addresses
+    kept = [] if purge else obsolete
+    incomplete = [rule for rule in kept if not rule_complete(rule)]
+    details = conn.batch([('GET', f"apRules/{rule['id']}", None) for rule in list(current.values()) + incomplete], concurrency=concurrency)
+    current = dict(zip(current, details))
+    kept_details = dict((rule['id'], detail) for rule, detail in zip(incomplete, details[len(current):]))
+    kept = [kept_details.get(rule['id'], rule) for rule in kept]
+
+    # Overlaps
+    payloads = list(desired.values())
+    checked = payloads + kept
+    for i, j in find_overlaps([rule_interval(rule) for rule in checked]):
+        if i >= len(payloads):
+            # Both rules are kept as they are
+            continue
+        if checked[i]['mobilityZone']['id'] != (checked[j].get('mobilityZone') or {}).get('id'):
+            result['overlaps'].append([checked[i]['description'], checked[j]['description']])
+    if result['overlaps'] and not allow_overlaps:
+        module.fail_json(msg=f"{len(result['overlaps'])} rules for different zones overlap.", **result)
+
+    # Plan
+    updates = []
+    for description, rule in desired.items():
+        if description in current:
+            update_rule = rule_update(current[description], rule)
+            if update_rule:
+                updates.append((current[description], update_rule))
+                result['updated'].append(description)
+        else:
+            result['created'].append(description)
+    if purge:
+        result['deleted'] = [rule['description'] for rule in obsolete]
+
+    # Priorities, the desired rules take the places of the managed rules in the order of rules
+    obsolete_ids = set(rule['id'] for rule in obsolete)
+    order = [
+        rule['id'] if rule['id'] in obsolete_ids else rule['description']
+        for rule in listed
+        if not (purge and rule['id'] in obsolete_ids)
+    ] + result['created']
+    managed = iter(descriptions)
+    target = [next(managed) if key in desired else key for key in order]
+    moves = priority_moves(order, target)
+    names = dict((rule['id'], rule['description']) for rule in obsolete)
+    result['moved'] = list(dict.fromkeys(names.get(key, key) for key in moves))
+
+    result['changed'] = bool(result['created'] or result['updated'] or result['deleted'] or moves)
+
+    # Diff
+    if result['changed'] and module._diff:
+        result['diff'] = dict(
+            before=dict((rule['description'], rule) for rule in (obsolete if purge else [])),
+            after=dict(),
+        )
+        for rule, update_rule in updates:
+            result['diff']['before'][rule['description']] = rule
+            result['diff']['after'][rule['description']] = dict(rule, **update_rule)
+        for description in result['created']:
+            result['diff']['after'][description] = desired[description]
+
+    if module.check_mode:
+        module.exit_json(**result)
+
+    # Delete
+    if purge:
+        conn.batch([('DELETE', f"apRules/{rule['id']}", None) for rule in obsolete], concurrency=concurrency)
+
+    # Update
+    conn.batch([('PATCH', f"apRules/{rule['id']}", update_rule) for rule, update_rule in updates], concurrency=concurrency)
+
+    # Create
+    ids = dict((description, rule['id']) for description, rule in current.items())
+    for description in result['created']:
+        ids[description] = conn.post('apRules', payload=desired[description])['id']
+
+    # Reorder, one step at a time
+    for key in moves:
+        conn.get(f"apRules/priority/upgrade/{ids.get(key, key)}", expected_code=204)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -127,28 +127,119 @@ options:
                         description: Notification target port.
                         type: int
                         required: True
+    update_password:
+        description:
+            - C(always) sends the SNMP v3 passwords on every run, the controller does not return them to compare.
+            - C(on_create) only sends them for new users or together with other changes of the SNMP v3 agents.
+        type: str
+        choices: [always, on_create]
+        default: on_create
     state:
         description: State of the syslog profile.
         type: str
         default: present
         choices: [present, absent]
+    domains:
+        description:
+            - Manage the SNMP profile in each of these domains, C(*) for all domains.
+            - The domains are listed once and the profiles of all domains are read and written at the same time.
+            - The domain of the user if not set.
+        type: list
+        elements: str
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
 
 author:
     - Marius Rieder (@jiuka)
 '''
 
 EXAMPLES = r'''
-- name: Setup Syslog Server for APs
-  ap_syslog:
-    name: APSYSLOG
-    primary_address: 192.168.0.10
-    flow_level: ALL_LOGS
+- name: Setup SNMP for APs
+  ap_snmp:
+    name: public
+    snmpv2:
+      - community: public
+        read: true
+
+- name: Setup SNMP for the APs of some domains
+  ap_snmp:
+    name: public
+    snmpv2:
+      - community: public
+        read: true
+    domains:
+      - Customer A
+      - Customer B
+'''
+
+RETURN = r'''
+domains:
+    description: Outcome per domain, one of C(created), C(updated), C(deleted) or C(unchanged).
+    returned: when I(domains) is set
+    type: dict
+    sample:
+        Customer A: created
+        Customer B: unchanged
 '''
 
 import copy
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.diff import keyed_list_changes
+
+# Values the controller may leave out of an agent
+AGENT_DEFAULTS = dict(readEnabled=False, writeEnabled=False, notificationEnabled=False, notificationTarget=[])
+# Values the controller does not return in clear
+SECRETS = ['authPassword', 'privPassword']
+OUTCOMES = dict(POST='created', PUT='updated', DELETE='deleted')
+
+
+def snmp_request(params, snmpv2, snmpv3, domain_id, current_snmp):
+    """Return the request to turn `current_snmp` of a domain into the profile of `params`, and the profile after it."""
+    # Create
+    if current_snmp is None and params['state'] == 'present':
+        new_snmp = dict(
+            domainId=domain_id,
+            name=params['name'],
+        )
+        if params['description']:
+            new_snmp['description'] = params['description']
+        if snmpv2:
+            new_snmp['snmpV2Agent'] = snmpv2
+        if snmpv3:
+            new_snmp['snmpV3Agent'] = [
+                {k: v for k, v in i.items() if v is not None}
+                for i in snmpv3
+            ]
+        return ('POST', 'apSnmpAgentProfiles', new_snmp, 200), new_snmp
+
+    # Update
+    elif params['state'] == 'present':
+        update_snmp = copy.deepcopy(current_snmp)
+        if params['description']:
+            update_snmp['description'] = params['description']
+        if snmpv2 and keyed_list_changes(current_snmp['snmpV2Agent'], snmpv2, 'communityName', AGENT_DEFAULTS):
+            update_snmp['snmpV2Agent'] = snmpv2
+        # The controller does not return the passwords, send them on changes or always
+        send_passwords = params['update_password'] == 'always' and any(agent.get(secret) for agent in snmpv3 or [] for secret in SECRETS)
+        if snmpv3 and (send_passwords or keyed_list_changes(current_snmp['snmpV3Agent'], snmpv3, 'userName', AGENT_DEFAULTS, ignore=SECRETS)):
+            update_snmp['snmpV3Agent'] = [
+                {k: v for k, v in i.items() if v is not None}
+                for i in snmpv3
+            ]
+
+        if update_snmp != current_snmp:
+            payload = dict((k, v) for k, v in update_snmp.items() if k not in ['domainId', 'id'] and v is not None)
+            return ('PUT', f"apSnmpAgentProfiles/{current_snmp['id']}", payload), update_snmp
+
+    # Delete
+    elif current_snmp is not None and params['state'] == 'absent':
+        return ('DELETE', f"apSnmpAgentProfiles/{current_snmp['id']}", None), None
+
+    return None, current_snmp
 
 
 def main():
@@ -193,7 +284,10 @@ def main():
                 ('privProtocol', 'privPassword'),
             ]
         ),
+        update_password=dict(type='str', default='on_create', choices=['always', 'on_create'], no_log=False),
         state=dict(type='str', default='present', choices=['present', 'absent']),
+        domains=dict(type='list', elements='str'),
+        concurrency=dict(type='int', default=4),
     )
 
     module = AnsibleModule(
@@ -205,7 +299,6 @@ def main():
 
     # Params
     name = module.params.get('name')
-    description = module.params.get('description')
     snmpv2 = module.params.get('snmpv2')
     if snmpv2:
         snmpv2 = [
@@ -220,71 +313,63 @@ def main():
                 k: v for k, v in agent.items() if k in argument_spec['snmpv3']['options'].keys()
             } for agent in snmpv3
         ]
-    state = module.params.get('state')
+    domains = module.params.get('domains')
+    concurrency = max(1, module.params.get('concurrency'))
 
-    # Get current syslog
-    current_snmp = conn.retrive_by_name(f"apSnmpAgentProfiles?domainId={conn.domainId}", name)
+    # Resolve Domains
+    if domains:
+        domain_ids = conn.retrive_domains(domains)
+    else:
+        domain_ids = {None: conn.domainId}
 
-    # Create
-    if current_snmp is None and state == 'present':
-        new_snmp = dict(
-            domainId=conn.domainId,
-            name=name,
-        )
-        if description:
-            new_snmp['description'] = description
-        if snmpv2:
-            new_snmp['snmpV2Agent'] = snmpv2
-        if snmpv3:
-            new_snmp['snmpV3Agent'] = [
-                {k: v for k, v in i.items() if v is not None}
-                for i in snmpv3
-            ]
+    # Get current snmp
+    ressources = dict((domain, f"apSnmpAgentProfiles?domainId={domain_id}") for domain, domain_id in domain_ids.items())
+    profiles = conn.retrive_lists(ressources.values(), concurrency=concurrency, select=lambda profile: profile['name'] == name)
+    found = dict()
+    for domain, ressource in ressources.items():
+        if profiles[ressource]:
+            found[domain] = profiles[ressource][0]
+    details = conn.batch([('GET', f"apSnmpAgentProfiles/{profile['id']}", None) for profile in found.values()], concurrency=concurrency)
+    current = dict.fromkeys(domain_ids)
+    current.update(zip(found, details))
 
-        result['changed'] = True
-        if not module.check_mode:
-            resp = conn.post('apSnmpAgentProfiles', payload=new_snmp, expected_code=200)
-            new_snmp = conn.get(f"apSnmpAgentProfiles/{resp['id']}")
+    # Create, Update or Delete
+    requests = dict()
+    after = dict()
+    for domain, domain_id in domain_ids.items():
+        request, after[domain] = snmp_request(module.params, snmpv2, snmpv3, domain_id, current[domain])
+        if request:
+            requests[domain] = request
+    result['changed'] = bool(requests)
 
-    # Update
-    elif state == 'present':
-        update_snmp = copy.deepcopy(current_snmp)
-        if description:
-            update_snmp['description'] = description
-        if snmpv2 and current_snmp['snmpV2Agent'] != snmpv2:
-            update_snmp['snmpV2Agent'] = snmpv2
-        if snmpv3 and current_snmp['snmpV3Agent'] != snmpv3:
-            update_snmp['snmpV3Agent'] = [
-                {k: v for k, v in i.items() if v is not None}
-                for i in snmpv3
-            ]
-
-        if update_snmp != current_snmp:
-            result['changed'] = True
-            if not module.check_mode:
-                for key in ['domainId', 'id']:
-                    del update_snmp[key]
-                for key in [k for k in update_snmp if update_snmp[k] is None]:
-                    del update_snmp[key]
-                conn.put(f"apSnmpAgentProfiles/{current_snmp['id']}", payload=update_snmp)
-                new_snmp = conn.get(f"apSnmpAgentProfiles/{current_snmp['id']}")
-            else:
-                new_snmp = copy.deepcopy(current_snmp)
-                new_snmp.update(update_snmp)
+    if requests and not module.check_mode:
+        responses = conn.batch(requests.values(), concurrency=concurrency)
+        if module._diff:
+            ids = [(domain, response['id'] if request[0] == 'POST' else current[domain]['id'])
+                   for (domain, request), response in zip(requests.items(), responses) if request[0] != 'DELETE']
+            after.update(zip(
+                [domain for domain, id in ids],
+                conn.batch([('GET', f"apSnmpAgentProfiles/{id}", None) for domain, id in ids], concurrency=concurrency),
+            ))
 
-    # Delete
-    elif current_snmp is not None and state == 'absent':
-        result['changed'] = True
-        if not module.check_mode:
-            conn.delete(f"apSnmpAgentProfiles/{current_snmp['id']}")
-        new_snmp = None
+    if domains:
+        result['domains'] = dict(
+            (domain, OUTCOMES[requests[domain][0]] if domain in requests else 'unchanged')
+            for domain in domain_ids
+        )
 
     # Diff
     if result['changed'] and module._diff:
-        result['diff'] = dict(
-            before=current_snmp,
-            after=new_snmp,
-        )
+        if domains:
+            result['diff'] = dict(
+                before=dict((domain, current[domain]) for domain in requests),
+                after=dict((domain, after[domain]) for domain in requests),
+            )
+        else:
+            result['diff'] = dict(
+                before=current[None],
+                after=after[None],
+            )
     module.exit_json(**result)
 
 
@@ -64,18 +64,44 @@ options:
         type: str
         default: present
         choices: [present, absent]
+    domains:
+        description:
+            - Manage the syslog profile in each of these domains, C(*) for all domains.
+            - The domains are listed once and the profiles of all domains are read and written at the same time.
+            - The domain of the user if not set.
+        type: list
+        elements: str
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
 
 author:
     - Marius Rieder (@jiuka)
 '''
 
 EXAMPLES = r'''
-- name: Setup SNMP for APs
-  ap_snmp:
-    name: public
-    snmpv2:
-      - community: public
-        read: true
+- name: Setup Syslog Server for APs
+  ap_syslog:
+    name: APSYSLOG
+    primary_address: 192.168.0.10
+    flow_level: ALL_LOGS
+
+- name: Setup Syslog Server for the APs of all domains
+  ap_syslog:
+    name: APSYSLOG
+    primary_address: 192.168.0.10
+    domains: '*'
+'''
+
+RETURN = r'''
+domains:
+    description: Outcome per domain, one of C(created), C(updated), C(deleted) or C(unchanged).
+    returned: when I(domains) is set
+    type: dict
+    sample:
+        Customer A: created
+        Customer B: unchanged
 '''
 
 import copy
@@ -83,6 +109,61 @@ import copy
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
 
+OUTCOMES = dict(POST='created', PUT='updated', DELETE='deleted')
+
+
+def syslog_request(params, domain_id, current_syslog):
+    """Return the request to turn `current_syslog` of a domain into the profile of `params`, and the profile after it."""
+    # Create
+    if current_syslog is None and params['state'] == 'present':
+        new_syslog = dict(
+            domainId=domain_id,
+            name=params['name'],
+            primaryAddress=params['primary_address'],
+            primaryPort=params['primary_port'],
+            primaryProtocol=params['primary_protocol'],
+            redundancyMode=params['redundancy_mode'],
+            flowLevel=params['flow_level'],
+        )
+        if params['description']:
+            new_syslog['description'] = params['description']
+        if params['secondary_address']:
+            new_syslog['secondaryAddress'] = params['secondary_address']
+            new_syslog['secondaryPort'] = params['secondary_port']
+            new_syslog['secondaryProtocol'] = params['secondary_protocol']
+        return ('POST', 'apSyslogServerProfiles', new_syslog), new_syslog
+
+    # Update
+    elif params['state'] == 'present':
+        update_syslog = copy.deepcopy(current_syslog)
+        if params['description']:
+            update_syslog['description'] = params['description']
+        update_syslog['primaryAddress'] = params['primary_address']
+        if params['primary_port']:
+            update_syslog['primaryPort'] = params['primary_port']
+        if params['primary_protocol']:
+            update_syslog['primaryProtocol'] = params['primary_protocol']
+        if params['secondary_address']:
+            update_syslog['secondaryAddress'] = params['secondary_address']
+            update_syslog['secondaryPort'] = params['secondary_port']
+            update_syslog['secondaryProtocol'] = params['secondary_protocol']
+        if params['redundancy_mode']:
+            update_syslog['redundancyMode'] = params['redundancy_mode']
+        if params['flow_level']:
+            update_syslog['flowLevel'] = params['flow_level']
+
+        if update_syslog != current_syslog:
+            payload = copy.deepcopy(update_syslog)
+            for key in ['createDateTime', 'creatorUsername', 'domainId', 'id', 'modifiedDateTime', 'modifierUsername']:
+                payload.pop(key, None)
+            return ('PUT', f"apSyslogServerProfiles/{current_syslog['id']}", payload), update_syslog
+
+    # Delete
+    elif current_syslog is not None and params['state'] == 'absent':
+        return ('DELETE', f"apSyslogServerProfiles/{current_syslog['id']}", None, 200), None
+
+    return None, current_syslog
+
 
 def main():
     argument_spec = dict(
@@ -97,6 +178,8 @@ def main():
         redundancy_mode=dict(type='str', default='ACTIVE_ACTIVE', choices=['ACTIVE_ACTIVE', 'PRIMARY_BACKUP']),
         flow_level=dict(type='str', default='GENERAL_LOGS', choices=['GENERAL_LOGS', 'CLIENT_FLOW', 'ALL_LOGS']),
         state=dict(type='str', default='present', choices=['present', 'absent']),
+        domains=dict(type='list', elements='str'),
+        concurrency=dict(type='int', default=4),
     )
 
     module = AnsibleModule(
@@ -107,89 +190,67 @@ def main():
     result = dict(changed=False)
 
     # Params
-    domain = module.params.get('domain')
     name = module.params.get('name')
-    description = module.params.get('description')
-    primary_address = module.params.get('primary_address')
-    primary_port = module.params.get('primary_port')
-    primary_protocol = module.params.get('primary_protocol')
-    secondary_address = module.params.get('secondary_address')
-    secondary_port = module.params.get('secondary_port')
-    secondary_protocol = module.params.get('secondary_protocol')
-    redundancy_mode = module.params.get('redundancy_mode')
-    flow_level = module.params.get('flow_level')
-    state = module.params.get('state')
+    domains = module.params.get('domains')
+    concurrency = max(1, module.params.get('concurrency'))
 
-    # Get current syslog
-    current_syslog = conn.retrive_by_name(f"apSyslogServerProfiles?domainId={conn.domainId}", name)
+    # Resolve Domains
+    if domains:
+        domain_ids = conn.retrive_domains(domains)
+    else:
+        domain_ids = {None: conn.domainId}
 
-    # Create
-    if current_syslog is None and state == 'present':
-        new_syslog = dict(
-            domainId=conn.domainId,
-            name=name,
-            primaryAddress=primary_address,
-            primaryPort=primary_port,
-            primaryProtocol=primary_protocol,
-            redundancyMode=redundancy_mode,
-            flowLevel=flow_level,
-        )
-        if description:
-            new_syslog['description'] = description
-        if secondary_address:
-            new_syslog['secondaryAddress'] = secondary_address
-            new_syslog['secondaryPort'] = secondary_port
-            new_syslog['secondaryProtocol'] = secondary_protocol
-
-        result['changed'] = True
-        if not module.check_mode:
-            resp = conn.post('apSyslogServerProfiles', payload=new_syslog)
-            new_syslog = conn.get(f"apSyslogServerProfiles/{resp['id']}")
+    # Get current syslog
+    ressources = dict((domain, f"apSyslogServerProfiles?domainId={domain_id}") for domain, domain_id in domain_ids.items())
+    profiles = conn.retrive_lists(ressources.values(), concurrency=concurrency, select=lambda profile: profile['name'] == name)
+    found = dict()
+    for domain, ressource in ressources.items():
+        if profiles[ressource]:
+            found[domain] = profiles[ressource][0]
+    details = conn.batch([('GET', f"apSyslogServerProfiles/{profile['id']}", None) for profile in found.values()], concurrency=concurrency)
+    current = dict.fromkeys(domain_ids)
+    current.update(zip(found, details))
 
-    # Update
-    elif state == 'present':
-        update_syslog = copy.deepcopy(current_syslog)
-        if description:
-            update_syslog['description'] = description
-        update_syslog['primaryAddress'] = primary_address
-        if primary_port:
-            update_syslog['primaryPort'] = primary_port
-        if primary_protocol:
-            update_syslog['primaryProtocol'] = primary_protocol
-        if secondary_address:
-            update_syslog['secondaryAddress'] = secondary_address
-            update_syslog['secondaryPort'] = secondary_port
-            update_syslog['secondaryProtocol'] = secondary_protocol
-        if redundancy_mode:
-            update_syslog['redundancyMode'] = redundancy_mode
-        if flow_level:
-            update_syslog['flowLevel'] = flow_level
+    # Create, Update or Delete
+    requests = dict()
+    after = dict()
+    for domain, domain_id in domain_ids.items():
+        request, after[domain] = syslog_request(module.params, domain_id, current[domain])
+        if request:
+            requests[domain] = request
+    result['changed'] = bool(requests)
 
-        if update_syslog != current_syslog:
-            result['changed'] = True
-            if not module.check_mode:
-                for key in ['createDateTime', 'creatorUsername', 'domainId', 'id', 'modifiedDateTime', 'modifierUsername']:
-                    del update_syslog[key]
-                conn.put(f"apSyslogServerProfiles/{current_syslog['id']}", payload=update_syslog)
-                new_syslog = conn.get(f"apSyslogServerProfiles/{current_syslog['id']}")
-            else:
-                new_syslog = copy.deepcopy(current_syslog)
-                new_syslog.update(update_syslog)
+    if requests and not module.check_mode:
+        responses = conn.batch(requests.values(), concurrency=concurrency)
+        if module._diff:
+            ids = [(domain, response['id'] if request[0] == 'POST' else current[domain]['id'])
+                   for (domain, request), response in zip(requests.items(), responses) if request[0] != 'DELETE']
+            after.update(zip(
+                [domain for domain, id in ids],
+                conn.batch([('GET', f"apSyslogServerProfiles/{id}", None) for domain, id in ids], concurrency=concurrency),
+            ))
 
-    # Delete
-    elif current_syslog is not None and state == 'absent':
-        result['changed'] = True
-        if not module.check_mode:
-            resp = conn.delete(f"apSyslogServerProfiles/{current_syslog['id']}", expected_code=200)
-        new_syslog = None
+    if domains:
+        result['domains'] = dict(
+            (domain, OUTCOMES[requests[domain][0]] if domain in requests else 'unchanged')
+            for domain in domain_ids
+        )
 
     # Diff
     if result['changed'] and module._diff:
-        result['diff'] = dict(
-            before=current_syslog,
-            after=new_syslog,
-        )
-    module.exit_json(**result, current_syslog=current_syslog)
+        if domains:
+            result['diff'] = dict(
+                before=dict((domain, current[domain]) for domain in requests),
+                after=dict((domain, after[domain]) for domain in requests),
+            )
+        else:
+            result['diff'] = dict(
+                before=current[None],
+                after=after[None],
+            )
+    if not domains:
+        result['current_syslog'] = current[None]
+    module.exit_json(**result)
 
 
 if __name__ == '__main__':
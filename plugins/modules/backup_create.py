@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: backup_create
+
+short_description: Create a SmartZone configuration backup
+
+description:
+    - Create a configuration backup and wait until the controller has finished it.
+    - The backup list is polled with a growing interval instead of a fixed sleep.
+
+options:
+    wait:
+        description: Wait for the backup to show up in the backup list.
+        type: bool
+        default: true
+    timeout:
+        description: Seconds to wait for the backup.
+        type: int
+        default: 600
+    poll_interval:
+        description: Seconds between the first polls, the interval grows up to 30 seconds while waiting.
+        type: float
+        default: 2
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Backup the configuration before the upgrade
+  backup_create:
+    timeout: 900
+'''
+
+RETURN = r'''
+backup:
+    description: The new backup, not set in check mode or without I(wait).
+    returned: success
+    type: dict
+polls:
+    description: Number of times the backup list was checked.
+    returned: success
+    type: int
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.poller import Poller, PollTimeout
+
+
+def main():
+    argument_spec = dict(
+        wait=dict(type='bool', default=True),
+        timeout=dict(type='int', default=600),
+        poll_interval=dict(type='float', default=2),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=True)
+
+    # Params
+    wait = module.params.get('wait')
+    timeout = module.params.get('timeout')
+    poll_interval = module.params.get('poll_interval')
+
+    if module.check_mode:
+        module.exit_json(**result)
+
+    # Create
+    known = set(backup['id'] for backup in conn.retrive_list('configuration'))
+    conn.post('configuration/backup', payload=None, expected_code=204)
+
+    # Wait
+    if wait:
+        def check():
+            new = [backup for backup in conn.retrive_list('configuration') if backup['id'] not in known]
+            return bool(new), dict(backups=len(known) + len(new), new=new)
+
+        poller = Poller(timeout=timeout, interval=poll_interval)
+        try:
+            progress = poller.wait(check)
+        except PollTimeout as e:
+            module.fail_json(msg=str(e), polls=poller.polls, **result)
+        result['backup'] = progress['new'][0]
+        result['polls'] = poller.polls
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
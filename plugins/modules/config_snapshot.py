@@ -0,0 +1,295 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: config_snapshot
+
+short_description: Dump the SmartZone configuration into a file
+
+description:
+    - Write a point-in-time dump of the configuration managed by this collection into a gzip
+      compressed JSON lines file.
+    - Every line holds one object as a JSON object with the keys C(endpoint), C(id) and C(data), with sorted keys.
+      The lines are sorted by endpoint and id, so two snapshots of the same configuration are identical
+      and can be compared with M(scsitteam.smartzone.config_snapshot_diff).
+    - Per zone endpoints like C(rkszones/*/wlans) hold the objects of all zones, their id is prefixed
+      by the zone id as C(<zoneId>/<id>).
+    - The requests are sent in batches with up to I(concurrency) requests at the same time.
+    - Only one endpoint is kept in memory at a time.
+
+options:
+    path:
+        description: File to write the snapshot to.
+        type: path
+        required: true
+    endpoints:
+        description: Endpoints to include, all if not set.
+        type: list
+        elements: str
+        choices:
+            - accountSecurity
+            - adminaaa
+            - apRules
+            - apSnmpAgentProfiles
+            - apSyslogServerProfiles
+            - certstore/certificate
+            - certstore/setting
+            - certstore/trustedCAChainCert
+            - configurationSettings/autoExportBackup
+            - configurationSettings/scheduleBackup
+            - ftps
+            - rkszones
+            - rkszones/*/aaa/radius
+            - rkszones/*/apgroups
+            - rkszones/*/profile/ethernetPort
+            - rkszones/*/wlangroups
+            - rkszones/*/wlans
+            - system/apSettings/approval
+            - system/snmpAgent
+            - system/syslog
+            - system/systemTime
+            - userGroups
+            - users
+    details:
+        description:
+            - Fetch every object of endpoints whose list only returns a summary, like zones and WLANs.
+            - Without details only the summaries are dumped, which is much faster.
+        type: bool
+        default: true
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Nightly configuration snapshot
+  config_snapshot:
+    path: "/srv/snapshots/{{ inventory_hostname }}-{{ ansible_date_time.date }}.jsonl.gz"
+
+- name: Quick snapshot of the WLANs
+  config_snapshot:
+    path: /tmp/wlans.jsonl.gz
+    endpoints:
+      - rkszones
+      - rkszones/*/wlans
+'''
+
+RETURN = r'''
+checksum:
+    description: SHA256 checksum of the uncompressed snapshot.
+    returned: success
+    type: str
+items:
+    description: Number of objects in the snapshot.
+    returned: success
+    type: int
+endpoints:
+    description: Number of objects, number of requests and seconds spent per endpoint.
+    returned: success
+    type: dict
+    sample:
+        rkszones/*/wlans:
+            items: 1200
+            requests: 1242
+            seconds: 12.3
+'''
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+
+GLOBAL_LISTS = [
+    'accountSecurity', 'adminaaa', 'apRules', 'apSnmpAgentProfiles', 'apSyslogServerProfiles',
+    'certstore/certificate', 'certstore/trustedCAChainCert', 'rkszones',
+]
+QUERY_LISTS = ['ftps', 'userGroups', 'users']
+ZONE_LISTS = ['rkszones/*/aaa/radius', 'rkszones/*/apgroups', 'rkszones/*/profile/ethernetPort', 'rkszones/*/wlangroups', 'rkszones/*/wlans']
+SINGLETONS = [
+    'certstore/setting', 'configurationSettings/autoExportBackup', 'configurationSettings/scheduleBackup',
+    'system/apSettings/approval', 'system/snmpAgent', 'system/syslog', 'system/systemTime',
+]
+ENDPOINTS = sorted(GLOBAL_LISTS + QUERY_LISTS + ZONE_LISTS + SINGLETONS)
+# List views returning only a summary of each object
+SUMMARIES = ['apRules', 'rkszones', 'rkszones/*/aaa/radius', 'rkszones/*/apgroups', 'rkszones/*/profile/ethernetPort', 'rkszones/*/wlans']
+
+PAGE_SIZE = 1000
+# Requests per batch, bounds the memory of the responses in flight
+WINDOW = 100
+
+
+def windows(requests):
+    for start in range(0, len(requests), WINDOW):
+        yield requests[start:start + WINDOW]
+
+
+def fetch_lists(conn, paths, concurrency, stats):
+    """Return the items of the list endpoints `paths`, first pages of all paths go in the same batches."""
+    items = dict()
+    more = []
+    for window in windows(paths):
+        pages = conn.batch([('GET', f"{path}?index=0&listSize={PAGE_SIZE}", None) for path in window], concurrency=concurrency)
+        stats['requests'] += len(window)
+        for path, page in zip(window, pages):
+            items[path] = page['list']
+            if page['hasMore'] and page['list']:
+                more.extend((path, index) for index in range(len(page['list']), page['totalCount'], len(page['list'])))
+    for window in windows(more):
+        pages = conn.batch([('GET', f"{path}?index={index}&listSize={PAGE_SIZE}", None) for path, index in window], concurrency=concurrency)
+        stats['requests'] += len(window)
+        for (path, index), page in zip(window, pages):
+            items[path].extend(page['list'])
+    return items
+
+
+def fetch_query(conn, endpoint, concurrency, stats):
+    query = dict(page=1, limit=PAGE_SIZE)
+    page = conn.post(f"{endpoint}/query", payload=query, expected_code=200)
+    stats['requests'] += 1
+    items = page['list']
+    if page.get('hasMore') and page['list']:
+        pages = range(2, (page['totalCount'] + PAGE_SIZE - 1) // PAGE_SIZE + 1)
+        for window in windows(list(pages)):
+            for page in conn.batch([('POST', f"{endpoint}/query", dict(query, page=p), 200) for p in window], concurrency=concurrency):
+                items.extend(page['list'])
+            stats['requests'] += len(window)
+    return items
+
+
+def fetch_details(conn, entries, concurrency, stats):
+    """Replace the summaries in `entries` of (path, item) by the objects themselves."""
+    details = []
+    for window in windows(entries):
+        details.extend(conn.batch([('GET', f"{path}/{item['id']}", None) for path, item in window], concurrency=concurrency))
+        stats['requests'] += len(window)
+    return [(path, detail) for (path, item), detail in zip(entries, details)]
+
+
+def item_id(endpoint, list_path, item):
+    """Return the id of `item` in the snapshot, the id of objects of a zone is prefixed by the zone id."""
+    id = str(item.get('id') or item.get('name') or '')
+    if endpoint in ZONE_LISTS:
+        # The summaries do not tell the zone, the list path rkszones/<zoneId>/... does
+        return f"{list_path.split('/')[1]}/{id}"
+    return id
+
+
+def file_checksum(path):
+    checksum = hashlib.sha256()
+    try:
+        with gzip.open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                checksum.update(chunk)
+    except (OSError, EOFError):
+        return None
+    return checksum.hexdigest()
+
+
+def main():
+    argument_spec = dict(
+        path=dict(type='path', required=True),
+        endpoints=dict(type='list', elements='str', choices=ENDPOINTS),
+        details=dict(type='bool', default=True),
+        concurrency=dict(type='int', default=4),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False, endpoints=dict(), items=0)
+
+    # Params
+    path = module.params.get('path')
+    endpoints = sorted(set(module.params.get('endpoints') or ENDPOINTS))
+    details = module.params.get('details')
+    concurrency = max(1, module.params.get('concurrency'))
+
+    previous = file_checksum(path) if os.path.exists(path) else None
+    checksum = hashlib.sha256()
+    tmp = raw = out = None
+    if not module.check_mode:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.snapshot-')
+        raw = os.fdopen(fd, 'wb')
+        # No name and time in the header, identical snapshots give identical files
+        out = gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+
+    zone_ids = None
+    try:
+        for endpoint in endpoints:
+            start = time.monotonic()
+            stats = dict(requests=0)
+
+            if endpoint in SINGLETONS:
+                entries = [(endpoint, conn.get(endpoint))]
+                stats['requests'] += 1
+            elif endpoint in QUERY_LISTS:
+                entries = [(endpoint, item) for item in fetch_query(conn, endpoint, concurrency, stats)]
+            else:
+                if endpoint in ZONE_LISTS:
+                    if zone_ids is None:
+                        zone_ids = [zone['id'] for zone in fetch_lists(conn, ['rkszones'], concurrency, stats)['rkszones']]
+                    paths = [endpoint.replace('*', zone_id) for zone_id in zone_ids]
+                else:
+                    paths = [endpoint]
+                entries = [
+                    (list_path, item)
+                    for list_path, items in fetch_lists(conn, paths, concurrency, stats).items()
+                    for item in items
+                ]
+                if endpoint == 'rkszones':
+                    zone_ids = [item['id'] for list_path, item in entries]
+                if details and endpoint in SUMMARIES:
+                    entries = fetch_details(conn, entries, concurrency, stats)
+
+            lines = sorted(
+                (key, json.dumps(dict(endpoint=endpoint, id=key, data=item), sort_keys=True, separators=(',', ':')))
+                for key, item in ((item_id(endpoint, list_path, item), item) for list_path, item in entries)
+            )
+            for key, line in lines:
+                data = f"{line}\n".encode('utf-8')
+                checksum.update(data)
+                if out:
+                    out.write(data)
+
+            result['items'] += len(lines)
+            result['endpoints'][endpoint] = dict(items=len(lines), requests=stats['requests'], seconds=round(time.monotonic() - start, 3))
+            del entries, lines
+
+        if out:
+            out.close()
+            raw.close()
+            module.atomic_move(tmp, path)
+            tmp = None
+    finally:
+        if raw and not raw.closed:
+            out.close()
+            raw.close()
+        if tmp and os.path.exists(tmp):
+            os.unlink(tmp)
+
+    result['checksum'] = checksum.hexdigest()
+    result['changed'] = result['checksum'] != previous
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
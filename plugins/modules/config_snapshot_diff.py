@@ -0,0 +1,203 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: config_snapshot_diff
+
+short_description: Compare two SmartZone configuration snapshots
+
+description:
+    - Compare two snapshots written by M(scsitteam.smartzone.config_snapshot) and list the added,
+      removed and modified objects.
+    - Both files are read line by line at the same time and aligned by endpoint and id, so
+      only the current object of each file is held in memory.
+    - Fails if a snapshot is not sorted or holds an object more than once.
+    - Modified objects list the changed fields with the path into the object, nested objects
+      are compared key by key like the modules compare their updates.
+    - The module does not contact the controller and never reports a change.
+
+options:
+    before:
+        description: The older snapshot.
+        type: path
+        required: true
+    after:
+        description: The newer snapshot.
+        type: path
+        required: true
+    max_changes:
+        description: Maximum number of objects listed in I(changes), the summary always counts all of them.
+        type: int
+        default: 1000
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Detect configuration drift since yesterday
+  config_snapshot_diff:
+    before: "/srv/snapshots/{{ inventory_hostname }}-yesterday.jsonl.gz"
+    after: "/srv/snapshots/{{ inventory_hostname }}-today.jsonl.gz"
+  delegate_to: localhost
+  register: drift
+
+- name: Fail on drift
+  ansible.builtin.assert:
+    that: not drift.drift
+'''
+
+RETURN = r'''
+drift:
+    description: Whether the snapshots differ.
+    returned: success
+    type: bool
+summary:
+    description: Number of C(added), C(removed), C(modified) and C(unchanged) objects.
+    returned: success
+    type: dict
+changes:
+    description: The differing objects, sorted by endpoint and id.
+    returned: success
+    type: list
+    elements: dict
+    sample:
+        - endpoint: rkszones/*/wlans
+          id: 0b3c0c0e-5ff3-4f3e-9a5e-6f1e1c3a4b5d
+          name: Guest
+          change: modified
+          fields:
+            - path: encryption.method
+              before: WPA2
+              after: WPA3
+truncated:
+    description: Whether I(changes) was cut at I(max_changes).
+    returned: success
+    type: bool
+'''
+
+import gzip
+import json
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.diff import iter_changes
+
+
+class Snapshot:
+    """Iterate over the lines of a snapshot, checking they are sorted and unique."""
+
+    def __init__(self, module, path):
+        self.module = module
+        self.path = path
+        try:
+            self._file = gzip.open(path, 'rt', encoding='utf-8')
+        except OSError as e:
+            module.fail_json(msg=f"Could not open snapshot {path}: {e}")
+        self.line = None
+        self.entry = None
+        self.key = None
+        self.advance()
+
+    def advance(self):
+        last = self.key
+        try:
+            self.line = self._file.readline()
+        except (OSError, EOFError) as e:
+            self.module.fail_json(msg=f"Could not read snapshot {self.path}: {e}")
+        if not self.line:
+            self.line = self.entry = self.key = None
+            self._file.close()
+            return
+        self.entry = None
+        self.key = (self.parsed['endpoint'], self.parsed['id'])
+        if last is not None and self.key < last:
+            self.module.fail_json(msg=f"Snapshot {self.path} is not sorted at {self.key[0]} {self.key[1]}.")
+        if self.key == last:
+            self.module.fail_json(msg=f"Snapshot {self.path} holds {self.key[0]} {self.key[1]} more than once.")
+
+    @property
+    def parsed(self):
+        if self.entry is None:
+            try:
+                self.entry = json.loads(self.line)
+            except ValueError as e:
+                self.module.fail_json(msg=f"Invalid line in snapshot {self.path}: {e}")
+        return self.entry
+
+
+def describe(entry, change):
+    data = entry['data']
+    return dict(
+        endpoint=entry['endpoint'],
+        id=entry['id'],
+        name=data.get('name') or data.get('userName') or data.get('ftpName') or data.get('description'),
+        change=change,
+    )
+
+
+def main():
+    argument_spec = dict(
+        before=dict(type='path', required=True),
+        after=dict(type='path', required=True),
+        max_changes=dict(type='int', default=1000),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    result = dict(changed=False, changes=[], truncated=False)
+
+    # Params
+    before = Snapshot(module, module.params.get('before'))
+    after = Snapshot(module, module.params.get('after'))
+    max_changes = module.params.get('max_changes')
+
+    summary = dict(added=0, removed=0, modified=0, unchanged=0)
+
+    def report(change):
+        summary[change['change']] += 1
+        if len(result['changes']) < max_changes:
+            result['changes'].append(change)
+        else:
+            result['truncated'] = True
+
+    # Merge join on (endpoint, id)
+    while before.line is not None or after.line is not None:
+        if before.line is not None and before.line == after.line:
+            summary['unchanged'] += 1
+            before.advance()
+            after.advance()
+        elif after.line is None or (before.line is not None and before.key < after.key):
+            report(describe(before.parsed, 'removed'))
+            before.advance()
+        elif before.line is None or after.key < before.key:
+            report(describe(after.parsed, 'added'))
+            after.advance()
+        else:
+            fields = [
+                dict(path='.'.join(str(p) for p in path), before=old, after=new)
+                for path, old, new in iter_changes(before.parsed['data'], after.parsed['data'])
+            ]
+            if fields:
+                report(dict(describe(after.parsed, 'modified'), fields=fields))
+            else:
+                summary['unchanged'] += 1
+            before.advance()
+            after.advance()
+
+    result['summary'] = summary
+    result['drift'] = bool(summary['added'] or summary['removed'] or summary['modified'])
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
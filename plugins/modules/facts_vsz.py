@@ -14,6 +14,27 @@ short_description: Gathers facts the SmartZone instance
 
 description:
     - This module can be used to gathers facts bouthe the SmartZone api and cluster.
+    - The objects and lists of the selected subsets are requested together, with up to
+      I(max_workers) requests at the same time.
+    - The facts are returned as C(ansible_facts) and are therefore stored in the
+      Ansible fact cache if C(fact_caching) is configured. Later plays can check
+      C(smartzone_gathered_subset) to skip gathering again.
+
+options:
+    gather_subset:
+        description:
+            - Restrict the facts collected to the given subsets.
+            - Possible values are C(all), C(min), C(api), C(cluster), C(nodes), C(zones),
+              C(licenses), C(aps) and C(firmware).
+            - C(min) is a shortcut for C(api) and C(cluster).
+            - Prefix a subset with C(!) to exclude it.
+        type: list
+        elements: str
+        default: [min]
+    max_workers:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
 
 author:
     - Marius Rieder (@jiuka)
@@ -22,6 +43,17 @@ author:
 EXAMPLES = r'''
 - name: Gather SmartZone facts
   scsitteam.smartzone.facts_vsz:
+
+- name: Gather all SmartZone facts except the firmware versions
+  scsitteam.smartzone.facts_vsz:
+    gather_subset:
+      - all
+      - '!firmware'
+
+- name: Gather zone facts unless they are already in the fact cache
+  scsitteam.smartzone.facts_vsz:
+    gather_subset: zones
+  when: "'zones' not in smartzone_gathered_subset | default([])"
 '''
 
 RETURN = r'''
@@ -41,9 +73,20 @@ ansible_facts:
             "v11_1"
         ],
         "smartzone_cluster_name": "ANSIBLE-TEST-CLUSTER",
+        "smartzone_cluster_nodes": [
+            {
+                "id": "01234567-89ab-cdef-0000-0123456789ab",
+                "name": "smartzone",
+                "state": "In_Service"
+            }
+        ],
         "smartzone_cluster_role": "Leader",
         "smartzone_cluster_state": "In_Service",
         "smartzone_domain_id": "01234567-89ab-cdef-0000-0123456789ab",
+        "smartzone_gathered_subset": [
+            "api",
+            "cluster"
+        ],
         "smartzone_node_id": "01234567-89ab-cdef-0000-0123456789ab",
         "smartzone_node_name": "smartzone"
     }
@@ -52,29 +95,133 @@ ansible_facts:
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
 
+CONTROLLER_KEYS = ['id', 'name', 'hostName', 'model', 'serialNumber', 'mac', 'managementIp', 'version', 'apVersion', 'uptimeInSec']
 
-def main():
-    """main entry point for module execution
-    """
-    module = AnsibleModule(argument_spec=dict(),
-                           supports_check_mode=True)
-    conn = SmartZoneConnection(module)
-
-    session = conn.get('session')
-    cluster_state = conn.get('cluster/state')
 
-    facts = dict(
+def gather_api(conn, data, concurrency):
+    session = data['session']
+    return dict(
         smartzone_api_supported_version=session['apiVersions'],
         smartzone_api_latest_version=session['apiVersions'][-1],
         smartzone_admin_id=session['adminId'],
         smartzone_domain_id=session['domainId'],
+    )
+
+
+def gather_cluster(conn, data, concurrency):
+    cluster_state = data['cluster/state']
+    return dict(
         smartzone_cluster_name=cluster_state['clusterName'],
         smartzone_cluster_state=cluster_state['clusterState'],
         smartzone_cluster_role=cluster_state['clusterRole'],
+        smartzone_cluster_nodes=[
+            dict(id=node['nodeId'], name=node['nodeName'], state=node['nodeState'])
+            for node in cluster_state.get('nodeStateList') or []
+        ],
         smartzone_node_id=cluster_state['currentNodeId'],
         smartzone_node_name=cluster_state['currentNodeName'],
     )
 
+
+def gather_nodes(conn, data, concurrency):
+    return dict(
+        smartzone_controllers=[
+            {key: controller.get(key) for key in CONTROLLER_KEYS}
+            for controller in data['controller']
+        ],
+    )
+
+
+def gather_zones(conn, data, concurrency):
+    zones = [dict(id=zone['id'], name=zone['name']) for zone in data['rkszones']]
+    return dict(
+        smartzone_zones=zones,
+        smartzone_zone_count=len(zones),
+    )
+
+
+def gather_licenses(conn, data, concurrency):
+    return dict(
+        smartzone_licenses=data['licensesSummary'],
+    )
+
+
+def gather_aps(conn, data, concurrency):
+    return dict(
+        smartzone_ap_count=data['aps?listSize=1']['totalCount'],
+    )
+
+
+def gather_firmware(conn, data, concurrency):
+    zones = data['rkszones']
+    apfirmwares = conn.batch([('GET', f"rkszones/{zone['id']}/apFirmware", None) for zone in zones], concurrency=concurrency)
+    return dict(
+        smartzone_controller_versions={
+            controller['name']: controller.get('version')
+            for controller in data['controller']
+        },
+        smartzone_zone_firmware=dict(
+            (zone['name'], apfirmware['firmwareVersion'])
+            for zone, apfirmware in zip(zones, apfirmwares)
+        ),
+    )
+
+
+# The objects and paged lists every subset needs, and the function building its facts from them
+SUBSETS = dict(
+    api=dict(get=['session'], lists=[], facts=gather_api),
+    cluster=dict(get=['cluster/state'], lists=[], facts=gather_cluster),
+    nodes=dict(get=[], lists=['controller'], facts=gather_nodes),
+    zones=dict(get=[], lists=['rkszones'], facts=gather_zones),
+    licenses=dict(get=[], lists=['licensesSummary'], facts=gather_licenses),
+    aps=dict(get=['aps?listSize=1'], lists=[], facts=gather_aps),
+    firmware=dict(get=[], lists=['rkszones', 'controller'], facts=gather_firmware),
+)
+
+
+def resolve_subsets(module, gather_subset):
+    include = set()
+    exclude = set()
+    for subset in gather_subset:
+        target = exclude if subset.startswith('!') else include
+        subset = subset.lstrip('!')
+        if subset == 'all':
+            target.update(SUBSETS)
+        elif subset == 'min':
+            target.update(['api', 'cluster'])
+        elif subset in SUBSETS:
+            target.add(subset)
+        else:
+            module.fail_json(msg=f"Unknown gather_subset '{subset}', expected one of: all, min, {', '.join(SUBSETS)}")
+    return sorted(include - exclude)
+
+
+def main():
+    """main entry point for module execution
+    """
+    argument_spec = dict(
+        gather_subset=dict(type='list', elements='str', default=['min']),
+        max_workers=dict(type='int', default=4),
+    )
+
+    module = AnsibleModule(argument_spec=argument_spec,
+                           supports_check_mode=True)
+    conn = SmartZoneConnection(module)
+
+    # Params
+    subsets = resolve_subsets(module, module.params.get('gather_subset'))
+    max_workers = max(1, module.params.get('max_workers'))
+
+    # Fetch what the subsets need, each object and list once
+    gets = sorted(set(ressource for subset in subsets for ressource in SUBSETS[subset]['get']))
+    lists = sorted(set(ressource for subset in subsets for ressource in SUBSETS[subset]['lists']))
+    data = dict(zip(gets, conn.batch([('GET', ressource, None) for ressource in gets], concurrency=max_workers)))
+    data.update(conn.retrive_lists(lists, concurrency=max_workers))
+
+    facts = dict(smartzone_gathered_subset=subsets)
+    for subset in subsets:
+        facts.update(SUBSETS[subset]['facts'](conn, data, max_workers))
+
     module.exit_json(ansible_facts=facts)
 
 
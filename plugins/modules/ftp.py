@@ -106,18 +106,7 @@ def main():
     state = module.params.get('state')
 
     # Get current state
-    current_ftp = None
-    query = dict(
-        fullTextSearch=dict(
-            type="OR",
-            value=name,
-            fields=["ftpName"]
-        )
-    )
-    ftps = conn.post('ftps/query', payload=query, expected_code=200)
-    for server in ftps['list']:
-        if server['ftpName'] == name:
-            current_ftp = server
+    current_ftp = next(conn.query('ftps/query', search=name, fields=['ftpName'], exact=True), None)
 
     # Create
     if current_ftp is None and state == 'present':
@@ -137,10 +126,7 @@ def main():
 
         if not module.check_mode:
             conn.post('ftps', payload=new_ftp)
-            ftps = conn.post('ftps/query', payload=query, expected_code=200)
-            for server in ftps['list']:
-                if server['ftpName'] == name:
-                    new_ftp = server
+            new_ftp = next(conn.query('ftps/query', search=name, fields=['ftpName'], exact=True), new_ftp)
         result['ftp'] = new_ftp
     # Update
     elif state == 'present':
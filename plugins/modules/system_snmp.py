@@ -125,6 +125,13 @@ options:
                         description: Notification target port.
                         type: int
                         required: True
+    update_password:
+        description:
+            - C(always) sends the SNMP v3 passwords on every run, the controller does not return them to compare.
+            - C(on_create) only sends them for new users or together with other changes of the SNMP v3 agents.
+        type: str
+        choices: [always, on_create]
+        default: on_create
 
 
 author:
@@ -143,6 +150,12 @@ import copy
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.diff import keyed_list_changes
+
+# Values the controller may leave out of an agent
+AGENT_DEFAULTS = dict(readEnabled=False, writeEnabled=False, notificationEnabled=False, notificationTarget=[])
+# Values the controller does not return in clear
+SECRETS = ['authPassword', 'privPassword']
 
 
 def main():
@@ -185,7 +198,8 @@ def main():
                 ('authProtocol', 'authPassword'),
                 ('privProtocol', 'privPassword'),
             ]
-        )
+        ),
+        update_password=dict(type='str', default='on_create', choices=['always', 'on_create'], no_log=False),
     )
 
     module = AnsibleModule(
@@ -207,6 +221,7 @@ def main():
             } for agent in snmpv2
         ]
     snmpv3 = module.params.get('snmpv3')
+    update_password = module.params.get('update_password')
     if snmpv3:
         snmpv3 = [
             {
@@ -222,14 +237,16 @@ def main():
     if notification is not None and current_snmp['snmpNotificationEnabled'] != notification:
         update_snmp['snmpNotificationEnabled'] = notification
 
-    if snmpv2 is not None and current_snmp['snmpV2Agent'] != snmpv2:
+    if snmpv2 is not None and keyed_list_changes(current_snmp['snmpV2Agent'], snmpv2, 'communityName', AGENT_DEFAULTS):
         update_snmp['snmpV2Agent'] = [
             {
                 k: v for k, v in agent.items() if v is not None
             } for agent in snmpv2
         ]
 
-    if snmpv3 is not None and current_snmp['snmpV3Agent'] != snmpv3:
+    # The controller does not return the passwords, send them on changes or always
+    send_passwords = update_password == 'always' and any(agent.get(secret) for agent in snmpv3 or [] for secret in SECRETS)
+    if snmpv3 is not None and (send_passwords or keyed_list_changes(current_snmp['snmpV3Agent'], snmpv3, 'userName', AGENT_DEFAULTS, ignore=SECRETS)):
         update_snmp['snmpV3Agent'] = [
             {
                 k: v
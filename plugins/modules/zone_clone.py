@@ -0,0 +1,306 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: zone_clone
+
+short_description: Create a zone as copy of an existing zone
+
+description:
+    - Create a new zone with the settings and the AAA servers, ethernet port profiles, WLANs,
+      WLAN groups, AP groups and AP model settings of an existing zone.
+    - All objects of the source zone are read at the same time. They are created in layers, every
+      object after the objects it refers to, and the objects of a layer at the same time. References
+      to objects of the source zone, like the RADIUS profile of a WLAN or the members of a WLAN group,
+      are replaced by the ones of the new zone.
+    - Objects the controller creates with a new zone, like the default AP group, are updated instead.
+    - Nothing is done if the zone exists already.
+    - If creating an object fails, the new zone is deleted again, so the next run starts over.
+    - The members of the AP groups are not copied, an AP belongs to one zone only.
+
+options:
+    source:
+        description: Name of the zone to copy.
+        type: str
+        required: true
+    name:
+        description: Name of the new zone.
+        type: str
+        required: true
+    description:
+        description: Description of the new zone, the one of the source zone if not set.
+        type: str
+    ap_login_password:
+        description: AP login password of the new zone.
+        type: str
+    resources:
+        description:
+            - Objects to copy, the ones they refer to are always copied.
+            - The ethernet port profiles are always copied with I(models), the AP model settings refer to them.
+        type: list
+        elements: str
+        choices: [aaa_radius, ethernet_port, wlans, wlan_groups, ap_groups]
+        default: [aaa_radius, ethernet_port, wlans, wlan_groups, ap_groups]
+    models:
+        description: AP models whose zone settings are copied.
+        type: list
+        elements: str
+        default: []
+    concurrency:
+        description: Maximum number of requests sent at the same time.
+        type: int
+        default: 4
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = r'''
+- name: Setup the new Branch
+  zone_clone:
+    source: Branch Template
+    name: Branch Lausanne
+    ap_login_password: "{{ ap_password }}"
+    models:
+      - R560
+      - R650
+'''
+
+RETURN = r'''
+zone:
+    description: Id and name of the new zone.
+    returned: always
+    type: dict
+created:
+    description: Number of objects created per resource.
+    returned: always
+    type: dict
+updated:
+    description: Number of existing objects updated per resource.
+    returned: always
+    type: dict
+layers:
+    description: The resources in the order they are created, the ones of a layer at the same time.
+    returned: always
+    type: list
+    elements: list
+    sample: [[aaa_radius, ethernet_port], [wlans], [wlan_groups], [ap_groups]]
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.vsz import SmartZoneConnection, SmartZoneError
+
+# Sub-ressources of a zone and the ones they refer to
+RESOURCES = dict(
+    aaa_radius=dict(path='aaa/radius', depends=[]),
+    ethernet_port=dict(path='profile/ethernetPort', depends=[]),
+    wlans=dict(path='wlans', depends=['aaa_radius']),
+    wlan_groups=dict(path='wlangroups', depends=['wlans']),
+    ap_groups=dict(path='apgroups', depends=['wlan_groups']),
+)
+# Fields referring to other objects of the zone, `*` stands for all items of a list or dict
+REFERENCES = dict(
+    wlans=[('authServiceOrProfile', 'id'), ('accountingServiceOrProfile', 'id')],
+    wlan_groups=[('members', '*', 'id')],
+    ap_groups=[('radioConfig', '*', 'wlanGroupId')],
+    ap_models=[('lanPorts', '*', 'ethPortProfile', 'id')],
+)
+# Fields set by the controller
+READ_ONLY = [
+    'id', 'zoneId', 'createDateTime', 'creatorId', 'creatorUsername', 'modifiedDateTime', 'modifierId', 'modifierUsername',
+]
+# Fields not copied to the new zone
+EXCLUDE = dict(
+    ap_groups=['members'],
+)
+# Create ressource by WLAN type
+WLAN_TYPES = dict(
+    Standard_Open='wlans',
+    Standard_8021X='wlans/standard8021X',
+)
+
+
+def with_dependencies(resources, models):
+    resources = set(resources)
+    if models:
+        # The AP model settings refer to ethernet port profiles
+        resources.add('ethernet_port')
+    while True:
+        depends = set(d for name in resources for d in RESOURCES[name]['depends'])
+        if depends <= resources:
+            return resources
+        resources |= depends
+
+
+def layers(resources):
+    """Group `resources` into layers, each one after the layers of the ones it depends on."""
+    remaining = dict((name, set(RESOURCES[name]['depends'])) for name in resources)
+    result = []
+    while remaining:
+        layer = sorted(name for name, depends in remaining.items() if not depends)
+        result.append(layer)
+        for name in layer:
+            del remaining[name]
+        for depends in remaining.values():
+            depends.difference_update(layer)
+    return result
+
+
+def rewrite_ids(value, path, ids):
+    """Replace the id at `path` in `value` by the one in `ids`."""
+    if not path:
+        return ids.get(value, value) if isinstance(value, str) else value
+    key, path = path[0], path[1:]
+    if key == '*' and isinstance(value, list):
+        return [rewrite_ids(item, path, ids) for item in value]
+    if key == '*' and isinstance(value, dict):
+        return dict((k, rewrite_ids(item, path, ids)) for k, item in value.items())
+    if isinstance(value, dict) and value.get(key) is not None:
+        return dict(value, **{key: rewrite_ids(value[key], path, ids)})
+    return value
+
+
+def payload(item, resource, ids):
+    """Return `item` without the fields set by the controller and with the references replaced."""
+    exclude = READ_ONLY + EXCLUDE.get(resource, [])
+    item = dict((key, value) for key, value in item.items() if key not in exclude and value is not None)
+    for path in REFERENCES.get(resource, []):
+        item = rewrite_ids(item, path, ids)
+    return item
+
+
+def main():
+    argument_spec = dict(
+        source=dict(type='str', required=True),
+        name=dict(type='str', required=True),
+        description=dict(type='str'),
+        ap_login_password=dict(type='str', no_log=True),
+        resources=dict(type='list', elements='str', choices=list(RESOURCES), default=list(RESOURCES)),
+        models=dict(type='list', elements='str', default=[]),
+        concurrency=dict(type='int', default=4),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+    conn = SmartZoneConnection(module)
+    result = dict(changed=False, created=dict(), updated=dict(), layers=[])
+
+    # Params
+    source = module.params.get('source')
+    name = module.params.get('name')
+    description = module.params.get('description')
+    ap_login_password = module.params.get('ap_login_password')
+    models = list(dict.fromkeys(module.params.get('models')))
+    resources = with_dependencies(module.params.get('resources'), models)
+    concurrency = max(1, module.params.get('concurrency'))
+
+    # Resolve Zones
+    source_zone = None
+    for zone in conn.retrive_list('rkszones', prefetch=True, concurrency=concurrency):
+        if zone['name'] == name:
+            result['zone'] = dict(id=zone['id'], name=zone['name'])
+            module.exit_json(**result)
+        if zone['name'] == source and source_zone is None:
+            source_zone = zone
+    if source_zone is None:
+        module.fail_json(msg=f"Could not find zone '{source}'.")
+
+    # Read source zone
+    paths = dict((resource, f"rkszones/{source_zone['id']}/{RESOURCES[resource]['path']}") for resource in resources)
+    lists = conn.retrive_lists(paths.values(), concurrency=concurrency)
+    entries = [(resource, item) for resource in sorted(resources) for item in lists[paths[resource]]]
+    requests = [('GET', f"rkszones/{source_zone['id']}", None)]
+    requests.extend(('GET', f"{paths[resource]}/{item['id']}", None) for resource, item in entries)
+    requests.extend(('GET', f"rkszones/{source_zone['id']}/apmodel/{model}", None) for model in models)
+    details = conn.batch(requests, concurrency=concurrency)
+    source_zone = details[0]
+    items = dict((resource, []) for resource in resources)
+    for (resource, item), detail in zip(entries, details[1:len(entries) + 1]):
+        items[resource].append(detail)
+    model_configs = details[len(entries) + 1:]
+
+    for wlan in items.get('wlans', []):
+        if wlan.get('type', 'Standard_Open') not in WLAN_TYPES:
+            module.fail_json(msg=f"Creation of WLAN '{wlan['name']}' of type {wlan['type']} not suported.")
+
+    result['layers'] = layers(resources)
+    result['created'] = dict((resource, len(items[resource])) for resource in sorted(resources))
+    result['updated'] = dict((resource, 0) for resource in sorted(resources))
+    result['changed'] = True
+    if module.check_mode:
+        module.exit_json(**result)
+
+    # Create zone
+    ids = dict()
+    new_zone = payload(source_zone, 'zone', ids)
+    new_zone['name'] = name
+    if description is not None:
+        new_zone['description'] = description
+    if ap_login_password is not None:
+        new_zone.setdefault('login', dict())['apLoginPassword'] = ap_login_password
+    zone_id = conn.post('rkszones', payload=new_zone)['id']
+    ids[source_zone['id']] = zone_id
+    result['zone'] = dict(id=zone_id, name=name)
+
+    try:
+        with conn.raising():
+            # Objects created with the zone
+            target_paths = dict((resource, f"rkszones/{zone_id}/{RESOURCES[resource]['path']}") for resource in resources)
+            target_lists = conn.retrive_lists(target_paths.values(), concurrency=concurrency)
+            existing = dict(
+                ((resource, item['name']), item['id'])
+                for resource in resources
+                for item in target_lists[target_paths[resource]]
+            )
+
+            # Create layer by layer
+            for layer in result['layers']:
+                requests = []
+                for resource in layer:
+                    for item in items[resource]:
+                        new_item = payload(item, resource, ids)
+                        if (resource, item['name']) in existing:
+                            ids[item['id']] = existing[(resource, item['name'])]
+                            requests.append((resource, item, ('PATCH', f"{target_paths[resource]}/{ids[item['id']]}", new_item)))
+                            result['created'][resource] -= 1
+                            result['updated'][resource] += 1
+                        elif resource == 'wlans':
+                            ressource = f"rkszones/{zone_id}/{WLAN_TYPES[item.get('type', 'Standard_Open')]}"
+                            requests.append((resource, item, ('POST', ressource, new_item)))
+                        else:
+                            requests.append((resource, item, ('POST', target_paths[resource], new_item)))
+                responses = conn.batch([request for resource, item, request in requests], concurrency=concurrency)
+                for (resource, item, request), response in zip(requests, responses):
+                    if request[0] == 'POST':
+                        ids[item['id']] = response['id']
+
+            # AP Models
+            conn.batch([
+                ('PUT', f"rkszones/{zone_id}/apmodel/{model}", payload(config, 'ap_models', ids))
+                for model, config in zip(models, model_configs)
+            ], concurrency=concurrency)
+    except SmartZoneError as e:
+        # Remove the half-built zone, the next run would take it as cloned
+        try:
+            conn.send('DELETE', f"rkszones/{zone_id}")
+        except SmartZoneError as delete_error:
+            module.fail_json(msg=f"{e}, deleting the new zone '{name}' failed: {delete_error}",
+                             status_code=e.status_code, body=e.body, error=type(e).__name__)
+        module.fail_json(msg=f"{e}, deleted the new zone '{name}'", status_code=e.status_code, body=e.body, error=type(e).__name__)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+
+class ResponseCache:
+    """Response texts of GET requests kept on disk for `ttl` seconds.
+
+    Entries are stored per controller and API version, one small JSON file
+    per path, so all connection processes and later playbook runs share
+    them. Files are replaced atomically, a concurrent reader sees either the
+    old or the new entry.
+    """
+
+    def __init__(self, directory, controller, version, ttl):
+        self.directory = directory
+        self.prefix = re.sub(r'[^A-Za-z0-9_.-]', '_', f"smartzone-cache-{controller}-{version}")
+        self.ttl = float(ttl)
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, path):
+        digest = hashlib.sha1(path.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{self.prefix}-{digest}.json")
+
+    def get(self, path):
+        """Return the cached response text of `path`, None if there is none or it is older than the ttl."""
+        try:
+            with open(self._path(path)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('path') != path or time.time() - entry.get('stored', 0) > self.ttl:
+            return None
+        return entry.get('response')
+
+    def put(self, path, response):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{self.prefix}-")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(dict(path=path, stored=time.time(), response=response), f)
+            os.replace(tmp, self._path(path))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import collections
+import gzip
+import json
+import re
+import threading
+import time
+import zlib
+
+from ansible.errors import AnsibleConnectionFailure
+
+CASSETTE_VERSION = 1
+SCRUBBED = '********'
+# Keys ending in one of these, like password, apLoginPassword, sharedSecret or serviceTicket
+SECRET_KEYS = re.compile(r'(password|passwd|passphrase|secret|ticket|token|privatekey)$', re.IGNORECASE)
+TICKET_PARAM = re.compile(r'([?&])serviceTicket=[^&]*&?')
+
+
+def scrub(value):
+    """Replace the values of secret looking keys."""
+    if isinstance(value, dict):
+        return {
+            k: SCRUBBED if SECRET_KEYS.search(k) and v is not None else scrub(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [scrub(v) for v in value]
+    return value
+
+
+def scrub_path(path):
+    return TICKET_PARAM.sub(r'\1', path).rstrip('?&')
+
+
+def scrub_json(text):
+    if not text:
+        return text
+    try:
+        return json.dumps(scrub(json.loads(text)), separators=(',', ':'), sort_keys=True)
+    except ValueError:
+        return text
+
+
+class Cassette:
+    """Records requests and responses into a gzip compressed JSON lines file and replays them.
+
+    Every line is one interaction with the method, path and request body, the
+    status code, the response text and the time the request took. Secrets
+    and the service ticket are scrubbed before anything is written.
+    """
+
+    def __init__(self, path, mode='record', latency_scale=1.0):
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._file = None
+        self._tape = None
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    @staticmethod
+    def key(method, path, data):
+        return (method, scrub_path(path), scrub_json(data) or '')
+
+    def record(self, method, path, data, code, response_text, elapsed):
+        entry = dict(
+            m=method,
+            p=scrub_path(path),
+            d=scrub_json(data) or '',
+            c=code,
+            r=scrub_json(response_text),
+            t=round(elapsed, 6),
+        )
+        with self._lock:
+            if self._file is None:
+                self._file = gzip.open(self.path, 'at', encoding='utf-8')
+                self._file.write(json.dumps(dict(version=CASSETTE_VERSION)) + '\n')
+            self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            # Keep the file readable even if the connection process gets killed
+            self._file.flush()
+            self._file.buffer.flush(zlib.Z_SYNC_FLUSH)
+
+    def load(self):
+        tape = collections.defaultdict(collections.deque)
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                while True:
+                    try:
+                        line = f.readline()
+                    except EOFError:
+                        # Cassette of a connection that was not closed cleanly
+                        break
+                    if not line:
+                        break
+                    entry = json.loads(line)
+                    if 'version' in entry:
+                        continue
+                    tape[(entry['m'], entry['p'], entry['d'])].append(entry)
+        except (OSError, ValueError) as e:
+            raise AnsibleConnectionFailure(f"Could not load cassette {self.path}: {e}")
+        return tape
+
+    def play(self, method, path, data):
+        with self._lock:
+            if self._tape is None:
+                self._tape = self.load()
+            entries = self._tape.get(self.key(method, path, data))
+            if not entries:
+                raise AnsibleConnectionFailure(f"No recorded response for {method} {scrub_path(path)} in {self.path}")
+            # Identical requests are answered in recorded order, the last
+            # answer is repeated once the recording is exhausted.
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+        if self.latency_scale:
+            time.sleep(entry['t'] * self.latency_scale)
+        return entry['c'], entry['r']
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
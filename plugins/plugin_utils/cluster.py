@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import re
+import threading
+import time
+
+from ansible.module_utils.six.moves.urllib.parse import urlsplit
+
+READ_ONLY_POST = re.compile(r'/(query(/[^/?]+)?|[^/?]+/query)(\?|$)')
+
+
+def is_read_only(method, path):
+    """GETs and the POST based query endpoints do not change anything."""
+    if method == 'GET':
+        return True
+    return method == 'POST' and bool(READ_ONLY_POST.search(path))
+
+
+def node_urls(base_url, addresses):
+    """Build the base URLs of the given node addresses, reusing scheme and port of `base_url`."""
+    base = urlsplit(base_url)
+    urls = []
+    for address in addresses:
+        if not address:
+            continue
+        if ':' not in address and base.port:
+            address = f"{address}:{base.port}"
+        urls.append(f"{base.scheme}://{address}")
+    return urls
+
+
+def discover_addresses(cluster_state, controllers):
+    """Management IPs of the nodes which are In_Service according to `cluster/state`."""
+    healthy = set(
+        node['nodeId']
+        for node in cluster_state.get('nodeStateList') or []
+        if node.get('nodeState') == 'In_Service'
+    )
+    return [
+        controller.get('managementIp')
+        for controller in controllers
+        if controller.get('id') in healthy
+    ]
+
+
+class ClusterNodes:
+    """Round robin over the healthy nodes of a SmartZone cluster.
+
+    For `write_window` seconds after a write no node is returned, so the reads
+    go to the node which took the write until the other nodes have it.
+    """
+
+    def __init__(self, urls, write_window=0.0):
+        self._urls = list(urls)
+        self._index = 0
+        self._lock = threading.Lock()
+        self._write_window = write_window
+        self._written = None
+        self.tickets = {}
+
+    def __len__(self):
+        return len(self._urls)
+
+    def wrote(self):
+        with self._lock:
+            self._written = time.monotonic()
+
+    def next(self):
+        with self._lock:
+            if not self._urls:
+                return None
+            if self._written is not None and time.monotonic() - self._written < self._write_window:
+                return None
+            url = self._urls[self._index % len(self._urls)]
+            self._index += 1
+            return url
+
+    def mark_down(self, url):
+        with self._lock:
+            if url in self._urls:
+                self._urls.remove(url)
+            self.tickets.pop(url, None)
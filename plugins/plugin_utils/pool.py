@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import http.client
+import socket
+import ssl
+import threading
+
+from ansible.module_utils.six.moves.urllib.parse import urlsplit
+
+# Errors of a kept-alive connection the controller closed in the meantime
+STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, BrokenPipeError, ConnectionResetError)
+
+
+class _HTTPConnection(http.client.HTTPConnection):
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        # Small requests on a kept-alive connection must not wait for delayed ACKs
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS connection resuming the last TLS session of its pool."""
+
+    def __init__(self, host, port, pool, **kwargs):
+        super(_HTTPSConnection, self).__init__(host, port, **kwargs)
+        self._pool = pool
+
+    def connect(self):
+        _HTTPConnection.connect(self)
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=self.host, session=self._pool.tls_session)
+        self._pool.handshake(self.sock)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one controller, shared by the threads of a connection.
+
+    At most `size` connections are open at the same time, idle connections
+    are reused and new TLS connections resume the session of the last
+    handshake, so concurrent requests do not each pay a full handshake.
+    """
+
+    def __init__(self, base_url, size=4, validate_certs=True, timeout=30):
+        url = urlsplit(base_url)
+        self.https = url.scheme == 'https'
+        self.host = url.hostname
+        self.port = url.port or (443 if self.https else 80)
+        self.timeout = timeout
+        self.tls_session = None
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self._lock = threading.Lock()
+        self._idle = []
+        self._context = None
+        if self.https:
+            self._context = ssl.create_default_context()
+            if not validate_certs:
+                self._context.check_hostname = False
+                self._context.verify_mode = ssl.CERT_NONE
+        self.stats = dict(connections=0, handshakes=0, resumed=0, requests=0, reused=0)
+
+    def handshake(self, sock):
+        with self._lock:
+            self.stats['handshakes'] += 1
+            if sock.session_reused:
+                self.stats['resumed'] += 1
+            self.tls_session = sock.session
+
+    def _new_connection(self):
+        with self._lock:
+            self.stats['connections'] += 1
+        if self.https:
+            return _HTTPSConnection(self.host, self.port, self, timeout=self.timeout, context=self._context)
+        return _HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _get_connection(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, connection, response):
+        if response.will_close:
+            connection.close()
+            return
+        if self.https and connection.sock is not None:
+            # TLS 1.3 tickets arrive after the handshake, take the latest one
+            with self._lock:
+                self.tls_session = connection.sock.session or self.tls_session
+        with self._lock:
+            self._idle.append(connection)
+
+    def request(self, method, path, data=None, headers=None):
+        """Send a request, return the status code and the response text."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        with self._slots:
+            connection, reused = self._get_connection()
+            try:
+                try:
+                    connection.request(method, path, body=data, headers=headers or {})
+                    response = connection.getresponse()
+                except STALE_ERRORS:
+                    connection.close()
+                    if not reused:
+                        raise
+                    # Closed by the controller while idle, retry once on a new connection
+                    connection, reused = self._new_connection(), False
+                    connection.request(method, path, body=data, headers=headers or {})
+                    response = connection.getresponse()
+                body = response.read()
+            except Exception:
+                connection.close()
+                raise
+            with self._lock:
+                self.stats['requests'] += 1
+                if reused:
+                    self.stats['reused'] += 1
+            self._release(connection, response)
+        return response.status, body.decode('utf-8', errors='replace')
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats['reuse_ratio'] = round(stats['reused'] / stats['requests'], 3) if stats['requests'] else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
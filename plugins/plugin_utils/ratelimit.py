@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fcntl
+import itertools
+import json
+import os
+import re
+import threading
+import time
+
+from contextlib import contextmanager
+
+# Slots of crashed processes are given back after this many seconds
+STALE_SLOT = 300
+POLL_INTERVAL = 0.05
+
+
+class RateLimiter:
+    """Token bucket and in-flight limit shared by all processes talking to one controller.
+
+    The bucket state lives in a small JSON file which is only read and
+    written while holding an exclusive lock on it, so every persistent
+    connection process (one per fork and host) draws from the same bucket.
+
+    A request sent by a thread already holding a slot, like the login the
+    first request triggers, does not take another one.
+    """
+
+    def __init__(self, directory, controller, rate=0.0, burst=None, max_inflight=0):
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', controller)
+        self.path = os.path.join(directory, f"smartzone-ratelimit-{name}.json")
+        self.rate = float(rate or 0)
+        self.burst = float(burst or max(1.0, self.rate))
+        self.max_inflight = int(max_inflight or 0)
+        self._ids = itertools.count()
+        self._local = threading.Lock()
+        self._held = threading.local()
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _locked_state(self):
+        with self._local, open(self.path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or '{}')
+                except ValueError:
+                    state = {}
+                state.setdefault('tokens', self.burst)
+                state.setdefault('updated', time.time())
+                state.setdefault('inflight', {})
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _try_acquire(self, slot):
+        """Take a token and an in-flight slot, return the seconds to wait if not possible."""
+        with self._locked_state() as state:
+            now = time.time()
+            if self.rate:
+                state['tokens'] = min(self.burst, state['tokens'] + (now - state['updated']) * self.rate)
+            state['updated'] = now
+            state['inflight'] = {
+                key: started
+                for key, started in state['inflight'].items()
+                if now - started < STALE_SLOT and self._alive(int(key.split('-')[0]))
+            }
+
+            if self.max_inflight and len(state['inflight']) >= self.max_inflight:
+                return POLL_INTERVAL
+            if self.rate and state['tokens'] < 1:
+                return max((1 - state['tokens']) / self.rate, 0.001)
+
+            if self.rate:
+                state['tokens'] -= 1
+            if self.max_inflight:
+                state['inflight'][slot] = now
+            return 0
+
+    def acquire(self):
+        slot = f"{os.getpid()}-{threading.get_ident()}-{next(self._ids)}"
+        while True:
+            wait = self._try_acquire(slot)
+            if not wait:
+                return slot
+            time.sleep(wait)
+
+    def release(self, slot):
+        if not self.max_inflight:
+            return
+        with self._locked_state() as state:
+            state['inflight'].pop(slot, None)
+
+    @contextmanager
+    def request(self):
+        if getattr(self._held, 'slot', None):
+            yield
+            return
+        self._held.slot = slot = self.acquire()
+        try:
+            yield
+        finally:
+            self._held.slot = None
+            self.release(slot)
@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Benchmark the modules against the local fake controller.
+
+Every scenario in scenarios.py runs one module (mostly in check mode) against
+tests/fake_vsz/server.py seeded with each of the requested data sizes. The
+module and the vsz HttpApi plugin run in this process; the persistent
+connection socket is emulated by a JSON round trip of every RPC result.
+
+The emulation does not model that ansible-connection serves the RPCs of a
+module one at a time. Only the concurrency inside the connection process
+(send_batch) is real; threads on the module side calling the connection
+concurrently look faster here than they are.
+
+For each run the request count and bytes transferred (as seen by the fake
+server), the wall time, the CPU time and the peak Python memory of this
+process are recorded::
+
+    python tests/benchmarks/bench.py                      # compare against baseline.json
+    python tests/benchmarks/bench.py --sizes 10 1000      # only some sizes
+    python tests/benchmarks/bench.py -k ap_group          # only some scenarios
+    python tests/benchmarks/bench.py --update-baseline    # record new baseline
+    python tests/benchmarks/bench.py --decoded-responses  # decode responses in the connection
+    python tests/benchmarks/bench.py --tls --var ansible_httpapi_vsz_pool_size=4 -v
+
+HttpApi plugin variables can be passed with --var, e.g. to replay a cassette
+recorded in production with its original latencies halved::
+
+    python tests/benchmarks/bench.py -k ap_group --sizes 10 \\
+        --var ansible_httpapi_vsz_cassette=prod.cassette.gz \\
+        --var ansible_httpapi_vsz_cassette_mode=replay \\
+        --var ansible_httpapi_vsz_cassette_latency_scale=0.5
+
+The run fails when a scenario fails or when the request count or the bytes
+transferred exceed the baseline by more than --max-regression. Wall time, CPU time and memory are
+noisy and only checked when --time-regression / --memory-regression are given.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+SERVER = os.path.join(ROOT, 'tests', 'fake_vsz', 'server.py')
+BASELINE = os.path.join(HERE, 'baseline.json')
+
+
+def collection_path():
+    """Return a collections path containing this checkout as scsitteam.smartzone."""
+    parent = os.path.dirname(os.path.dirname(ROOT))
+    if os.path.basename(parent) == 'ansible_collections':
+        return os.path.dirname(parent)
+    base = tempfile.mkdtemp(prefix='smartzone-bench-')
+    os.makedirs(os.path.join(base, 'ansible_collections', 'scsitteam'))
+    os.symlink(ROOT, os.path.join(base, 'ansible_collections', 'scsitteam', 'smartzone'))
+    return base
+
+
+sys.path.insert(0, HERE)
+
+from ansible.module_utils import basic  # noqa: E402
+from ansible.errors import AnsibleConnectionFailure  # noqa: E402
+from ansible.module_utils.six.moves.urllib.error import HTTPError, URLError  # noqa: E402
+from ansible.plugins.loader import httpapi_loader, init_plugin_loader  # noqa: E402
+
+init_plugin_loader([collection_path()])
+
+from ansible_collections.scsitteam.smartzone.plugins.module_utils import vsz as module_utils_vsz  # noqa: E402
+
+from scenarios import SCENARIOS  # noqa: E402
+
+
+# The fake controller uses a self-signed certificate with --tls
+INSECURE = ssl.create_default_context()
+INSECURE.check_hostname = False
+INSECURE.verify_mode = ssl.CERT_NONE
+
+
+class FakeServer:
+    """Run tests/fake_vsz/server.py in a subprocess."""
+
+    def __init__(self, *args, tls=False):
+        self.tmpdir = None
+        if tls:
+            self.tmpdir = tempfile.mkdtemp(prefix='smartzone-bench-tls-')
+            cert = os.path.join(self.tmpdir, 'cert.pem')
+            key = os.path.join(self.tmpdir, 'key.pem')
+            subprocess.run(
+                ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                 '-subj', '/CN=127.0.0.1', '-keyout', key, '-out', cert],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            args += ('--certfile', cert, '--keyfile', key)
+        self.proc = subprocess.Popen(
+            [sys.executable, SERVER, '--port', '0', *args],
+            stdout=subprocess.PIPE, universal_newlines=True,
+        )
+        line = self.proc.stdout.readline()
+        self.port = int(line.rsplit(':', 1)[1])
+        self.url = f"{'https' if tls else 'http'}://127.0.0.1:{self.port}"
+
+    def control(self, action, **payload):
+        data = json.dumps(payload).encode('utf-8') if payload or action != 'stats' else None
+        request = urllib.request.Request(f"{self.url}/_fake/{action}", data=data, method='POST' if data else 'GET')
+        with urllib.request.urlopen(request, context=INSECURE) as response:
+            return json.loads(response.read())
+
+    def stop(self):
+        self.proc.terminate()
+        self.proc.wait()
+        if self.tmpdir:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+class LocalConnection:
+    """Minimal stand-in for the ansible.netcommon httpapi connection plugin."""
+
+    def __init__(self, url, options):
+        self._url = url
+        self._options = options
+        self._auth = None
+        self._connected = False
+        self.httpapi = None
+        self.messages = []
+
+    @property
+    def connected(self):
+        return self._connected
+
+    def _connect(self):
+        if not self._connected:
+            self._connected = True
+            self.httpapi.login(self.get_option('remote_user'), self.get_option('password'))
+
+    def get_option(self, name):
+        return self._options.get(name)
+
+    def queue_message(self, level, message):
+        self.messages.append((level, message))
+
+    def send(self, path, data, method='GET', headers=None, **kwargs):
+        self._connect()
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        request = urllib.request.Request(self._url + path, data=data, method=method, headers=headers or {})
+        try:
+            response = urllib.request.urlopen(request, timeout=self.get_option('persistent_command_timeout'), context=INSECURE)
+        except HTTPError as exc:
+            handled = self.httpapi.handle_httperror(exc)
+            if handled is True:
+                return self.send(path, data, method=method, headers=headers, **kwargs)
+            if handled is False:
+                raise
+            response = handled
+        except URLError as exc:
+            raise AnsibleConnectionFailure(f"Could not connect to {self._url + path}: {exc.reason}")
+        buffer = io.BytesIO(response.read())
+        return response, buffer
+
+
+class RpcProxy:
+    """Emulates ansible.module_utils.connection.Connection for in-process runs.
+
+    Unlike ansible-connection, RPCs from several threads run at the same time.
+    """
+
+    def __init__(self, httpapi):
+        self._httpapi = httpapi
+
+    def __getattr__(self, name):
+        target = getattr(self._httpapi, name, None)
+        if target is None:
+            target = getattr(self._httpapi.connection, name)
+
+        def rpc(*args, **kwargs):
+            # Results cross the persistent connection socket as JSON
+            return json.loads(json.dumps(target(*args, **kwargs)))
+        return rpc
+
+
+def make_httpapi(server, variables=None):
+    """Load the vsz HttpApi plugin, `variables` are its ansible_httpapi_vsz_* variables."""
+    connection = LocalConnection(server.url, dict(
+        remote_user='admin',
+        password='admin',
+        persistent_command_timeout=30,
+        host='127.0.0.1',
+        validate_certs=False,
+    ))
+    httpapi = httpapi_loader.get('scsitteam.smartzone.vsz', connection)
+    httpapi.set_options(var_options=variables or {})
+    connection.httpapi = httpapi
+    return httpapi
+
+
+def load_module(name):
+    return importlib.import_module(f"ansible_collections.scsitteam.smartzone.plugins.modules.{name}")
+
+
+def run_module(name, args, httpapi, check_mode=True):
+    """Run plugins/modules/<name>.py in process, return its result dict."""
+    module = load_module(name)
+    params = dict(args, _ansible_check_mode=check_mode, _ansible_diff=False, _ansible_socket='/nonexistent')
+    basic._ANSIBLE_ARGS = json.dumps(dict(ANSIBLE_MODULE_ARGS=params)).encode('utf-8')
+    if hasattr(basic, '_ANSIBLE_PROFILE'):
+        basic._ANSIBLE_PROFILE = 'legacy'
+
+    original = module_utils_vsz.Connection
+    module_utils_vsz.Connection = lambda socket_path: RpcProxy(httpapi)
+    stdout = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout):
+            try:
+                module.main()
+            except SystemExit:
+                pass
+            except Exception as e:
+                return dict(failed=True, msg=f"{type(e).__name__}: {e}")
+    finally:
+        module_utils_vsz.Connection = original
+    output = stdout.getvalue().strip()
+    try:
+        return json.loads(output[output.index('{'):])
+    except ValueError:
+        return dict(failed=True, msg=f"Unparsable module output: {output[:200]}")
+
+
+def run_scenario(server, scenario, size, variables=None):
+    if 'variables' in scenario:
+        variables = dict(scenario['variables'](), **(variables or {}))
+    httpapi = make_httpapi(server, variables)
+    # Authenticate before measuring, a real connection is already logged in.
+    httpapi.send_request(None, 'session', method='GET')
+    load_module(scenario['module'])
+    args = scenario['args'](size)
+    if scenario.get('warmup'):
+        run_module(scenario['module'], args, httpapi)
+    server.control('reset')
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = run_module(scenario['module'], args, httpapi, scenario.get('check_mode', True))
+    cpu_time = time.process_time() - cpu_start
+    wall_time = time.perf_counter() - start
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    stats = server.control('stats')
+    pool = httpapi.pool_stats()
+    httpapi.logout()
+    return dict(
+        requests=stats['requests'],
+        bytes=stats['bytes_in'] + stats['bytes_out'],
+        wall_time=round(wall_time, 4),
+        cpu_time=round(cpu_time, 4),
+        peak_memory=peak_memory,
+        failed=bool(result.get('failed')),
+        msg=result.get('msg'),
+        endpoints=stats['by_endpoint'],
+        pool=pool,
+    )
+
+
+def compare(key, metrics, baseline, args):
+    failures = []
+    if key not in baseline:
+        return failures
+    base = baseline[key]
+    for metric, limit in [
+        ('requests', args.max_regression),
+        ('bytes', args.max_regression),
+        ('wall_time', args.time_regression),
+        ('cpu_time', args.time_regression),
+        ('peak_memory', args.memory_regression),
+    ]:
+        if limit is None or metric not in base:
+            continue
+        allowed = base[metric] * (1 + limit)
+        if metric in ('wall_time', 'cpu_time'):
+            allowed += 0.05
+        if metrics[metric] > allowed:
+            failures.append(f"{key}: {metric} {metrics[metric]} exceeds baseline {base[metric]} by more than {limit:.0%}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('-k', dest='pattern', help='only run scenarios containing this string')
+    parser.add_argument('--latency', type=float, default=0.0, help='latency of the fake controller in seconds')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--max-regression', type=float, default=0.10, help='allowed request/bytes increase (default 0.10)')
+    parser.add_argument('--time-regression', type=float, help='allowed wall time increase')
+    parser.add_argument('--memory-regression', type=float, help='allowed peak memory increase')
+    parser.add_argument('--output', help='write all results as JSON to this file')
+    parser.add_argument('--var', action='append', default=[], metavar='NAME=VALUE',
+                        help='set an HttpApi plugin variable, e.g. ansible_httpapi_vsz_cassette_mode=replay')
+    parser.add_argument('--tls', action='store_true', help='serve the fake controller over HTTPS')
+    parser.add_argument('--decoded-responses', action='store_true',
+                        help='let the connection decode the responses instead of returning the raw text')
+    parser.add_argument('--verbose', '-v', action='store_true', help='show requests per endpoint')
+    args = parser.parse_args()
+    variables = dict(var.split('=', 1) for var in args.var)
+    module_utils_vsz.SmartZoneConnection.raw_responses = not args.decoded_responses
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    scenarios = [s for s in SCENARIOS if not args.pattern or args.pattern in s['name']]
+    server = FakeServer('--latency', str(args.latency), tls=args.tls)
+    results = {}
+    failures = []
+    try:
+        print(f"{'scenario':<32} {'size':>6} {'requests':>9} {'bytes':>11} {'time [s]':>9} {'cpu [s]':>8} {'peak [KiB]':>11}")
+        # Warm up imports so the first scenario is not penalized
+        run_module('facts_vsz', {}, make_httpapi(server))
+        for size in args.sizes:
+            server.control('seed', size=size)
+            for scenario in scenarios:
+                key = f"{scenario['name']}@{size}"
+                metrics = run_scenario(server, scenario, size, variables)
+                results[key] = metrics
+                status = f" FAILED: {metrics['msg']}" if metrics['failed'] else ''
+                print(f"{scenario['name']:<32} {size:>6} {metrics['requests']:>9} {metrics['bytes']:>11} "
+                      f"{metrics['wall_time']:>9.3f} {metrics['cpu_time']:>8.3f} {metrics['peak_memory'] // 1024:>11}{status}")
+                if args.verbose:
+                    for url, pool in sorted(metrics['pool'].items()):
+                        print(f"    pool {url}: {pool['requests']} requests, {pool['handshakes']} handshakes "
+                              f"({pool['resumed']} resumed), {pool['connections']} connections, "
+                              f"reuse ratio {pool['reuse_ratio']:.0%}")
+                    for endpoint, count in sorted(metrics['endpoints'].items()):
+                        print(f"    {count:>6} {endpoint}")
+                if metrics['failed']:
+                    failures.append(f"{key}: failed: {metrics['msg']}")
+                failures.extend(compare(key, metrics, baseline, args))
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline.update({
+            key: dict(requests=m['requests'], bytes=m['bytes'], wall_time=m['wall_time'], cpu_time=m['cpu_time'], peak_memory=m['peak_memory'])
+            for key, m in results.items()
+            if not m['failed']
+        })
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        # Regressions are accepted, failed scenarios are not
+        failures = [failure for failure in failures if ': failed: ' in failure]
+
+    for failure in failures:
+        print(f"FAILURE {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
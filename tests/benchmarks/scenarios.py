@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Benchmark scenarios, one or more per module in plugins/modules.
+
+`args` is called with the seeded data size and returns the module arguments.
+Lookups by name target the last object of the seeded collections so they
+have to walk the complete list. Scenarios run in check mode unless they set
+`check_mode` to False. `variables` returns HttpApi plugin variables, with
+`warmup` the module runs once (in check mode) before it is measured. `args`
+is called before the measurement starts, so it may prepare files.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import gzip
+import json
+import os
+import tempfile
+
+
+def last(prefix, size):
+    return f"{prefix}-{max(size - 1, 0):05d}"
+
+
+def ap_mac(size):
+    i = max(size - 1, 0)
+    return ':'.join(f"{b:02X}" for b in (0x00, 0x11, (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff, 0x01))
+
+
+def ap_rules(size):
+    """The seeded AP registration rules, the last one with a new subnet."""
+    rules = [
+        dict(description=f"rule-{i:05d}", zone='Ansible', subnet=dict(network=f"10.{i // 256 % 256}.{i % 256}.0", mask='255.255.255.0'))
+        for i in range(size)
+    ]
+    if rules:
+        rules[-1]['subnet']['network'] = '10.200.0.0'
+    return rules
+
+
+def ap_groups(size):
+    """The seeded ap groups, the last one with a location."""
+    groups = [dict(name='default')] + [dict(name=f"group-{i:05d}") for i in range(size)]
+    groups[-1].update(location='bench', radio_config=dict(radio24g=dict(wlan_group='Ansible')))
+    return groups
+
+
+def admin_users(size):
+    """The seeded admin users, the last one with a new real name."""
+    users = [dict(name='admin')] + [dict(name=f"user-{i:05d}") for i in range(size)]
+    users[-1]['realName'] = 'bench'
+    return users
+
+
+def snapshots(size):
+    """Two snapshots of `size` WLANs in two zones, the second with one removed, one added and one modified."""
+    directory = tempfile.mkdtemp(prefix='smartzone-bench-')
+    paths = []
+    for name, changes in [('before', {}), ('after', {0: None, size // 2: dict(ssid='bench'), size: dict(ssid='new')})]:
+        entries = dict((i, dict(ssid=f"wlan-{i:05d}")) for i in range(size))
+        for i, change in changes.items():
+            if change is None:
+                entries.pop(i, None)
+            else:
+                entries.setdefault(i, dict()).update(change)
+        lines = sorted(
+            (f"zone-{i % 2}/{i:08d}", json.dumps(dict(
+                endpoint='rkszones/*/wlans', id=f"zone-{i % 2}/{i:08d}",
+                data=dict(data, id=f"{i:08d}", name=f"wlan-{i:05d}", zoneId=f"zone-{i % 2}"),
+            ), sort_keys=True, separators=(',', ':')))
+            for i, data in entries.items()
+        )
+        path = os.path.join(directory, f"{name}.jsonl.gz")
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.writelines(f"{line}\n" for key, line in lines)
+        paths.append(path)
+    return dict(before=paths[0], after=paths[1])
+
+
+SNMPV2 = [dict(communityName='public', readEnabled=True)]
+
+SCENARIOS = [
+    dict(name='facts_vsz', module='facts_vsz', args=lambda size: dict()),
+    dict(name='facts_vsz_all', module='facts_vsz', args=lambda size: dict(gather_subset=['all'])),
+    dict(name='aaa_radius', module='aaa_radius', args=lambda size: dict(
+        zone='Ansible', name=last('radius', size), description='bench',
+        primary=dict(ip='192.0.2.1', sharedSecret='secret'),
+    )),
+    dict(name='adminaaa_ad', module='adminaaa_ad', args=lambda size: dict(name='Ansible', state='absent')),
+    dict(name='admingroup', module='admingroup', args=lambda size: dict(
+        name='group-00000', role='RO_SYSTEM_ADMIN', resource_groups=[dict(type='DOMAIN', id='x')],
+        users=dict(add=['admin']),
+    )),
+    dict(name='admingroup_cached', module='admingroup', warmup=True, args=lambda size: dict(
+        name='group-00000', role='RO_SYSTEM_ADMIN', resource_groups=[dict(type='DOMAIN', id='x')],
+        users=dict(add=['admin']),
+    ), variables=lambda: dict(
+        ansible_httpapi_vsz_cache_ttl=3600,
+        ansible_httpapi_vsz_cache_dir=tempfile.mkdtemp(prefix='smartzone-bench-'),
+    )),
+    dict(name='adminuser', module='adminuser', args=lambda size: dict(name=last('user', size), realName='bench')),
+    dict(name='adminusers', module='adminusers', args=lambda size: dict(users=admin_users(size), purge=True)),
+    dict(name='ap', module='ap', args=lambda size: dict(mac=ap_mac(size), name='bench', zone='Ansible', group='default')),
+    dict(name='ap_autoapprove', module='ap_autoapprove', args=lambda size: dict(state='enabled')),
+    dict(name='ap_firmware_upgrade', module='ap_firmware_upgrade', check_mode=False, args=lambda size: dict(
+        firmware='6.1.2.0.200', zones=['Ansible', last('zone', size)], batch_size=2, poll_interval=0.2,
+    )),
+    dict(name='ap_group', module='ap_group', args=lambda size: dict(
+        zone='Ansible', name=last('group', size), location='bench',
+        radio_config=dict(radio24g=dict(wlan_group='Ansible'), radio5g=dict(wlan_group='Ansible')),
+    )),
+    dict(name='ap_groups', module='ap_groups', args=lambda size: dict(zone='Ansible', groups=ap_groups(min(size, 500)))),
+    dict(name='ap_model', module='ap_model', args=lambda size: dict(
+        zone='Ansible', group=last('group', size), model='R650',
+        lan_port=dict(lan1=dict(profile='Ansible'), lan2=dict(profile='Ansible')),
+    )),
+    dict(name='ap_models', module='ap_models', args=lambda size: dict(
+        zone='Ansible', groups=[f"group-{i:05d}" for i in range(max(size - 10, 0), size)], models=['R560', 'R650', 'R750'],
+        lan_port=dict(lan1=dict(profile='Ansible'), lan2=dict(profile='Ansible')),
+    )),
+    dict(name='ap_reboot', module='ap_reboot', check_mode=False, args=lambda size: dict(
+        macs=[ap_mac(size - i) for i in range(min(size, 20))], max_in_flight=10, poll_interval=0.2,
+    )),
+    dict(name='ap_reboot_group', module='ap_reboot', args=lambda size: dict(zone='Ansible', group='default')),
+    dict(name='ap_registration', module='ap_registration', args=lambda size: dict(
+        zone='Ansible', description=last('rule', size), subnet=dict(network='10.0.0.0', mask='255.255.255.0'),
+    )),
+    dict(name='ap_registration_info', module='ap_registration_info', args=lambda size: dict(rule=dict(
+        description='bench', zone='zone-00000', subnet=dict(network='10.0.0.0', mask='255.255.0.0'),
+    ))),
+    dict(name='ap_registration_rules', module='ap_registration_rules', args=lambda size: dict(rules=ap_rules(min(size, 500)))),
+    dict(name='ap_snmp', module='ap_snmp', args=lambda size: dict(name=last('snmp', size), snmpv2=SNMPV2)),
+    dict(name='ap_syslog', module='ap_syslog', args=lambda size: dict(name=last('syslog', size), primary_address='192.0.2.20')),
+    dict(name='backup_create', module='backup_create', check_mode=False, args=lambda size: dict(poll_interval=0.2)),
+    dict(name='backup_export', module='backup_export', args=lambda size: dict(server='Ansible', prefix='bench')),
+    dict(name='backup_schedule', module='backup_schedule', args=lambda size: dict(interval='DAILY', hour=3, minute=15)),
+    dict(name='certstore_cert', module='certstore_cert', args=lambda size: dict(name='bench', cert='CERT', key='KEY')),
+    dict(name='certstore_cert_info', module='certstore_cert_info', args=lambda size: dict(name='cert-00000')),
+    dict(name='certstore_service', module='certstore_service', args=lambda size: dict(mgmt_web='cert-00000')),
+    dict(name='certstore_trusted', module='certstore_trusted', args=lambda size: dict(name='ca-00000', root='CERT')),
+    # Without the per zone endpoints, the fake has `size` zones
+    dict(name='config_snapshot_diff', module='config_snapshot_diff', args=snapshots),
+    dict(name='config_snapshot', module='config_snapshot', args=lambda size: dict(
+        path='/nonexistent/snapshot.jsonl.gz', details=False, endpoints=[
+            'accountSecurity', 'adminaaa', 'apRules', 'apSnmpAgentProfiles', 'apSyslogServerProfiles',
+            'certstore/certificate', 'certstore/setting', 'certstore/trustedCAChainCert',
+            'configurationSettings/autoExportBackup', 'configurationSettings/scheduleBackup', 'ftps', 'rkszones',
+            'system/apSettings/approval', 'system/snmpAgent', 'system/syslog', 'system/systemTime', 'userGroups', 'users',
+        ],
+    )),
+    dict(name='dpsk', module='dpsk', args=lambda size: dict(zone='Ansible', wlan='Ansible', username=last('dpsk', size))),
+    dict(name='ethernetport', module='ethernetport', args=lambda size: dict(zone='Ansible', name=last('eth', size), description='bench')),
+    dict(name='ftp', module='ftp', args=lambda size: dict(name=last('ftp', size), protocol='FTP', host='ftp.example.com')),
+    dict(name='system_snmp', module='system_snmp', args=lambda size: dict(snmpv2=SNMPV2)),
+    dict(name='system_syslog', module='system_syslog', args=lambda size: dict(primary_server=dict(host='192.0.2.30'))),
+    dict(name='system_time', module='system_time', args=lambda size: dict(ntp_server='ntp.example.com')),
+    dict(name='wlan', module='wlan', args=lambda size: dict(
+        zone='Ansible', name='Ansible', ssid='Ansible', type='Standard_Open', groups=dict(add=[last('wlangroup', size)]),
+    )),
+    dict(name='wlan_group', module='wlan_group', args=lambda size: dict(zone='Ansible', name=last('wlangroup', size), description='bench')),
+    dict(name='zone', module='zone', args=lambda size: dict(name='Ansible', description='bench')),
+    # zone-00000 is empty, the Ansible zone has `size` objects of each kind
+    dict(name='zone_clone', module='zone_clone', args=lambda size: dict(source='zone-00000', name='bench', models=['R650'])),
+]
@@ -0,0 +1,834 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Stateful stand-in for the SmartZone public API.
+
+Runs entirely locally and covers the endpoints used by the modules of this
+collection. Start it with::
+
+    python tests/fake_vsz/server.py --port 8443 --size 100 --latency 0.02
+
+and point the inventory at it with ``ansible_host=127.0.0.1``,
+``ansible_httpapi_port=8443`` and ``ansible_httpapi_use_ssl=false``. The
+default credentials are ``admin`` / ``admin``.
+
+Besides the public API the server exposes a few control endpoints:
+
+``GET /_fake/stats``
+    Request count, bytes transferred and per method/endpoint counters.
+``POST /_fake/reset``
+    Reset the statistics.
+``POST /_fake/seed``
+    Replace the data set, body ``{"size": 1000, "seed": 0}``.
+``POST /_fake/config``
+    Change ``latency``, ``jitter``, ``error_rate``, ``error_codes``,
+    ``error_paths``, ``page_size``, ``job_duration`` (seconds an
+    asynchronous operation like a configuration backup, an AP reboot or a
+    firmware upgrade takes) or ``job_failure_rate`` (probability of an AP
+    not coming back online) at runtime.
+``GET /_fake/state``
+    Dump of the complete object store.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import json
+import random
+import re
+import ssl
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_VERSIONS = ['v9_0', 'v9_1', 'v10_0', 'v11_0', 'v11_1']
+API_PREFIX = re.compile(r'^/wsg/api/public/(?P<version>v\d+_\d+)/(?P<path>.*)$')
+
+# Collections known to the fake, '*' matches a single path segment.
+COLLECTIONS = [
+    'rkszones',
+    'rkszones/*/wlans',
+    'rkszones/*/wlangroups',
+    'rkszones/*/apgroups',
+    'rkszones/*/aaa/radius',
+    'rkszones/*/profile/ethernetPort',
+    'rkszones/*/wlans/*/dpsk',
+    'aps',
+    'apRules',
+    'apSnmpAgentProfiles',
+    'apSyslogServerProfiles',
+    'certstore/certificate',
+    'certstore/trustedCAChainCert',
+    'configuration',
+    'adminaaa',
+    'accountSecurity',
+    'controller',
+    'domains',
+    'ftps',
+    'licensesSummary',
+    'users',
+    'userGroups',
+    'userGroups/roles/*/permissions',
+]
+COLLECTION_PATTERNS = [
+    (template, re.compile('^' + template.replace('*', '[^/]+') + '$'))
+    for template in COLLECTIONS
+]
+
+# Collections whose list view only returns a summary of each object.
+SUMMARY_FIELDS = {
+    'rkszones': ['id', 'name'],
+    'rkszones/*/wlans': ['id', 'name', 'ssid', 'zoneId'],
+    'rkszones/*/apgroups': ['id', 'name'],
+    'rkszones/*/aaa/radius': ['id', 'name'],
+    'rkszones/*/profile/ethernetPort': ['id', 'name'],
+    'apRules': ['id', 'description', 'type'],
+    'aps': ['mac', 'zoneId', 'apGroupId', 'serial', 'name'],
+}
+
+# Collections keyed by something else than 'id'.
+ITEM_KEYS = {
+    'aps': 'mac',
+}
+
+# Status codes differing from the defaults (create 201, update/delete 204).
+CREATE_CODES = {
+    'apSnmpAgentProfiles': 200,
+}
+DELETE_CODES = {
+    'apSyslogServerProfiles': 200,
+}
+
+# Query style endpoints: POST <collection>/query
+QUERY_ENDPOINTS = {
+    'users/query': 'users',
+    'userGroups/query': 'userGroups',
+    'ftps/query': 'ftps',
+}
+
+ROLES = ['SUPER_ADMIN', 'SYSTEM_ADMIN', 'NETWORK_ADMIN', 'RO_NETWORK_ADMIN',
+         'RO_SYSTEM_ADMIN', 'AP_ADMIN', 'GUEST_PASS_ADMIN', 'MVNO_SUPER_ADMIN']
+RESOURCES = ['AP', 'WLAN', 'USER', 'ADMIN', 'CLUSTER', 'DP', 'DEVICE']
+
+
+class FakeError(Exception):
+    def __init__(self, code, message):
+        super(FakeError, self).__init__(message)
+        self.code = code
+        self.message = message
+
+
+def template_of(path):
+    for template, pattern in COLLECTION_PATTERNS:
+        if pattern.match(path):
+            return template
+    return None
+
+
+class FakeSmartZone:
+    """In-memory SmartZone controller."""
+
+    def __init__(self, username='admin', password='admin', latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_codes=(500,), error_paths=None, page_size=100, job_duration=1.0,
+                 job_failure_rate=0.0):
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.error_paths = error_paths
+        self.page_size = page_size
+        self.job_duration = job_duration
+        self.job_failure_rate = job_failure_rate
+        self.lock = threading.RLock()
+        self.random = random.Random(0)
+        self.tickets = set()
+        self.reset_stats()
+        self.seed(0)
+
+    # Statistics
+
+    def reset_stats(self):
+        self.stats = dict(requests=0, bytes_in=0, bytes_out=0, errors_injected=0, by_method={}, by_endpoint={})
+
+    def record(self, method, path, bytes_in, bytes_out):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['bytes_in'] += bytes_in
+            self.stats['bytes_out'] += bytes_out
+            self.stats['by_method'][method] = self.stats['by_method'].get(method, 0) + 1
+            endpoint = f"{method} {self.normalize(path)}"
+            self.stats['by_endpoint'][endpoint] = self.stats['by_endpoint'].get(endpoint, 0) + 1
+
+    @staticmethod
+    def normalize(path):
+        path = urlsplit(path).path
+        match = API_PREFIX.match(path)
+        if match:
+            path = match.group('path')
+        return re.sub(r'[0-9a-f]{8}-[0-9a-f-]{27}|([0-9A-F]{2}:){5}[0-9A-F]{2}', '*', path)
+
+    def configure(self, **kwargs):
+        for key in ['latency', 'jitter', 'error_rate', 'error_codes', 'error_paths', 'page_size', 'job_duration', 'job_failure_rate']:
+            if key in kwargs:
+                setattr(self, key, kwargs[key])
+
+    # Data
+
+    def new_id(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128)))
+
+    def collection(self, path, create=False):
+        if path not in self.store:
+            if not create:
+                return None
+            self.store[path] = OrderedDict()
+        return self.store[path]
+
+    def insert(self, path, item):
+        key = ITEM_KEYS.get(template_of(path), 'id')
+        if key not in item:
+            item[key] = self.new_id()
+        self.collection(path, create=True)[item[key]] = item
+        return item
+
+    def seed(self, size, seed=0):
+        """Replace the data set with a deterministic one of roughly `size` objects per collection."""
+        with self.lock:
+            self.random = random.Random(seed)
+            self.store = OrderedDict()
+            self.singletons = dict()
+            self.jobs = []
+            # Seeded APs have been up for a day
+            self.boot_time = time.time() - 86400
+            self.domain_id = self.new_id()
+            self.admin_id = self.new_id()
+            self.node_id = self.new_id()
+
+            self.singletons.update({
+                'session': dict(
+                    apiVersions=API_VERSIONS,
+                    adminId=self.admin_id,
+                    domainId=self.domain_id,
+                    partnerDomain='',
+                    adminRoleId='SUPER_ADMIN',
+                    cpId='',
+                ),
+                'cluster/state': dict(
+                    clusterName='FAKE-CLUSTER',
+                    clusterState='In_Service',
+                    clusterRole='Leader',
+                    currentNodeId=self.node_id,
+                    currentNodeName='fake-vsz',
+                    nodeStateList=[dict(nodeId=self.node_id, nodeName='fake-vsz', nodeState='In_Service')],
+                    managementServiceStateList=[dict(nodeId=self.node_id, nodeName='fake-vsz', managementServiceState='In_Service')],
+                ),
+                'system/snmpAgent': dict(snmpNotificationEnabled=False, snmpV2Agent=[], snmpV3Agent=[]),
+                'system/syslog': dict(enabled=False, primaryServer=None, secondaryServer=None),
+                'system/systemTime': dict(ntpServer='pool.ntp.org', timezone='UTC'),
+                'system/apSettings/approval': dict(approveEnabled=False),
+                'configurationSettings/scheduleBackup': dict(
+                    enableScheduleBackup=False, interval=None, hour=None, minute=None, dayOfWeek=None, dateOfMonth=None,
+                ),
+                'configurationSettings/autoExportBackup': dict(enableAutoExportBackup=False, ftpServer=None, ftpNamePrefix=None),
+                'certstore/setting': dict(serviceCertificates=[
+                    dict(service=service, certificate=dict(id=None, name=None))
+                    for service in ['MANAGEMENT_WEB', 'AP_PORTAL', 'HOTSPOT', 'COMMUNICATOR']
+                ]),
+            })
+
+            self.insert('controller', dict(
+                id=self.node_id, name='fake-vsz', hostName='fake-vsz', model='vSZ-H', serialNumber='FAKE0001',
+                mac='00:00:5E:00:53:01', managementIp='127.0.0.1', version='6.1.2.0.1', apVersion='6.1.2.0.100',
+                uptimeInSec=86400, clusterRole='Leader',
+            ))
+            self.insert('domains', dict(id=self.domain_id, name='Administration Domain'))
+            for name, count in [('AP', size), ('SUPPORT', 1)]:
+                self.insert('licensesSummary', dict(licenseType=name, description=f"{name} capacity", count=max(count, 1) * 2))
+            self.insert('adminaaa', dict(
+                name='Ansible', type='AD', activeDirectoryServer=dict(
+                    realm='example.com', ip='192.0.2.5', port=389, windowsDomainName='dc=example,dc=com',
+                    tlsEnabled=False, cnIdentity=None,
+                ),
+            ))
+            self.insert('accountSecurity', dict(name='Default', description='Default account security'))
+            for role in ROLES:
+                for resource in RESOURCES:
+                    self.insert(f"userGroups/roles/{role}/permissions", dict(
+                        resource=resource, access='FULL_ACCESS' if 'RO_' not in role else 'READ', display=resource,
+                    ))
+
+            zone_ids = []
+            for i in range(max(size, 1)):
+                zone = self.insert('rkszones', self.new_zone(f"zone-{i:05d}"))
+                zone_ids.append(zone['id'])
+
+            # The zone the benchmarks and tests work with is the last one,
+            # so a lookup by name has to walk the whole list.
+            zone = self.insert('rkszones', self.new_zone('Ansible'))
+            zone_ids.append(zone['id'])
+            zid = zone['id']
+            group = self.insert(f"rkszones/{zid}/apgroups", self.new_apgroup(zid, 'default'))
+            for i in range(size):
+                self.insert(f"rkszones/{zid}/apgroups", self.new_apgroup(zid, f"group-{i:05d}"))
+                self.insert(f"rkszones/{zid}/wlans", self.new_wlan(zid, f"wlan-{i:05d}"))
+                self.insert(f"rkszones/{zid}/profile/ethernetPort", dict(name=f"eth-{i:05d}", description=None, type='AccessPort', zoneId=zid))
+                self.insert(f"rkszones/{zid}/aaa/radius", dict(
+                    name=f"radius-{i:05d}", zoneId=zid, description=None,
+                    primary=dict(ip=f"10.0.{i // 256 % 256}.{i % 256}", port=1812, sharedSecret='secret'),
+                    secondary=dict(ip=f"10.1.{i // 256 % 256}.{i % 256}", port=1812, sharedSecret='secret'),
+                ))
+            wlan = self.insert(f"rkszones/{zid}/wlans", self.new_wlan(zid, 'Ansible'))
+            wlan_ids = list(self.store[f"rkszones/{zid}/wlans"])
+            for i in range(size):
+                members = [dict(id=wlan_ids[(i + j) % len(wlan_ids)]) for j in range(3)]
+                self.insert(f"rkszones/{zid}/wlangroups", dict(name=f"wlangroup-{i:05d}", zoneId=zid, description=None, members=members))
+            self.insert(f"rkszones/{zid}/wlangroups", dict(name='Ansible', zoneId=zid, description=None, members=[dict(id=wlan['id'])]))
+            self.insert(f"rkszones/{zid}/profile/ethernetPort", dict(name='Ansible', description=None, type='AccessPort', zoneId=zid))
+
+            for i in range(size):
+                self.insert(f"rkszones/{zid}/wlans/{wlan['id']}/dpsk", dict(
+                    userName=f"dpsk-{i:05d}", passphrase=f"passphrase-{i:05d}", vlanId=None, groupDpsk=False,
+                ))
+                mac = ':'.join(f"{b:02X}" for b in (0x00, 0x11, (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff, 0x01))
+                self.insert('aps', dict(
+                    mac=mac, name=f"ap-{i:05d}", serial=f"{i:012d}", zoneId=zid, apGroupId=group['id'],
+                    model='R650', status='Online', firmwareVersion=zone['version'], description=None,
+                ))
+                self.insert('apRules', dict(
+                    description=f"rule-{i:05d}", type='Subnet', mobilityZone=dict(id=zid, name='Ansible'),
+                    subnet=dict(networkAddress=f"10.{i // 256 % 256}.{i % 256}.0", subnetMask='255.255.255.0'),
+                    ipAddressRange=None, gpsCoordinates=None, provisionTag=None,
+                ))
+                self.insert('apSnmpAgentProfiles', dict(
+                    name=f"snmp-{i:05d}", domainId=self.domain_id, description=None, snmpV2Agent=[], snmpV3Agent=[],
+                ))
+                self.insert('apSyslogServerProfiles', self.new_syslog(f"syslog-{i:05d}"))
+                self.insert('users', dict(
+                    userName=f"user-{i:05d}", realName=f"User {i}", phone=None, email=None, title=None, domainId=self.domain_id,
+                ))
+                self.insert('ftps', dict(
+                    ftpName=f"ftp-{i:05d}", ftpProtocol='FTP', ftpHost=f"ftp{i}.example.com", ftpPort=21,
+                    ftpUserName=None, ftpRemoteDirectory=None, domainId=self.domain_id,
+                ))
+            for i in range(min(size, 50)):
+                self.insert('certstore/certificate', dict(name=f"cert-{i:05d}", description=None, data='-----BEGIN CERTIFICATE-----'))
+                self.insert('certstore/trustedCAChainCert', dict(name=f"ca-{i:05d}", description=None, rootCertData='-----BEGIN CERTIFICATE-----'))
+                self.insert('userGroups', dict(
+                    name=f"group-{i:05d}", role='RO_SYSTEM_ADMIN', users=[], resourceGroups=[],
+                    permissions=[], accountSecurityProfileId=None, domainId=self.domain_id,
+                ))
+            self.insert('apSnmpAgentProfiles', dict(name='Ansible', domainId=self.domain_id, description=None, snmpV2Agent=[], snmpV3Agent=[]))
+            self.insert('apSyslogServerProfiles', self.new_syslog('Ansible'))
+            self.insert('users', dict(userName='admin', realName='Admin', phone=None, email=None, title=None, domainId=self.domain_id))
+            self.insert('ftps', dict(
+                ftpName='Ansible', ftpProtocol='FTP', ftpHost='ftp.example.com', ftpPort=21,
+                ftpUserName=None, ftpRemoteDirectory=None, domainId=self.domain_id,
+            ))
+
+            for zid in zone_ids:
+                self.singletons[f"rkszones/{zid}/apFirmware"] = dict(
+                    firmwareVersion=self.store['rkszones'][zid]['version'],
+                    supportedVersions=[dict(firmwareVersion='6.1.2.0.100'), dict(firmwareVersion='6.1.2.0.200')],
+                )
+
+    def new_zone(self, name):
+        return dict(
+            name=name, description=None, countryCode='CH', version='6.1.2.0.100',
+            timezone=dict(customizedTimezone=None, systemTimezone='UTC'),
+            login=dict(apLoginName='admin'),
+            syslog=dict(syslogConfigType='NONE', syslogServerProfileId=None),
+            snmpAgent=dict(apSnmpEnabled=False, snmpConfigType='NONE', apSnmpAgentProfileId=None),
+            smartMonitor=None, location=None, locationAdditionalInfo=None,
+            latitude=None, longitude=None, altitude=None,
+        )
+
+    def new_apgroup(self, zone_id, name):
+        return dict(
+            name=name, zoneId=zone_id, description=None, location=None, locationAdditionalInfo=None,
+            latitude=None, longitude=None, altitude=None,
+            radioConfig={radio: dict(wlanGroupId=None) for radio in ['radio24g', 'radio5g', 'radio6g']},
+        )
+
+    def new_wlan(self, zone_id, name):
+        return dict(
+            name=name, ssid=name, zoneId=zone_id, description=None, type='Standard_Open',
+            encryption=dict(method='None'), vlan=dict(accessVlan=1), dpsk=dict(dpskEnabled=False),
+            advancedOptions=dict(hideSsidEnabled=False, clientIsolationEnabled=False),
+            authServiceOrProfile=None, radiusOptions=None,
+        )
+
+    def new_syslog(self, name):
+        return dict(
+            name=name, domainId=self.domain_id, description=None,
+            primaryAddress='192.0.2.10', primaryPort=514, primaryProtocol='IPPROTO_TCP',
+            secondaryAddress=None, secondaryPort=None, secondaryProtocol=None,
+            redundancyMode='ACTIVE_ACTIVE', flowLevel='GENERAL_LOGS',
+            createDateTime=0, creatorUsername='admin', modifiedDateTime=0, modifierUsername='admin',
+        )
+
+    def apmodel(self, path):
+        # rkszones/<zid>/apmodel/<model> or rkszones/<zid>/apgroups/<gid>/apmodel/<model>
+        if path not in self.singletons:
+            self.singletons[path] = dict(
+                lanPorts=[
+                    dict(portName=f"LAN{i}", enabled=True, ethPortProfile=dict(id=None, name='Default Access Port'))
+                    for i in range(1, 3)
+                ],
+                ledStatusEnabled=True,
+            )
+        return self.singletons[path]
+
+    # Request handling
+
+    def inject(self, path):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self.random.uniform(0, self.jitter))
+        if not self.error_rate:
+            return None
+        if self.error_paths and not re.search(self.error_paths, path):
+            return None
+        if self.random.random() < self.error_rate:
+            self.stats['errors_injected'] += 1
+            return self.random.choice(self.error_codes)
+        return None
+
+    def handle(self, method, raw_path, body):
+        url = urlsplit(raw_path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path == '/wsg/api/public/apiInfo':
+            return 200, dict(apiSupportVersions=API_VERSIONS)
+
+        match = API_PREFIX.match(url.path)
+        if not match:
+            raise FakeError(404, f"Unknown path {url.path}")
+        if match.group('version') not in API_VERSIONS:
+            raise FakeError(404, f"Unsupported API version {match.group('version')}")
+        path = match.group('path').strip('/')
+
+        if path == 'serviceTicket':
+            return self.handle_ticket(method, body, query)
+
+        if query.get('serviceTicket') not in self.tickets:
+            raise FakeError(401, 'Invalid service ticket')
+
+        with self.lock:
+            return self.dispatch(method, path, body, query)
+
+    def handle_ticket(self, method, body, query):
+        if method == 'POST':
+            if body.get('username') != self.username or body.get('password') != self.password:
+                raise FakeError(401, 'Authentication failed')
+            ticket = f"ST-{uuid.uuid4().hex}-fake"
+            self.tickets.add(ticket)
+            return 200, dict(serviceTicket=ticket, controllerVersion='6.1.2.0.1')
+        if method == 'DELETE':
+            self.tickets.discard(query.get('serviceTicket'))
+            return 200, {}
+        raise FakeError(405, 'Method not allowed')
+
+    def run_jobs(self):
+        """Finish the asynchronous operations whose time has come."""
+        now = time.time()
+        for job in [j for j in self.jobs if j['ready_at'] <= now]:
+            self.jobs.remove(job)
+            job['finish']()
+
+    def backup(self):
+        backup = dict(
+            id=self.new_id(),
+            createdOn=int(time.time() * 1000),
+            type='CONFIGURATION',
+            version='6.1.2.0.1',
+            fileSize=self.random.randint(1000000, 5000000),
+        )
+        self.jobs.append(dict(ready_at=time.time() + self.job_duration, finish=lambda: self.insert('configuration', backup)))
+        return 204, None
+
+    def restart_ap(self, ap, firmware=None):
+        """Take the AP offline until the job is done, it may stay offline with job_failure_rate."""
+        ap['status'] = 'Offline'
+        fails = self.random.random() < self.job_failure_rate
+
+        def finish():
+            if firmware:
+                ap['firmwareVersion'] = firmware
+            if not fails:
+                ap['status'] = 'Online'
+                ap['bootTime'] = time.time()
+        self.jobs.append(dict(ready_at=time.time() + self.job_duration, finish=finish))
+
+    def ap_firmware(self, zone_id, body):
+        firmware = self.singletons[f"rkszones/{zone_id}/apFirmware"]
+        version = (body or {}).get('firmwareVersion')
+        if version not in [v['firmwareVersion'] for v in firmware['supportedVersions']]:
+            raise FakeError(400, f"Firmware version {version} is not supported")
+        firmware['firmwareVersion'] = version
+        self.store['rkszones'][zone_id]['version'] = version
+        for ap in (self.collection('aps') or {}).values():
+            if ap['zoneId'] == zone_id and ap.get('firmwareVersion') != version:
+                self.restart_ap(ap, firmware=version)
+        return 204, None
+
+    def dispatch(self, method, path, body, query):
+        self.run_jobs()
+        if path == 'configuration/backup' and method == 'POST':
+            return self.backup()
+        m = re.match(r'^rkszones/([^/]+)/apFirmware$', path)
+        if m and method == 'PUT' and path in self.singletons:
+            return self.ap_firmware(m.group(1), body)
+        if path in QUERY_ENDPOINTS and method == 'POST':
+            return 200, self.query(self.collection(QUERY_ENDPOINTS[path]) or {}, body)
+        if path == 'query/ap' and method == 'POST':
+            return 200, self.query_ap(body)
+
+        # Singletons
+        if path in self.singletons or re.match(r'^rkszones/[^/]+/(apgroups/[^/]+/)?apmodel/[^/]+$', path):
+            return self.singleton(method, path, body)
+
+        # Special endpoints
+        if path == 'certstore/setting/serviceCertificates':
+            return self.service_certificates(method, body)
+        m = re.match(r'^(rkszones/[^/]+/wlans/[^/]+/dpsk)(/batchGenUnbound)?$', path)
+        if m and method == 'POST':
+            return self.dpsk(m.group(1), body, bool(m.group(2)))
+        m = re.match(r'^rkszones/([^/]+)/wlangroups/([^/]+)/members(?:/([^/]+))?$', path)
+        if m:
+            return self.wlangroup_members(method, m.group(1), m.group(2), m.group(3), body)
+        m = re.match(r'^apRules/priority/(upgrade|downgrade)/([^/]+)$', path)
+        if m and method == 'GET':
+            return self.ap_rule_priority(m.group(1), m.group(2))
+        m = re.match(r'^aps/([^/]+)/reboot$', path)
+        if m and method == 'PUT':
+            self.restart_ap(self.item('aps', m.group(1)))
+            return 204, None
+
+        return self.rest(method, path, body, query)
+
+    def singleton(self, method, path, body):
+        current = self.apmodel(path) if 'apmodel' in path else self.singletons[path]
+        if method == 'GET':
+            return 200, current
+        if method in ('PATCH', 'PUT'):
+            if method == 'PUT':
+                current.clear()
+            current.update(body or {})
+            return 204, None
+        raise FakeError(405, 'Method not allowed')
+
+    def service_certificates(self, method, body):
+        if method == 'PATCH':
+            for update in body or []:
+                for entry in self.singletons['certstore/setting']['serviceCertificates']:
+                    if entry['service'] == update.get('service'):
+                        entry.update(update)
+            return 204, None
+        raise FakeError(405, 'Method not allowed')
+
+    def resolve(self, path):
+        """Split path into (collection, item id, remaining segments)."""
+        segments = path.split('/')
+        for i in range(len(segments), 0, -1):
+            prefix = '/'.join(segments[:i])
+            if template_of(prefix):
+                rest = segments[i:]
+                return prefix, (rest[0] if rest else None), rest[1:]
+        raise FakeError(404, f"Unknown ressource {path}")
+
+    def item(self, collection, item_id):
+        items = self.collection(collection) or {}
+        if item_id not in items:
+            raise FakeError(404 if collection != 'aps' else 403, f"Object {item_id} not found in {collection}")
+        return items[item_id]
+
+    def rest(self, method, path, body, query):
+        collection, item_id, rest = self.resolve(path)
+        template = template_of(collection)
+
+        if item_id is None:
+            if method == 'GET':
+                items = list((self.collection(collection) or {}).values())
+                for key in ['domainId', 'type', 'zoneId']:
+                    if key in query:
+                        items = [i for i in items if i.get(key, query[key]) == query[key]]
+                fields = SUMMARY_FIELDS.get(template)
+                if fields:
+                    items = [{k: i.get(k) for k in fields} for i in items]
+                return 200, self.page(items, query)
+            if method == 'POST':
+                return self.create(collection, template, body)
+            raise FakeError(405, 'Method not allowed')
+
+        if method == 'POST' and item_id not in (self.collection(collection) or {}):
+            # e.g. rkszones/<id>/wlans/standard8021X
+            return self.create(collection, template, body)
+
+        item = self.item(collection, item_id)
+        if rest:
+            if method == 'DELETE':
+                item[rest[0]] = None
+                return 204, None
+            raise FakeError(404, f"Unknown ressource {path}")
+        if method == 'GET':
+            if template == 'userGroups' and query.get('includeUsers', '').lower() != 'true':
+                return 200, {k: v for k, v in item.items() if k != 'users'}
+            return 200, item
+        if method == 'PATCH':
+            item.update(body or {})
+            return 204, None
+        if method == 'PUT':
+            key = ITEM_KEYS.get(template, 'id')
+            keep = {k: item[k] for k in [key, 'domainId', 'zoneId'] if k in item}
+            item.clear()
+            item.update(body or {})
+            item.update(keep)
+            return 204, None
+        if method == 'DELETE':
+            del self.store[collection][item_id]
+            return DELETE_CODES.get(template, 204), None
+        raise FakeError(405, 'Method not allowed')
+
+    def create(self, collection, template, body):
+        item = dict(body or {})
+        item.pop('id', None)
+        if template == 'userGroups':
+            item.setdefault('users', [])
+        if template.startswith('rkszones/*/'):
+            item.setdefault('zoneId', collection.split('/')[1])
+        if template == 'rkszones':
+            item = dict(self.new_zone(item['name']), **item)
+        item = self.insert(collection, item)
+        if template == 'rkszones':
+            self.singletons[f"rkszones/{item['id']}/apFirmware"] = dict(
+                firmwareVersion=item['version'], supportedVersions=[dict(firmwareVersion=item['version'])],
+            )
+        return CREATE_CODES.get(template, 201), dict(id=item['id'])
+
+    def dpsk(self, collection, body, generate):
+        items = self.collection(collection, create=True)
+        if generate:
+            for i in range(body.get('amount', 1)):
+                self.insert(collection, dict(
+                    userName=body.get('userName') or f"dpsk-{uuid.uuid4().hex[:8]}",
+                    passphrase=uuid.uuid4().hex, vlanId=body.get('vlanId'), groupDpsk=body.get('groupDpsk', False),
+                ))
+            return 201, {}
+        for item_id in body.get('idList', []):
+            items.pop(item_id, None)
+        return 200, {}
+
+    def wlangroup_members(self, method, zone_id, group_id, wlan_id, body):
+        group = self.item(f"rkszones/{zone_id}/wlangroups", group_id)
+        if method == 'POST':
+            group['members'].append(dict(id=body['id']))
+            return 201, None
+        if method == 'DELETE':
+            group['members'] = [m for m in group['members'] if m['id'] != wlan_id]
+            return 204, None
+        raise FakeError(405, 'Method not allowed')
+
+    def ap_rule_priority(self, direction, rule_id):
+        """Swap the rule with the one above (upgrade) or below (downgrade) it."""
+        rules = self.collection('apRules', create=True)
+        self.item('apRules', rule_id)
+        ids = list(rules)
+        index = ids.index(rule_id)
+        other = index - 1 if direction == 'upgrade' else index + 1
+        if 0 <= other < len(ids):
+            ids[index], ids[other] = ids[other], ids[index]
+            items = dict(rules)
+            rules.clear()
+            rules.update((item_id, items[item_id]) for item_id in ids)
+        return 204, None
+
+    def page(self, items, query):
+        index = int(query.get('index', 0))
+        size = int(query.get('listSize', self.page_size))
+        chunk = items[index:index + size]
+        return dict(
+            totalCount=len(items),
+            hasMore=index + len(chunk) < len(items),
+            firstIndex=index,
+            list=chunk,
+        )
+
+    def query(self, items, body):
+        items = list(items.values())
+        search = (body or {}).get('fullTextSearch')
+        if search and search.get('value'):
+            value = str(search['value']).lower()
+            fields = search.get('fields') or []
+            items = [
+                i for i in items
+                if any(value in str(i.get(f, '')).lower() for f in (fields or i.keys()))
+            ]
+        sort = (body or {}).get('sortInfo')
+        if sort and sort.get('sortColumn'):
+            items.sort(key=lambda i: str(i.get(sort['sortColumn'])), reverse=sort.get('dir') == 'DESC')
+        limit = int((body or {}).get('limit', self.page_size))
+        page = int((body or {}).get('page', 1))
+        return self.page(items, dict(index=(page - 1) * limit, listSize=limit))
+
+    def query_ap(self, body):
+        now = time.time()
+        aps = list((self.collection('aps') or {}).values())
+        for flt in (body or {}).get('filters') or []:
+            key = dict(ZONE='zoneId', APGROUP='apGroupId').get(flt.get('type'))
+            if key:
+                aps = [ap for ap in aps if ap.get(key) == flt.get('value')]
+        search = (body or {}).get('fullTextSearch')
+        if search and search.get('value'):
+            values = set(str(search['value']).upper().split(','))
+            aps = [ap for ap in aps if ap['mac'].upper() in values]
+        records = [
+            dict(
+                apMac=ap['mac'], deviceName=ap.get('name'), serial=ap.get('serial'), model=ap.get('model'),
+                zoneId=ap.get('zoneId'), apGroupId=ap.get('apGroupId'), status=ap.get('status', 'Online'),
+                firmwareVersion=ap.get('firmwareVersion'),
+                uptime=int(now - ap.get('bootTime', self.boot_time)) if ap.get('status', 'Online') == 'Online' else None,
+            )
+            for ap in aps
+        ]
+        limit = int((body or {}).get('limit', self.page_size))
+        page = int((body or {}).get('page', 1))
+        return self.page(records, dict(index=(page - 1) * limit, listSize=limit))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeSmartZone/1.0'
+    # Headers and body are written separately, do not let kept-alive
+    # connections wait for delayed ACKs in between.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _reply(self, code, data, bytes_in):
+        payload = b'' if data is None else json.dumps(data).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+        return payload
+
+    def _handle(self):
+        raw = self._read_body()
+        fake = self.server.fake
+
+        if self.path.startswith('/_fake/'):
+            return self._control(raw)
+
+        bytes_in = len(raw) + len(self.path)
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+
+        injected = fake.inject(self.path)
+        if injected:
+            code, data = injected, dict(message='Injected error', errorCode=injected, errorType='Injected')
+        else:
+            try:
+                code, data = fake.handle(self.command, self.path, body)
+            except FakeError as e:
+                code, data = e.code, dict(message=e.message, errorCode=e.code, errorType='Fake')
+            except (KeyError, TypeError, ValueError) as e:
+                code, data = 400, dict(message=f"Bad request: {e}", errorCode=400, errorType='Fake')
+        payload = self._reply(code, data, bytes_in)
+        fake.record(self.command, self.path, bytes_in, len(payload))
+
+    def _control(self, raw):
+        fake = self.server.fake
+        body = json.loads(raw) if raw else {}
+        action = self.path[len('/_fake/'):]
+        if action == 'stats':
+            return self._reply(200, fake.stats, 0)
+        if action == 'reset':
+            fake.reset_stats()
+            return self._reply(200, fake.stats, 0)
+        if action == 'seed':
+            fake.seed(int(body.get('size', 10)), seed=int(body.get('seed', 0)))
+            fake.reset_stats()
+            return self._reply(200, dict(collections={k: len(v) for k, v in fake.store.items()}), 0)
+        if action == 'config':
+            fake.configure(**body)
+            return self._reply(200, body, 0)
+        if action == 'state':
+            return self._reply(200, dict(store=fake.store, singletons=fake.singletons), 0)
+        return self._reply(404, dict(message=f"Unknown control endpoint {action}"), 0)
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+    do_PATCH = _handle
+    do_DELETE = _handle
+
+
+def make_server(host='127.0.0.1', port=0, certfile=None, keyfile=None, verbose=False, **kwargs):
+    """Create a ThreadingHTTPServer serving a FakeSmartZone; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.fake = FakeSmartZone(**kwargs)
+    server.verbose = verbose
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8443)
+    parser.add_argument('--size', type=int, default=10, help='objects per collection in the seeded data set')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra latency up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='probability of an injected error')
+    parser.add_argument('--error-codes', type=int, nargs='+', default=[500])
+    parser.add_argument('--error-paths', help='only inject errors for paths matching this regex')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--job-duration', type=float, default=1.0, help='seconds an asynchronous operation takes')
+    parser.add_argument('--job-failure-rate', type=float, default=0.0, help='probability of an AP not coming back online')
+    parser.add_argument('--certfile', help='serve HTTPS with this certificate')
+    parser.add_argument('--keyfile')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = make_server(
+        host=args.host, port=args.port, certfile=args.certfile, keyfile=args.keyfile, verbose=args.verbose,
+        username=args.username, password=args.password, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_codes=args.error_codes, error_paths=args.error_paths,
+        page_size=args.page_size, job_duration=args.job_duration, job_failure_rate=args.job_failure_rate,
+    )
+    server.fake.seed(args.size, seed=args.seed)
+    print(f"Fake SmartZone listening on {server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
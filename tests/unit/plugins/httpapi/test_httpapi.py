@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import threading
+
+import pytest
+
+from ansible_collections.scsitteam.smartzone.plugins.httpapi import vsz
+
+
+class FakeConnection:
+    _url = 'https://vsz.example.com:8443'
+    connected = True
+
+    def __init__(self):
+        self._api_info = dict(apiSupportVersions=['v11_1'])
+        self._service_ticket = 'expired'
+        self.messages = []
+
+    def get_option(self, name):
+        return dict(host='vsz.example.com', remote_user='admin', password='secret', validate_certs=False, persistent_command_timeout=30).get(name)
+
+    def queue_message(self, level, message):
+        self.messages.append((level, message))
+
+
+class FakePool:
+    """Accepts the ticket `valid`, a login returns the next valid ticket."""
+
+    logins = 0
+    valid = 'ticket-0'
+    lock = threading.Lock()
+
+    def __init__(self, url, size=0, validate_certs=True, timeout=None):
+        self.url = url
+
+    def request(self, method, path, data, headers=None):
+        if path.endswith('/serviceTicket') and method == 'POST':
+            with FakePool.lock:
+                FakePool.logins += 1
+                FakePool.valid = f"ticket-{FakePool.logins}"
+                return 200, json.dumps(dict(serviceTicket=FakePool.valid))
+        if f"serviceTicket={FakePool.valid}" in path:
+            return 200, json.dumps(dict(path=path))
+        return 401, '{"message": "expired"}'
+
+
+@pytest.fixture
+def httpapi(monkeypatch):
+    monkeypatch.setattr(vsz, 'ConnectionPool', FakePool)
+    monkeypatch.setattr(FakePool, 'logins', 0)
+    monkeypatch.setattr(FakePool, 'valid', 'ticket-0')
+    plugin = vsz.HttpApi(FakeConnection())
+    options = dict(pool_size=2, batch_concurrency=4)
+    monkeypatch.setattr(plugin, '_get_option', options.get)
+    return plugin
+
+
+def in_thread(target, timeout=5):
+    """Run `target`, fail instead of hanging if it does not return in time."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(target()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'request did not return, deadlock?'
+    return result[0]
+
+
+def test_pool_expired_ticket_logs_in_again(httpapi):
+    code, data = in_thread(lambda: httpapi.send_request(None, 'session', method='GET'))
+    assert code == 200
+    assert FakePool.logins == 1
+    assert httpapi.connection._service_ticket == 'ticket-1'
+
+
+def test_pool_expired_ticket_logs_in_once_for_concurrent_requests(httpapi):
+    results = in_thread(lambda: httpapi.send_batch([('GET', f"aps/{i}", None) for i in range(16)], concurrency=8))
+    assert [code for code, data in results] == [200] * 16
+    assert FakePool.logins == 1
+
+
+def test_pool_expired_ticket_with_rate_limit(httpapi, monkeypatch, tmp_path):
+    options = dict(pool_size=2, max_inflight=1, rate_limit_dir=str(tmp_path))
+    monkeypatch.setattr(httpapi, '_get_option', options.get)
+    code, data = in_thread(lambda: httpapi.send_request(None, 'session', method='GET'))
+    assert code == 200
+    assert FakePool.logins == 1
+
+
+def test_cluster_reads_follow_write(httpapi, monkeypatch):
+    options = dict(pool_size=2, batch_concurrency=4, cluster_read_balancing=True, cluster_nodes=['192.0.2.1'], cluster_write_window=10)
+    monkeypatch.setattr(httpapi, '_get_option', options.get)
+    sent = []
+    monkeypatch.setattr(httpapi, '_node_transport', lambda url, path, data, method: sent.append((url, method)) or (200, '{}'))
+    monkeypatch.setattr(httpapi, '_leader_transport', lambda path, data, method: sent.append(('leader', method)) or (200, '{}'))
+    httpapi._transport('/wsg/api/public/v11_1/rkszones', None, 'GET')
+    httpapi._transport('/wsg/api/public/v11_1/rkszones/1', '{}', 'PATCH')
+    httpapi._transport('/wsg/api/public/v11_1/rkszones/1', None, 'GET')
+    assert sent == [('https://192.0.2.1:8443', 'GET'), ('leader', 'PATCH'), ('leader', 'GET')]
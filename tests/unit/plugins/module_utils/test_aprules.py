@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import random
+
+import pytest
+
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.aprules import (
+    find_overlaps, find_shadowed, priority_moves, rule_complete, rule_interval,
+)
+
+
+def random_intervals(seed, count=200, space=1000):
+    rng = random.Random(seed)
+    intervals = []
+    for i in range(count):
+        if rng.random() < 0.1:
+            intervals.append(None)
+            continue
+        first = rng.randrange(space)
+        intervals.append((first, first + rng.randrange(space // 10)))
+    return intervals
+
+
+def test_rule_interval_range():
+    rule = dict(type='IPAddressRange', ipAddressRange=dict(fromIp='10.0.0.20', toIp='10.0.0.10'))
+    assert rule_interval(rule) == (167772170, 167772180)
+
+
+def test_rule_interval_subnet():
+    rule = dict(type='Subnet', subnet=dict(networkAddress='10.0.1.7', subnetMask='255.255.255.0'))
+    assert rule_interval(rule) == (167772416, 167772671)
+
+
+@pytest.mark.parametrize('rule', [
+    dict(type='ProvisionTag', provisionTag='lab'),
+    dict(type='Subnet', subnet=dict(networkAddress='10.0.0.0')),
+    dict(type='IPAddressRange', ipAddressRange=dict(fromIp='not an ip', toIp='10.0.0.1')),
+])
+def test_rule_interval_none(rule):
+    assert rule_interval(rule) is None
+
+
+@pytest.mark.parametrize('rule, complete', [
+    (dict(id='1', description='tag', type='ProvisionTag'), True),
+    (dict(id='1', description='subnet', type='Subnet'), False),
+    (dict(id='1', description='subnet', type='Subnet', mobilityZone=dict(id='z'),
+          subnet=dict(networkAddress='10.0.0.0', subnetMask='255.0.0.0')), True),
+    (dict(id='1', description='unknown'), False),
+])
+def test_rule_complete(rule, complete):
+    assert rule_complete(rule) is complete
+
+
+def test_priority_moves():
+    assert priority_moves(['a', 'b', 'c'], ['a', 'b', 'c']) == []
+    assert priority_moves(['a', 'b', 'c'], ['c', 'a', 'b']) == ['c', 'c']
+    assert priority_moves(['a', 'b', 'c'], ['b', 'c', 'a']) == ['b', 'c']
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_priority_moves_random(seed):
+    rng = random.Random(seed)
+    order = list(range(30))
+    target = rng.sample(order, len(order))
+    rules = list(order)
+    for rule in priority_moves(order, target):
+        index = rules.index(rule)
+        assert index > 0
+        rules[index - 1], rules[index] = rules[index], rules[index - 1]
+    assert rules == target
+    inversions = sum(1 for i in range(30) for j in range(i + 1, 30) if target.index(order[i]) > target.index(order[j]))
+    assert len(priority_moves(order, target)) == inversions
+
+
+def test_find_overlaps():
+    assert find_overlaps([(0, 10), (5, 15), (20, 30), None, (10, 10)]) == [(0, 1), (0, 4), (1, 4)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_find_overlaps_brute_force(seed):
+    intervals = random_intervals(seed)
+    expected = sorted(
+        (i, j)
+        for i, a in enumerate(intervals)
+        for j, b in enumerate(intervals)
+        if i < j and a is not None and b is not None and a[0] <= b[1] and b[0] <= a[1]
+    )
+    assert find_overlaps(intervals) == expected
+
+
+def test_find_shadowed():
+    assert find_shadowed([(0, 100), (10, 20), None, (90, 110), (0, 100)]) == {1: 0, 4: 0}
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_find_shadowed_brute_force(seed):
+    intervals = random_intervals(seed)
+    shadowed = find_shadowed(intervals)
+    expected = set(
+        j for j, b in enumerate(intervals)
+        if b is not None and any(a is not None and a[0] <= b[0] and b[1] <= a[1] for a in intervals[:j])
+    )
+    assert set(shadowed) == expected
+    for j, i in shadowed.items():
+        assert i < j
+        assert intervals[i][0] <= intervals[j][0] and intervals[j][1] <= intervals[i][1]
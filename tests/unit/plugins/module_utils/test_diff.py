@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.diff import iter_changes, keyed_list_changes, normalize, update_values
+
+
+def test_iter_changes_equal():
+    assert list(iter_changes(dict(a=1, b=dict(c=2)), dict(a=1, b=dict(c=2)))) == []
+
+
+def test_iter_changes_nested():
+    before = dict(a=1, b=dict(c=2, d=3))
+    after = dict(a=1, b=dict(c=2, d=4))
+    assert list(iter_changes(before, after)) == [(('b', 'd'), 3, 4)]
+
+
+def test_iter_changes_not_recursive():
+    before = dict(b=dict(c=2, d=3))
+    after = dict(b=dict(d=4))
+    assert list(iter_changes(before, after, recursive=False)) == [(('b',), dict(c=2, d=3), dict(d=4))]
+
+
+def test_iter_changes_missing_keys():
+    assert list(iter_changes(dict(a=1), dict(b=2))) == [(('a',), 1, None), (('b',), None, 2)]
+
+
+def test_iter_changes_ignore_none():
+    before = dict(a=1, b=2, c=3)
+    after = dict(a=None, b=5)
+    assert list(iter_changes(before, after, ignore_none=True)) == [(('b',), 2, 5)]
+
+
+def test_update_values():
+    current = dict(name='wlan', ssid='old', vlan=dict(accessVlan=1, id=7))
+    desired = dict(name='wlan', ssid='new', description=None, vlan=dict(accessVlan=2))
+    assert update_values(current, desired) == dict(ssid='new', vlan=dict(accessVlan=2))
+
+
+def test_update_values_unchanged():
+    assert update_values(dict(a=1, b=2), dict(a=1, b=None)) == dict()
+
+
+def test_normalize():
+    entry = normalize(dict(name='a', vlans=[dict(id=3), dict(id=1)], enabled=None), dict(enabled=True, mode='access'))
+    assert entry == dict(name='a', vlans=[dict(id=1), dict(id=3)], enabled=True, mode='access')
+
+
+def test_keyed_list_changes_order_does_not_matter():
+    current = [dict(name='a', value=1), dict(name='b', value=2)]
+    desired = [dict(name='b', value=2), dict(name='a', value=1)]
+    assert keyed_list_changes(current, desired, 'name') == []
+
+
+def test_keyed_list_changes():
+    current = [dict(name='a', value=1), dict(name='b', value=2), dict(name='c', value=3)]
+    desired = [dict(name='a', value=1), dict(name='b', value=5), dict(name='d', value=4)]
+    assert keyed_list_changes(current, desired, 'name') == ['b', 'c', 'd']
+
+
+def test_keyed_list_changes_defaults():
+    current = [dict(name='a', enabled=True, mode='trunk')]
+    desired = [dict(name='a', enabled=None)]
+    assert keyed_list_changes(current, desired, 'name', defaults=dict(enabled=True)) == []
+    assert keyed_list_changes(current, [dict(name='a', enabled=False)], 'name') == ['a']
+
+
+def test_keyed_list_changes_none():
+    assert keyed_list_changes(None, [dict(name='a')], 'name') == ['a']
+    assert keyed_list_changes([dict(name='a')], None, 'name') == ['a']
+
+
+def test_keyed_list_changes_ignore():
+    current = [dict(userName='a', authProtocol='SHA')]
+    desired = [dict(userName='a', authProtocol='SHA', authPassword='secret')]
+    assert keyed_list_changes(current, desired, 'userName') == ['a']
+    assert keyed_list_changes(current, desired, 'userName', ignore=['authPassword']) == []
+    assert keyed_list_changes(current, [dict(userName='b', authPassword='secret')], 'userName', ignore=['authPassword']) == ['a', 'b']
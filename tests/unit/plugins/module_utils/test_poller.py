@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.scsitteam.smartzone.plugins.module_utils import poller
+from ansible_collections.scsitteam.smartzone.plugins.module_utils.poller import Poller, PollTimeout
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(poller.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(poller.time, 'sleep', clock.sleep)
+    return clock
+
+
+def states(*results):
+    results = list(results)
+
+    def check():
+        return results.pop(0)
+    return check
+
+
+def test_done_right_away(clock):
+    p = Poller()
+    assert p.wait(states((True, dict(state='done')))) == dict(state='done')
+    assert p.polls == 1
+    assert clock.sleeps == []
+
+
+def test_backoff_while_unchanged(clock):
+    p = Poller(interval=1, max_interval=5, backoff=2)
+    progress = dict(state='running')
+    p.wait(states(*[(False, progress)] * 5 + [(True, dict(state='done'))]))
+    assert clock.sleeps == [1, 2, 4, 5, 5]
+    assert [h['state'] for h in p.history] == ['running', 'done']
+
+
+def test_interval_restarts_on_change(clock):
+    p = Poller(interval=1, max_interval=10, backoff=2)
+    p.wait(states((False, dict(step=1)), (False, dict(step=1)), (False, dict(step=2)), (True, dict(step=3))))
+    assert clock.sleeps == [1, 2, 1]
+
+
+def test_interval_follows_percent(clock):
+    p = Poller(interval=1, max_interval=60)
+    check = states((False, dict(percent=0)), (False, dict(percent=20)), (True, dict(percent=100)))
+    p.wait(check)
+    # 1s for 20%, about 4s remaining, polled after half of it
+    assert clock.sleeps == [1, 2]
+
+
+def test_timeout(clock):
+    p = Poller(timeout=10, interval=3, max_interval=3)
+    with pytest.raises(PollTimeout) as e:
+        p.wait(lambda: (False, dict(state='running')))
+    assert e.value.progress == dict(state='running')
+    assert len(e.value.history) == 1
+    assert sum(clock.sleeps) == 10
+
+
+def test_on_progress(clock):
+    seen = []
+    p = Poller(on_progress=lambda progress, elapsed: seen.append(progress['step']))
+    p.wait(states((False, dict(step=1)), (False, dict(step=1)), (True, dict(step=2))))
+    assert seen == [1, 2]
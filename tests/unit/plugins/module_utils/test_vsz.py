@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+import pytest
+
+from ansible_collections.scsitteam.smartzone.plugins.module_utils import vsz
+
+
+class FakeModule:
+    _socket_path = '/nonexistent'
+
+    def fail_json(self, **kwargs):
+        raise AssertionError(kwargs['msg'])
+
+
+class FakeConnection:
+    """Answers query POSTs from `pages`, a list of item lists, and records the requests."""
+
+    pages = []
+
+    def __init__(self, socket_path):
+        self.requests = []
+
+    def send_request(self, payload, path, method, raw=False, cache=False):
+        # The payload crosses the connection socket as JSON, keep a copy
+        self.requests.append((method, path, json.loads(json.dumps(payload))))
+        index = payload['page'] - 1
+        return 200, json.dumps(dict(list=self.pages[index], hasMore=index + 1 < len(self.pages), totalCount=sum(len(p) for p in self.pages)))
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    monkeypatch.setattr(vsz, 'Connection', FakeConnection)
+    return vsz.SmartZoneConnection(FakeModule())
+
+
+def test_query_pages(conn, monkeypatch):
+    monkeypatch.setattr(FakeConnection, 'pages', [[dict(name='a'), dict(name='b')], [dict(name='c')]])
+    assert [item['name'] for item in conn.query('users/query')] == ['a', 'b', 'c']
+    assert [payload['page'] for method, path, payload in conn._cli.requests] == [1, 2]
+
+
+def test_query_exact_stops_at_first_match(conn, monkeypatch):
+    monkeypatch.setattr(FakeConnection, 'pages', [[dict(userName='bobby'), dict(userName='bob')], [dict(userName='bob')]])
+    assert list(conn.query('users/query', search='bob', fields=['userName'], exact=True)) == [dict(userName='bob')]
+    assert len(conn._cli.requests) == 1
+    assert conn._cli.requests[0][2]['fullTextSearch'] == dict(type='OR', value='bob', fields=['userName'])
+
+
+def test_query_exact_requires_fields(conn):
+    with pytest.raises(ValueError):
+        next(conn.query('users/query', search='bob', exact=True))
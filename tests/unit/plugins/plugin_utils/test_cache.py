@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils import cache
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.cache import ResponseCache
+
+
+def test_put_and_get(tmp_path):
+    responses = ResponseCache(str(tmp_path), 'vsz01', 'v11_1', ttl=60)
+    assert responses.get('/accountSecurity') is None
+    responses.put('/accountSecurity', '{"list":[]}')
+    assert responses.get('/accountSecurity') == '{"list":[]}'
+    assert responses.get('/adminaaa') is None
+
+
+def test_shared_per_controller_and_version(tmp_path):
+    ResponseCache(str(tmp_path), 'vsz01', 'v11_1', ttl=60).put('/accountSecurity', '{"list":[]}')
+    assert ResponseCache(str(tmp_path), 'vsz01', 'v11_1', ttl=60).get('/accountSecurity') == '{"list":[]}'
+    assert ResponseCache(str(tmp_path), 'vsz02', 'v11_1', ttl=60).get('/accountSecurity') is None
+    assert ResponseCache(str(tmp_path), 'vsz01', 'v10_0', ttl=60).get('/accountSecurity') is None
+
+
+def test_expired(tmp_path, monkeypatch):
+    responses = ResponseCache(str(tmp_path), 'vsz01', 'v11_1', ttl=60)
+    monkeypatch.setattr(cache.time, 'time', lambda: 1000.0)
+    responses.put('/accountSecurity', '{"list":[]}')
+    monkeypatch.setattr(cache.time, 'time', lambda: 1059.0)
+    assert responses.get('/accountSecurity') == '{"list":[]}'
+    monkeypatch.setattr(cache.time, 'time', lambda: 1061.0)
+    assert responses.get('/accountSecurity') is None
+
+
+def test_broken_entry(tmp_path):
+    responses = ResponseCache(str(tmp_path), 'vsz01', 'v11_1', ttl=60)
+    responses.put('/accountSecurity', '{"list":[]}')
+    with open(responses._path('/accountSecurity'), 'w') as f:
+        f.write('{"path": "/accountSec')
+    assert responses.get('/accountSecurity') is None
+
+
+def test_no_temporary_files_left(tmp_path):
+    responses = ResponseCache(str(tmp_path), 'vsz01', 'v11_1', ttl=60)
+    responses.put('/accountSecurity', '{"list":[]}')
+    responses.put('/accountSecurity', '{"list":[1]}')
+    assert len(os.listdir(str(tmp_path))) == 1
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import gzip
+import json
+
+import pytest
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.cassette import SCRUBBED, Cassette, scrub, scrub_path
+
+
+def test_scrub():
+    value = dict(
+        password='secret', login=dict(apLoginPassword='secret', apLoginName='admin'),
+        radius=[dict(sharedSecret='secret', ip='192.0.2.1')], serviceTicket='ticket',
+        passwordExpiration=90, tokenType='bearer', ticketCount=3, privateKey=None,
+    )
+    assert scrub(value) == dict(
+        password=SCRUBBED, login=dict(apLoginPassword=SCRUBBED, apLoginName='admin'),
+        radius=[dict(sharedSecret=SCRUBBED, ip='192.0.2.1')], serviceTicket=SCRUBBED,
+        passwordExpiration=90, tokenType='bearer', ticketCount=3, privateKey=None,
+    )
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('/wsg/api/public/v11_1/rkszones?serviceTicket=abc', '/wsg/api/public/v11_1/rkszones'),
+    ('/wsg/api/public/v11_1/rkszones?serviceTicket=abc&index=0', '/wsg/api/public/v11_1/rkszones?index=0'),
+    ('/wsg/api/public/v11_1/rkszones?index=0&serviceTicket=abc', '/wsg/api/public/v11_1/rkszones?index=0'),
+])
+def test_scrub_path(path, expected):
+    assert scrub_path(path) == expected
+
+
+def test_record_and_replay(tmp_path):
+    path = str(tmp_path / 'vsz.cassette.gz')
+    recorder = Cassette(path)
+    recorder.record('POST', '/serviceTicket', '{"username":"admin","password":"secret"}', 200, '{"serviceTicket":"abc"}', 0.1)
+    recorder.record('GET', '/rkszones?serviceTicket=abc', None, 200, '{"list":[1]}', 0.1)
+    recorder.record('GET', '/rkszones?serviceTicket=abc', None, 200, '{"list":[2]}', 0.1)
+    recorder.close()
+
+    with gzip.open(path, 'rt') as f:
+        text = f.read()
+    assert 'secret' not in text and 'abc' not in text
+
+    player = Cassette(path, mode='replay', latency_scale=0)
+    assert player.replaying
+    ticket = json.dumps(dict(serviceTicket=SCRUBBED), separators=(',', ':'))
+    assert player.play('POST', '/serviceTicket', '{"username":"admin","password":"other"}') == (200, ticket)
+    # Identical requests in recorded order, the last one repeated
+    assert [player.play('GET', '/rkszones?serviceTicket=new', None)[1] for i in range(3)] == ['{"list":[1]}', '{"list":[2]}', '{"list":[2]}']
+
+
+def test_replay_unknown_request(tmp_path):
+    path = str(tmp_path / 'vsz.cassette.gz')
+    recorder = Cassette(path)
+    recorder.record('GET', '/rkszones', None, 200, '{}', 0.1)
+    recorder.close()
+    with pytest.raises(AnsibleConnectionFailure):
+        Cassette(path, mode='replay', latency_scale=0).play('GET', '/domains', None)
+
+
+def test_replay_missing_file(tmp_path):
+    with pytest.raises(AnsibleConnectionFailure):
+        Cassette(str(tmp_path / 'missing.gz'), mode='replay').play('GET', '/rkszones', None)
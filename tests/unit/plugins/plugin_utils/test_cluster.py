@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils import cluster
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.cluster import ClusterNodes, discover_addresses, is_read_only, node_urls
+
+
+@pytest.mark.parametrize('method, path, expected', [
+    ('GET', '/wsg/api/public/v11_1/rkszones', True),
+    ('POST', '/wsg/api/public/v11_1/query/ap', True),
+    ('POST', '/wsg/api/public/v11_1/query', True),
+    ('POST', '/wsg/api/public/v11_1/users/query', True),
+    ('POST', '/wsg/api/public/v11_1/users/query?serviceTicket=abc', True),
+    ('POST', '/wsg/api/public/v11_1/users', False),
+    ('POST', '/wsg/api/public/v11_1/querystring', False),
+    ('PUT', '/wsg/api/public/v11_1/query/ap', False),
+    ('DELETE', '/wsg/api/public/v11_1/rkszones/1', False),
+])
+def test_is_read_only(method, path, expected):
+    assert is_read_only(method, path) is expected
+
+
+def test_node_urls():
+    assert node_urls('https://vsz.example.com:8443', ['192.0.2.1', '', '192.0.2.2:9443', None]) == [
+        'https://192.0.2.1:8443', 'https://192.0.2.2:9443',
+    ]
+    assert node_urls('https://vsz.example.com', ['192.0.2.1']) == ['https://192.0.2.1']
+
+
+def test_discover_addresses():
+    state = dict(nodeStateList=[
+        dict(nodeId='a', nodeState='In_Service'),
+        dict(nodeId='b', nodeState='Out_Of_Service'),
+        dict(nodeId='c', nodeState='In_Service'),
+    ])
+    controllers = [
+        dict(id='a', managementIp='192.0.2.1'),
+        dict(id='b', managementIp='192.0.2.2'),
+        dict(id='c', managementIp='192.0.2.3'),
+        dict(id='d', managementIp='192.0.2.4'),
+    ]
+    assert discover_addresses(state, controllers) == ['192.0.2.1', '192.0.2.3']
+    assert discover_addresses(dict(), controllers) == []
+
+
+def test_cluster_nodes_round_robin():
+    nodes = ClusterNodes(['https://a', 'https://b'])
+    assert len(nodes) == 2
+    assert [nodes.next() for i in range(4)] == ['https://a', 'https://b', 'https://a', 'https://b']
+
+
+def test_cluster_nodes_mark_down():
+    nodes = ClusterNodes(['https://a', 'https://b'])
+    nodes.tickets['https://a'] = 'ticket'
+    nodes.mark_down('https://a')
+    nodes.mark_down('https://unknown')
+    assert nodes.tickets == {}
+    assert [nodes.next() for i in range(2)] == ['https://b', 'https://b']
+    nodes.mark_down('https://b')
+    assert nodes.next() is None
+
+
+def test_cluster_nodes_write_window(monkeypatch):
+    monkeypatch.setattr(cluster.time, 'monotonic', lambda: 1000.0)
+    nodes = ClusterNodes(['https://a', 'https://b'], write_window=10)
+    assert nodes.next() == 'https://a'
+    nodes.wrote()
+    monkeypatch.setattr(cluster.time, 'monotonic', lambda: 1009.0)
+    assert nodes.next() is None
+    monkeypatch.setattr(cluster.time, 'monotonic', lambda: 1010.0)
+    assert nodes.next() == 'https://b'
+
+
+def test_cluster_nodes_write_pinned(monkeypatch):
+    nodes = ClusterNodes(['https://a'], write_window=float('inf'))
+    assert nodes.next() == 'https://a'
+    nodes.wrote()
+    monkeypatch.setattr(cluster.time, 'monotonic', lambda: 1e9)
+    assert nodes.next() is None
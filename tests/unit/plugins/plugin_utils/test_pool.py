@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.pool import ConnectionPool
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.reply(dict(path=self.path))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.reply(dict(path=self.path, body=json.loads(self.rfile.read(length))), code=201)
+
+    def reply(self, data, code=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.close_after_reply:
+            # Like a controller closing idle connections, without telling the client
+            self.close_connection = True
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.close_after_reply = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_reuses_connections(server):
+    pool = ConnectionPool(url(server), size=2)
+    for i in range(5):
+        assert pool.request('GET', f"/rkszones/{i}") == (200, json.dumps(dict(path=f"/rkszones/{i}")))
+    stats = pool.get_stats()
+    assert stats['connections'] == 1
+    assert stats['requests'] == 5
+    assert stats['reuse_ratio'] == 0.8
+    pool.close()
+
+
+def test_post(server):
+    pool = ConnectionPool(url(server))
+    code, text = pool.request('POST', '/users', '{"userName": "bob"}', headers={'Content-Type': 'application/json'})
+    assert code == 201
+    assert json.loads(text)['body'] == dict(userName='bob')
+    pool.close()
+
+
+def test_retries_connection_closed_while_idle(server):
+    pool = ConnectionPool(url(server))
+    server.close_after_reply = True
+    assert pool.request('GET', '/first')[0] == 200
+    assert pool.request('GET', '/second')[0] == 200
+    assert pool.get_stats()['connections'] == 2
+    pool.close()
+
+
+def test_concurrent_requests_bounded(server):
+    pool = ConnectionPool(url(server), size=3)
+    results = []
+
+    def worker(i):
+        results.append(pool.request('GET', f"/aps/{i}")[0])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert results == [200] * 20
+    assert pool.get_stats()['connections'] <= 3
+    pool.close()
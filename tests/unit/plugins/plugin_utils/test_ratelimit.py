@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from ansible_collections.scsitteam.smartzone.plugins.plugin_utils.ratelimit import RateLimiter
+
+
+def test_state_file_per_controller(tmp_path):
+    limiter = RateLimiter(str(tmp_path), 'vsz01.example.com:8443', rate=1)
+    assert limiter.path == str(tmp_path / 'smartzone-ratelimit-vsz01.example.com_8443.json')
+
+
+def test_rate(tmp_path):
+    limiter = RateLimiter(str(tmp_path), 'vsz', rate=20, burst=1)
+    start = time.monotonic()
+    for i in range(3):
+        with limiter.request():
+            pass
+    # The burst allows the first request, the others wait for a token each
+    assert time.monotonic() - start >= 0.09
+
+
+def test_max_inflight_shared(tmp_path):
+    first = RateLimiter(str(tmp_path), 'vsz', max_inflight=1)
+    second = RateLimiter(str(tmp_path), 'vsz', max_inflight=1)
+    order = []
+
+    def other():
+        with second.request():
+            order.append('second')
+
+    with first.request():
+        thread = threading.Thread(target=other)
+        thread.start()
+        time.sleep(0.2)
+        order.append('first')
+    thread.join(5)
+    assert order == ['first', 'second']
+
+
+def test_nested_request(tmp_path):
+    limiter = RateLimiter(str(tmp_path), 'vsz', max_inflight=1)
+    done = []
+
+    def nested():
+        with limiter.request():
+            with limiter.request():
+                done.append(True)
+
+    thread = threading.Thread(target=nested, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert done == [True]
+    with open(limiter.path) as f:
+        assert json.load(f)['inflight'] == {}
+
+
+def test_slot_of_dead_process(tmp_path):
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    limiter = RateLimiter(str(tmp_path), 'vsz', max_inflight=1)
+    with open(limiter.path, 'w') as f:
+        json.dump(dict(tokens=1, updated=time.time(), inflight={f"{process.pid}-1-0": time.time()}), f)
+    start = time.monotonic()
+    with limiter.request():
+        pass
+    assert time.monotonic() - start < 1